@@ -0,0 +1,228 @@
+"""Group-by reductions on the integer codes of a ``CompactTable``.
+
+Group keys are combined into one dense integer per row
+(``code_0 * card_1 * ... + code_1 * ... + code_n``) and every statistic is a
+single ``np.bincount`` or ``ufunc.at`` pass over it, so strings are never
+hashed. Results come back as small dataframes shaped like
+``df.groupby(keys)[value].agg(stats).reset_index()``: one row per non-empty
+group, sorted by key values. A weight column (``dup_count``) makes every
+row count as that many identical rows.
+"""
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from compact import CompactTable
+
+STATS = ("count", "sum", "mean", "median", "min", "max", "std")
+
+# Above this many possible key combinations, group ids are compacted with
+# ``np.unique`` first so the bincount arrays stay proportional to the data.
+MAX_DENSE_GROUPS = 1 << 20
+
+
+def combined_codes(table: CompactTable, keys: list):
+    """One integer per row identifying its group, plus each key's value array."""
+    combined = np.zeros(len(table), dtype=np.int64)
+    dictionaries = []
+    for key in keys:
+        codes, values = table.key_codes(key)
+        combined = combined * len(values) + codes
+        dictionaries.append(values)
+    return combined, dictionaries
+
+
+def _decode(group_ids: np.ndarray, dictionaries: list) -> list:
+    """Split combined group ids back into per-key values."""
+    columns = []
+    for values in reversed(dictionaries):
+        group_ids, codes = np.divmod(group_ids, len(values))
+        columns.append(values[codes])
+    return columns[::-1]
+
+
+def _sorted_by_group(groups: np.ndarray, raw: np.ndarray) -> np.ndarray:
+    """``raw`` ordered by ``(group, value)``, as float64."""
+    if np.issubdtype(raw.dtype, np.integer) and len(raw):
+        low = int(raw.min())
+        span = int(raw.max()) - low + 1
+        if (int(groups.max()) + 1) * span < 2**62:
+            # One sort of packed int64 keys is far cheaper than a lexsort.
+            packed = np.sort(groups.astype(np.int64) * span + (raw.astype(np.int64) - low))
+            return (packed % span + low).astype(np.float64)
+    values = raw.astype(np.float64)
+    return values[np.lexsort((values, groups))]
+
+
+def _medians(groups: np.ndarray, raw: np.ndarray, counts: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """Per-group medians from one sort of ``(group, value)``."""
+    ordered = _sorted_by_group(groups, raw)
+    starts = np.concatenate(([0], np.cumsum(counts[present])[:-1]))
+    n = counts[present]
+    return (ordered[starts + (n - 1) // 2] + ordered[starts + n // 2]) / 2
+
+
+def _weighted_medians(groups: np.ndarray, raw: np.ndarray, weights: np.ndarray, counts: np.ndarray,
+                      present: np.ndarray) -> np.ndarray:
+    """Per-group medians with each row repeated ``weights`` times, without repeating it."""
+    order = np.lexsort((raw, groups))
+    ordered = raw[order].astype(np.float64)
+    # Row i covers the repeated positions below cumulative[i] (counted across groups).
+    cumulative = np.cumsum(weights[order].astype(np.int64))
+    n = counts[present]
+    starts = np.concatenate(([0], np.cumsum(n)[:-1]))
+    lower = np.searchsorted(cumulative, starts + (n - 1) // 2, side="right")
+    upper = np.searchsorted(cumulative, starts + n // 2, side="right")
+    return (ordered[lower] + ordered[upper]) / 2
+
+
+def group_stats(table: CompactTable, keys, stats=("mean",), value: str = "salary_in_usd",
+                weights: str = None) -> pd.DataFrame:
+    """Aggregate ``value`` by ``keys`` on the table's integer codes.
+
+    ``stats`` is any of ``count``, ``sum``, ``mean``, ``median``, ``min``,
+    ``max`` and ``std`` (sample, like pandas). Key columns hold decoded
+    values; groups with a missing key are dropped, as ``groupby`` does.
+    ``weights`` names a column of positive integer frequencies, such as
+    ``dup_count``: the result is that of the table with every row repeated
+    that many times.
+    """
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    stats = [stats] if isinstance(stats, str) else list(stats)
+    unknown = set(stats) - set(STATS)
+    if unknown:
+        raise ValueError(f"Unsupported statistics: {', '.join(sorted(unknown))}")
+
+    groups, dictionaries = combined_codes(table, keys)
+    n_groups = int(np.prod([len(d) for d in dictionaries]))
+    group_ids = None
+    if n_groups > MAX_DENSE_GROUPS:
+        group_ids, groups = np.unique(groups, return_inverse=True)
+        n_groups = len(group_ids)
+    raw = table.column(value)
+    values = raw.astype(np.float64)
+    frequencies = None
+    if weights is not None:
+        frequencies = table.column(weights)
+        if not np.issubdtype(frequencies.dtype, np.integer) or (len(frequencies) and frequencies.min() < 1):
+            raise ValueError(f"Weight column {weights!r} must hold positive integers")
+
+    if frequencies is None:
+        counts = np.bincount(groups, minlength=n_groups)
+        sums = np.bincount(groups, weights=values, minlength=n_groups)
+    else:
+        counts = np.bincount(groups, weights=frequencies, minlength=n_groups).astype(np.int64)
+        sums = np.bincount(groups, weights=values * frequencies, minlength=n_groups)
+    present = np.flatnonzero(counts)
+    means = sums / np.maximum(counts, 1)
+
+    ids = present if group_ids is None else group_ids[present]
+    result = dict(zip(keys, _decode(ids, dictionaries)))
+    for stat in stats:
+        if stat == "count":
+            result[stat] = counts[present]
+        elif stat == "sum":
+            result[stat] = sums[present]
+        elif stat == "mean":
+            result[stat] = means[present]
+        elif stat == "median":
+            if frequencies is None:
+                result[stat] = _medians(groups, raw, counts, present)
+            else:
+                result[stat] = _weighted_medians(groups, raw, frequencies, counts, present)
+        elif stat in ("min", "max"):
+            ufunc = np.minimum if stat == "min" else np.maximum
+            out = np.full(n_groups, np.inf if stat == "min" else -np.inf)
+            ufunc.at(out, groups, values)
+            result[stat] = out[present].astype(raw.dtype)
+        elif stat == "std":
+            # Two-pass variance: squared deviations from each group's mean.
+            deviations = (values - means[groups]) ** 2
+            if frequencies is not None:
+                deviations *= frequencies
+            squares = np.bincount(groups, weights=deviations, minlength=n_groups)
+            n = counts[present]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                result[stat] = np.where(n > 1, np.sqrt(squares[present] / (n - 1)), np.nan)
+
+    return _stats_frame(result, keys)
+
+
+def _stats_frame(result: dict, keys: list) -> pd.DataFrame:
+    frame = pd.DataFrame(result)
+    frame = frame.dropna(subset=keys)
+    return frame.sort_values(keys, kind="stable").reset_index(drop=True)
+
+
+# Stats an accumulator can keep up to date as rows enter and leave.
+INCREMENTAL_STATS = ("count", "sum", "mean")
+
+_shared_groups = weakref.WeakKeyDictionary()
+
+
+def _table_groups(table: CompactTable, keys: tuple):
+    """``combined_codes`` for a table, computed once and shared by all accumulators."""
+    per_table = _shared_groups.setdefault(table, {})
+    if keys not in per_table:
+        groups, dictionaries = combined_codes(table, list(keys))
+        group_ids = None
+        if int(np.prod([len(d) for d in dictionaries])) > MAX_DENSE_GROUPS:
+            group_ids, groups = np.unique(groups, return_inverse=True)
+        per_table[keys] = (groups, dictionaries, group_ids)
+    return per_table[keys]
+
+
+class GroupAccumulator:
+    """Per-group row count and value sum over a changing set of table rows.
+
+    Rows are added and removed by position, so a selection that changes by
+    a few rows costs two bincounts over those rows rather than a pass over
+    the whole selection. Salaries are integers, so the float sums stay
+    exact however many times rows come and go.
+    """
+
+    def __init__(self, table: CompactTable, keys, value: str = "salary_in_usd"):
+        self.keys = [keys] if isinstance(keys, str) else list(keys)
+        self.groups, self.dictionaries, self.group_ids = _table_groups(table, tuple(self.keys))
+        self.values = table.column(value)
+        n_groups = len(self.group_ids) if self.group_ids is not None else int(np.prod([len(d) for d in self.dictionaries]))
+        self.counts = np.zeros(n_groups, dtype=np.int64)
+        self.sums = np.zeros(n_groups)
+
+    def add(self, rows, sign: int = 1):
+        groups = self.groups[rows]
+        self.counts += sign * np.bincount(groups, minlength=len(self.counts))
+        self.sums += sign * np.bincount(groups, weights=self.values[rows], minlength=len(self.sums))
+
+    def remove(self, rows):
+        self.add(rows, sign=-1)
+
+    def reset(self, rows):
+        self.counts[:] = 0
+        self.sums[:] = 0
+        self.add(rows)
+
+    def frame(self, stats=("mean",)) -> pd.DataFrame:
+        """Same frame as ``group_stats`` for the accumulated rows."""
+        stats = [stats] if isinstance(stats, str) else list(stats)
+        unsupported = set(stats) - set(INCREMENTAL_STATS)
+        if unsupported:
+            raise ValueError(f"Not maintained incrementally: {', '.join(sorted(unsupported))}")
+        present = np.flatnonzero(self.counts)
+        ids = present if self.group_ids is None else self.group_ids[present]
+        result = dict(zip(self.keys, _decode(ids, self.dictionaries)))
+        for stat in stats:
+            if stat == "count":
+                result[stat] = self.counts[present]
+            elif stat == "sum":
+                result[stat] = self.sums[present]
+            else:
+                result[stat] = self.sums[present] / self.counts[present]
+        return _stats_frame(result, self.keys)
+
+
+def distinct_count(table: CompactTable, col: str) -> int:
+    """Number of distinct values of ``col`` present in the table."""
+    codes, values = table.key_codes(col)
+    return int(np.count_nonzero(np.bincount(codes, minlength=len(values))))
@@ -53,6 +53,8 @@ st.markdown(
 from pages.explore import render_explore_page
 from pages.predict import render_predict_page
 from pages.compare import render_compare_page
+from pages.diagnostics import render_diagnostics_page
+from instrumentation import DUMP_EVERY_RERUN, timer, write_prometheus
 
 # --- Sidebar ---
 st.sidebar.markdown("## Data Jobs Salary Explorer")
@@ -76,9 +78,17 @@ st.sidebar.markdown(
 )
 
 # --- Page routing ---
-if page == "Dashboard":
-    render_explore_page()
-elif page == "Salary Prediction":
-    render_predict_page()
-elif page == "Job Comparison":
-    render_compare_page()
+# The diagnostics page is not in the navigation; open it with ?page=diagnostics.
+if st.query_params.get("page") == "diagnostics":
+    render_diagnostics_page()
+else:
+    with timer(f"rerun.{page}"):
+        if page == "Dashboard":
+            render_explore_page()
+        elif page == "Salary Prediction":
+            render_predict_page()
+        elif page == "Job Comparison":
+            render_compare_page()
+
+    if DUMP_EVERY_RERUN:
+        write_prometheus()
@@ -0,0 +1,134 @@
+"""Benchmark the feature encodings of the training pipeline.
+
+Compares the notebook's dense one-hot matrix (with ``MinMaxScaler``) against
+the sparse CSR one-hot and the out-of-fold target/frequency encodings of
+``encoders.py``: encode time, fit time, batch and single-row inference
+latency, training matrix memory and held-out R² (log salary). The split is
+the notebook's ``train_test_split(test_size=0.2, random_state=42)``:
+
+    python -m benchmarks.bench_encoders --n-estimators 200
+    python -m benchmarks.bench_encoders --synthetic 100000
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import MinMaxScaler
+
+from benchmarks.bench_pages import make_dataset
+from encoders import ENCODINGS, make_encoder
+from features import generate_features, training_target
+from utils import read_salaries
+
+SINGLE_ROW_SAMPLES = 200
+
+
+def _nbytes(X) -> int:
+    if sparse.issparse(X):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return X.nbytes
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def _encode(name: str, train, test, y_train):
+    encoder = make_encoder(name)
+    X_train = encoder.fit_transform(train, y_train)
+    X_test = encoder.transform(test)
+    if name == "onehot":
+        # The notebook's path: a float64 matrix scaled to [0, 1].
+        scaler = MinMaxScaler().fit(X_train)
+        X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+    return X_train, X_test
+
+
+def run_encoding(name: str, frame, params: dict, repeat: int = 3, seed: int = 42) -> dict:
+    y = training_target(frame)
+    train, test, y_train, y_test = train_test_split(frame, y, test_size=0.2, random_state=seed)
+
+    encode_times, fit_times = [], []
+    for _ in range(repeat):
+        (X_train, X_test), elapsed = _timed(lambda: _encode(name, train, test, y_train))
+        encode_times.append(elapsed)
+        model = GradientBoostingRegressor(**params, random_state=17)
+        _, elapsed = _timed(lambda: model.fit(X_train, y_train))
+        fit_times.append(elapsed)
+
+    batch_times = [_timed(lambda: model.predict(X_test))[1] for _ in range(repeat)]
+    rows = np.random.default_rng(seed).integers(0, X_test.shape[0], SINGLE_ROW_SAMPLES)
+    single = [_timed(lambda: model.predict(X_test[i:i + 1]))[1] for i in rows]
+
+    pred = model.predict(X_test)
+    r2 = 1 - np.sum((y_test - pred) ** 2) / np.sum((y_test - y_test.mean()) ** 2)
+    return {
+        "encoding": name,
+        "rows": len(frame),
+        "features": int(X_train.shape[1]),
+        "matrix_bytes": _nbytes(X_train),
+        "encode_seconds": statistics.median(encode_times),
+        "fit_seconds": statistics.median(fit_times),
+        "batch_predict_seconds": statistics.median(batch_times),
+        "row_latency_ms": statistics.median(single) * 1000,
+        "r2": float(r2),
+    }
+
+
+def run(frames: dict, encodings, params: dict, repeat: int = 3) -> list:
+    results = []
+    for label, frame in frames.items():
+        for name in encodings:
+            result = {"dataset": label, **run_encoding(name, frame, params, repeat)}
+            results.append(result)
+            print(
+                f"{label:>12} {name:>7}: {result['features']:5d} features "
+                f"{result['matrix_bytes'] / 2**20:8.2f} MiB  encode {result['encode_seconds'] * 1000:8.1f} ms  "
+                f"fit {result['fit_seconds']:7.2f} s  batch {result['batch_predict_seconds'] * 1000:7.1f} ms  "
+                f"row {result['row_latency_ms']:6.3f} ms  r2 {result['r2']:.4f}",
+                file=sys.stderr,
+            )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--encodings", nargs="+", choices=list(ENCODINGS), default=list(ENCODINGS))
+    parser.add_argument("--synthetic", type=int, nargs="+", default=[],
+                        help="also run on synthetic datasets of these sizes")
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--max-depth", type=int, default=8)
+    parser.add_argument("--learning-rate", type=float, default=0.1)
+    parser.add_argument("--subsample", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="JSON output path")
+    args = parser.parse_args(argv)
+
+    params = {
+        "n_estimators": args.n_estimators,
+        "max_depth": args.max_depth,
+        "learning_rate": args.learning_rate,
+        "subsample": args.subsample,
+    }
+    frames = {"ds_salaries": generate_features(read_salaries())}
+    for n_rows in args.synthetic:
+        frames[f"synthetic-{n_rows}"] = generate_features(make_dataset(n_rows))
+
+    results = run(frames, args.encodings, params, repeat=args.repeat)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps({"params": params, "results": results}, indent=2))
+        print(f"Wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark the integer-code group-by engine against pandas ``groupby``.
+
+Each case is an aggregation one of the chart helpers performs. Both paths
+run on the same synthetic dataset and their results are checked to agree
+before timing:
+
+    python -m benchmarks.bench_groupby --sizes 100000 1000000
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from aggregate import group_stats
+from benchmarks.bench_pages import make_dataset
+from compact import CompactTable
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+# name -> (keys, stats), mirroring the chart helpers in pages/.
+CASES = {
+    "salary_by_job": (["job_title"], ["mean", "count"]),
+    "salary_trend": (["work_year"], ["mean", "median"]),
+    "remote_distribution": (["remote_label"], ["count"]),
+    "company_size": (["size_label", "experience_label"], ["mean"]),
+    "geo_map": (["company_location"], ["mean"]),
+    "employment_type": (["employment_label", "work_year"], ["mean"]),
+    "job_summary": (["job_title"], ["mean", "median", "min", "max", "count", "std"]),
+    "job_experience": (["job_title", "experience_label"], ["mean"]),
+    "growth": (["work_year", "job_title"], ["mean"]),
+}
+
+
+def pandas_stats(df: pd.DataFrame, keys: list, stats: list) -> pd.DataFrame:
+    return df.groupby(keys)["salary_in_usd"].agg(stats).reset_index()
+
+
+def _best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def _check(expected: pd.DataFrame, actual: pd.DataFrame, name: str):
+    if len(expected) != len(actual):
+        raise AssertionError(f"{name}: {len(actual)} groups, pandas has {len(expected)}")
+    for col in expected.columns:
+        left, right = expected[col].to_numpy(), actual[col].to_numpy()
+        if np.issubdtype(left.dtype, np.number):
+            ok = np.allclose(left.astype(float), right.astype(float), rtol=1e-9, equal_nan=True)
+        else:
+            ok = (left.astype(str) == right.astype(str)).all()
+        if not ok:
+            raise AssertionError(f"{name}: column {col!r} differs from pandas")
+
+
+def run(sizes, case_names, repeat=5, seed=0) -> list:
+    results = []
+    for n_rows in sizes:
+        df = make_dataset(n_rows, seed=seed)
+        table = CompactTable.from_frame(df)
+        for name in case_names:
+            keys, stats = CASES[name]
+            _check(pandas_stats(df, keys, stats), group_stats(table, keys, stats), name)
+            t_pandas = _best_of(lambda: pandas_stats(df, keys, stats), repeat)
+            t_codes = _best_of(lambda: group_stats(table, keys, stats), repeat)
+            results.append({
+                "case": name,
+                "rows": n_rows,
+                "pandas_seconds": t_pandas,
+                "codes_seconds": t_codes,
+                "speedup": t_pandas / t_codes,
+            })
+            print(
+                f"{name:>20} {n_rows:>11,} rows  pandas {t_pandas * 1000:9.2f} ms  "
+                f"codes {t_codes * 1000:9.2f} ms  x{t_pandas / t_codes:6.1f}",
+                file=sys.stderr,
+            )
+        del df, table
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="JSON output path")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.cases, repeat=args.repeat, seed=args.seed)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps({"results": results}, indent=2))
+        print(f"Wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Headless benchmark for the Streamlit pages.
+
+Runs every page against synthetic datasets of increasing size with a stubbed
+``streamlit`` module and records wall time, peak memory and a per-helper
+breakdown. Results are written as JSON so runs can be compared across commits:
+
+    python -m benchmarks.bench_pages --sizes 10000 100000
+    python -m benchmarks.bench_pages --compare old.json new.json
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+import pages.compare
+import pages.explore
+import pages.predict
+from benchmarks.stub_streamlit import StubStreamlit
+from compact import CompactTable
+from precompute import clear_caches
+from prediction_cache import default_cache
+from synthetic_data import generate
+from utils import add_label_columns, filter_dataframe
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+RESULTS_DIR = Path(__file__).parent / "results"
+
+PAGES = {
+    "explore": (pages.explore, "render_explore_page"),
+    "predict": (pages.predict, "render_predict_page"),
+    "compare": (pages.compare, "render_compare_page"),
+}
+
+
+def make_dataset(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Generate ``n_rows`` synthetic rows, labelled like ``load_data`` output."""
+    df = add_label_columns(generate(n_rows, seed=seed))
+    df.attrs["dataset_version"] = f"synthetic-{n_rows}-{seed}"
+    return df
+
+
+class _HelperTimer:
+    """Wraps a module's functions to accumulate inclusive wall time per helper."""
+
+    def __init__(self, module, names):
+        self.module = module
+        self.names = names
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self._originals = {}
+
+    def __enter__(self):
+        for name in self.names:
+            original = getattr(self.module, name)
+            self._originals[name] = original
+            setattr(self.module, name, self._wrap(name, original))
+        return self
+
+    def __exit__(self, *exc):
+        for name, original in self._originals.items():
+            setattr(self.module, name, original)
+        return False
+
+    def _wrap(self, name, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.seconds[name] += time.perf_counter() - start
+                self.calls[name] += 1
+
+        return wrapper
+
+
+def _load_data_stub(df: pd.DataFrame):
+    """``utils.load_data`` over the synthetic frame, with its row filters and column projection.
+
+    Pages get the same frame shape they would read, so the benchmark
+    measures what each page actually decodes.
+    """
+
+    def load_data(filters: dict = None, columns=None) -> pd.DataFrame:
+        out = filter_dataframe(df, filters) if filters else df
+        if columns is not None:
+            out = out[list(columns)]
+        out.attrs.update(df.attrs)
+        return out
+
+    return load_data
+
+
+def _patch(module, df, table, stub):
+    """Point a page module at the stub and the synthetic dataset."""
+    saved = {"st": module.st, "instrumentation.st": instrumentation.st}
+    module.st = stub
+    instrumentation.st = stub
+    loaders = {"load_data": _load_data_stub(df), "load_table": lambda: table}
+    for name, loader in loaders.items():
+        if hasattr(module, name):
+            saved[name] = getattr(module, name)
+            setattr(module, name, loader)
+    return saved
+
+
+def _restore(module, saved):
+    instrumentation.st = saved.pop("instrumentation.st")
+    for attr, value in saved.items():
+        setattr(module, attr, value)
+
+
+def _helper_names(module, entry):
+    names = [
+        name for name, obj in vars(module).items()
+        if name.startswith("_") and not name.startswith("__") and callable(obj)
+        and getattr(obj, "__module__", None) == module.__name__
+    ]
+    if "filter_dataframe" in vars(module):
+        names.append("filter_dataframe")
+    return sorted(names) + [entry]
+
+
+def run_page(page: str, df: pd.DataFrame, repeat: int = 3) -> dict:
+    """Benchmark one page against one dataset."""
+    module, entry = PAGES[page]
+    names = _helper_names(module, entry)
+    # Built once per dataset, like the shared ``load_table`` resource.
+    table = CompactTable.from_frame(df)
+
+    wall = []
+    helpers = defaultdict(list)
+    stub = None
+    for _ in range(repeat):
+        stub = StubStreamlit()
+        default_cache().clear()  # measure cold reruns
+        clear_caches()
+        saved = _patch(module, df, table, stub)
+        try:
+            with _HelperTimer(module, names) as timer:
+                start = time.perf_counter()
+                getattr(module, entry)()
+                wall.append(time.perf_counter() - start)
+        finally:
+            _restore(module, saved)
+        for name in names:
+            helpers[name].append(timer.seconds.get(name, 0.0))
+
+    # Separate pass for memory: tracemalloc slows allocation-heavy code down.
+    default_cache().clear()
+    clear_caches()
+    saved = _patch(module, df, table, StubStreamlit())
+    tracemalloc.start()
+    try:
+        getattr(module, entry)()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        _restore(module, saved)
+
+    return {
+        "page": page,
+        "rows": len(df),
+        "wall_seconds": {
+            "min": min(wall),
+            "median": statistics.median(wall),
+            "runs": wall,
+        },
+        "peak_memory_bytes": peak,
+        "helpers": {
+            name: {"median_seconds": statistics.median(times), "calls": timer.calls.get(name, 0)}
+            for name, times in helpers.items()
+            if any(times)
+        },
+        "elements": {
+            "calls": dict(stub.calls),
+            "seconds": dict(stub.element_seconds),
+            "payload_bytes": dict(stub.payload_bytes),
+        },
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(sizes, page_names, repeat=3, seed=0) -> dict:
+    results = []
+    for n_rows in sizes:
+        df = make_dataset(n_rows, seed=seed)
+        for page in page_names:
+            result = run_page(page, df, repeat=repeat)
+            results.append(result)
+            print(
+                f"{page:>8} {n_rows:>11,} rows  "
+                f"{result['wall_seconds']['median']:8.3f}s  "
+                f"peak {result['peak_memory_bytes'] / 2**20:8.1f} MiB",
+                file=sys.stderr,
+            )
+        del df
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare(old_path: Path, new_path: Path):
+    """Print the median wall time ratio (new / old) per page and size."""
+    old = json.loads(Path(old_path).read_text())
+    new = json.loads(Path(new_path).read_text())
+    old_by_key = {(r["page"], r["rows"]): r for r in old["results"]}
+    print(f"{'page':>8} {'rows':>11}  {'old (s)':>9} {'new (s)':>9} {'ratio':>7}  {'peak ratio':>10}")
+    for r in new["results"]:
+        before = old_by_key.get((r["page"], r["rows"]))
+        if before is None:
+            continue
+        t_old = before["wall_seconds"]["median"]
+        t_new = r["wall_seconds"]["median"]
+        mem_ratio = r["peak_memory_bytes"] / max(before["peak_memory_bytes"], 1)
+        print(
+            f"{r['page']:>8} {r['rows']:>11,}  {t_old:9.3f} {t_new:9.3f} "
+            f"{t_new / t_old:7.2f}  {mem_ratio:10.2f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="JSON output path")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("OLD", "NEW"))
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # Cold, deterministic reruns: no background precompute, no usage log on disk.
+    os.environ["SALARY_APP_PRECOMPUTE_WORKERS"] = "0"
+    os.environ["SALARY_APP_USAGE_LOG"] = ""
+
+    report = run(args.sizes, args.pages, repeat=args.repeat, seed=args.seed)
+    output = args.output or RESULTS_DIR / f"{report['commit']}-{int(time.time())}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
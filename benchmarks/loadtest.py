@@ -0,0 +1,129 @@
+"""Load test for ``service.py``.
+
+Replays profiles sampled from ``ds_salaries.csv`` against a running service
+with a fixed number of keep-alive connections and reports latency
+percentiles:
+
+    python service.py --workers 4 &
+    python -m benchmarks.loadtest --requests 5000 --concurrency 32
+    python -m benchmarks.loadtest --batch-size 100 --requests 200
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+from features import GROUP_KEYS
+from ingest import read_source
+from utils import DATA_PATH
+
+
+def sample_profiles(n: int, seed: int = 0) -> list:
+    df = read_source(DATA_PATH, columns=GROUP_KEYS)
+    rows = df.sample(n, replace=True, random_state=seed)
+    return [
+        {k: (v.item() if hasattr(v, "item") else v) for k, v in row.items()}
+        for row in rows.to_dict("records")
+    ]
+
+
+def _worker(url, bodies, path, latencies, errors, lock):
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+    local_latencies, local_errors = [], 0
+    for body in bodies:
+        start = time.perf_counter()
+        try:
+            conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                local_errors += 1
+        except (OSError, http.client.HTTPException):
+            local_errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        local_latencies.append(time.perf_counter() - start)
+    conn.close()
+    with lock:
+        latencies.extend(local_latencies)
+        errors[0] += local_errors
+
+
+def run(url: str, n_requests: int, concurrency: int, batch_size: int = 0, seed: int = 0) -> dict:
+    parsed = urlparse(url)
+    per_request = max(batch_size, 1)
+    profiles = sample_profiles(n_requests * per_request, seed=seed)
+    if batch_size:
+        path = "/estimate/batch"
+        bodies = [
+            json.dumps({"profiles": profiles[i:i + batch_size]}).encode()
+            for i in range(0, len(profiles), batch_size)
+        ]
+    else:
+        path = "/estimate"
+        bodies = [json.dumps(p).encode() for p in profiles]
+
+    latencies, errors, lock = [], [0], threading.Lock()
+    threads = [
+        threading.Thread(
+            target=_worker, args=(parsed, bodies[i::concurrency], path, latencies, errors, lock)
+        )
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    return {
+        "requests": len(bodies),
+        "profiles": len(profiles),
+        "errors": errors[0],
+        "seconds": elapsed,
+        "requests_per_second": len(bodies) / elapsed,
+        "profiles_per_second": len(profiles) / elapsed,
+        "latency_ms": {
+            "p50": float(np.percentile(ms, 50)),
+            "p90": float(np.percentile(ms, 90)),
+            "p95": float(np.percentile(ms, 95)),
+            "p99": float(np.percentile(ms, 99)),
+            "max": float(ms.max()),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the estimate service.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=0,
+                        help="Profiles per /estimate/batch request (0 = single /estimate)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.url, args.requests, args.concurrency, args.batch_size, args.seed)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    lat = report["latency_ms"]
+    print(
+        f"{report['requests']:,} requests ({report['profiles']:,} profiles) in {report['seconds']:.2f}s, "
+        f"{report['errors']} errors\n"
+        f"throughput: {report['requests_per_second']:,.0f} req/s, "
+        f"{report['profiles_per_second']:,.0f} profiles/s\n"
+        f"latency ms: p50 {lat['p50']:.1f}  p90 {lat['p90']:.1f}  p95 {lat['p95']:.1f}  "
+        f"p99 {lat['p99']:.1f}  max {lat['max']:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import time
+from collections import Counter
+
+
+class _Block:
+    """Container returned by columns/tabs/expander; forwards calls to the stub."""
+
+    def __init__(self, stub):
+        self._stub = stub
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._stub, name)
+
+
+class StubStreamlit:
+    """Headless stand-in for the ``streamlit`` module.
+
+    Widgets return their default value and primary buttons are "clicked", so
+    every page renders the output of its main action; secondary buttons
+    (such as preparing a download) are not. ``plotly_chart`` and ``dataframe`` do the work
+    Streamlit would do to ship the element to the browser, so the benchmark
+    sees serialization costs as well as the page's own computation.
+    """
+
+    def __init__(self):
+        self.calls = Counter()
+        self.element_seconds = Counter()
+        self.payload_bytes = Counter()
+        self.session_state = {}
+        self.query_params = {}
+        self.sidebar = _Block(self)
+
+    # --- caching decorators ---
+    def cache_data(self, func=None, **kwargs):
+        return func if func is not None else (lambda f: f)
+
+    cache_resource = cache_data
+
+    # --- layout ---
+    def columns(self, spec, **kwargs):
+        self.calls["columns"] += 1
+        n = spec if isinstance(spec, int) else len(spec)
+        return [_Block(self) for _ in range(n)]
+
+    def tabs(self, labels):
+        self.calls["tabs"] += 1
+        return [_Block(self) for _ in labels]
+
+    def expander(self, label, **kwargs):
+        self.calls["expander"] += 1
+        return _Block(self)
+
+    def container(self, **kwargs):
+        return _Block(self)
+
+    def empty(self):
+        self.calls["empty"] += 1
+        return _Block(self)
+
+    # --- widgets ---
+    def multiselect(self, label, options, default=None, **kwargs):
+        self.calls["multiselect"] += 1
+        return list(default) if default is not None else []
+
+    def selectbox(self, label, options, index=0, **kwargs):
+        self.calls["selectbox"] += 1
+        options = list(options)
+        return options[index] if options and index is not None else None
+
+    def radio(self, label, options, index=0, **kwargs):
+        self.calls["radio"] += 1
+        return list(options)[index]
+
+    def select_slider(self, label, options=(), value=None, **kwargs):
+        self.calls["select_slider"] += 1
+        return value if value is not None else list(options)[0]
+
+    def slider(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        self.calls["slider"] += 1
+        return value if value is not None else min_value
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        self.calls["number_input"] += 1
+        return value if value is not None else min_value
+
+    def text_input(self, label, value="", **kwargs):
+        self.calls["text_input"] += 1
+        return value
+
+    def checkbox(self, label, value=False, **kwargs):
+        self.calls["checkbox"] += 1
+        return value
+
+    toggle = checkbox
+
+    def button(self, label, **kwargs):
+        self.calls["button"] += 1
+        return kwargs.get("type") == "primary"
+
+    def download_button(self, label, data, *args, **kwargs):
+        self.calls["download_button"] += 1
+        self.payload_bytes["download_button"] += len(data)
+        return False
+
+    # --- elements that are serialized to the browser ---
+    def plotly_chart(self, fig, **kwargs):
+        self.calls["plotly_chart"] += 1
+        start = time.perf_counter()
+        payload = fig.to_json()
+        self.element_seconds["plotly_chart"] += time.perf_counter() - start
+        self.payload_bytes["plotly_chart"] += len(payload)
+
+    def dataframe(self, data, **kwargs):
+        self.calls["dataframe"] += 1
+        start = time.perf_counter()
+        payload = data.to_json(orient="split")
+        self.element_seconds["dataframe"] += time.perf_counter() - start
+        self.payload_bytes["dataframe"] += len(payload)
+
+    # --- everything else (markdown, metric, success, ...) is a no-op ---
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def _noop(*args, **kwargs):
+            self.calls[name] += 1
+
+        return _noop
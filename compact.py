@@ -0,0 +1,303 @@
+"""Compact, integer-coded in-memory representation of the salary dataset.
+
+Each categorical column is stored as small integer codes (``int8`` or
+``int16``) into a sorted per-column dictionary, salaries as ``int32`` and
+years as ``int16``. Filters and group keys work directly on the codes;
+pandas frames are materialized on demand, usually for a slice of rows only.
+
+A table can be saved as one ``.npy`` file per column plus a JSON sidecar
+and reopened memory-mapped, so every local process shares one read-only
+copy of the columns through the OS page cache.
+"""
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CATEGORICAL_COLUMNS = [
+    "experience_level",
+    "employment_type",
+    "job_title",
+    "salary_currency",
+    "employee_residence",
+    "remote_ratio",
+    "company_location",
+    "company_size",
+]
+
+NUMERIC_COLUMNS = {
+    "work_year": np.int16,
+    "salary": np.int32,
+    "salary_in_usd": np.int32,
+}
+
+# Numeric columns spanning at most this many values group without a sort.
+SMALL_RANGE = 4096
+
+# Column order of ds_salaries.csv.
+SOURCE_COLUMNS = [
+    "work_year",
+    "experience_level",
+    "employment_type",
+    "job_title",
+    "salary",
+    "salary_currency",
+    "salary_in_usd",
+    "employee_residence",
+    "remote_ratio",
+    "company_location",
+    "company_size",
+]
+
+# Number of identical source rows each row stands for, added by ingest
+# (``ingest.DuplicateCounter``); aggregations can use it as a weight.
+WEIGHT_COLUMN = "dup_count"
+
+# Label columns added by ``utils.add_label_columns``: one label per source
+# value, so they are stored as a dictionary over the source column's codes.
+LABEL_COLUMNS = {
+    "experience_label": "experience_level",
+    "employment_label": "employment_type",
+    "size_label": "company_size",
+    "remote_label": "remote_ratio",
+}
+
+
+META_FILE = "meta.json"
+
+
+def _code_dtype(n_values: int):
+    for dtype in (np.int8, np.int16):
+        if n_values <= np.iinfo(dtype).max:
+            return dtype
+    return np.int32
+
+
+def _dictionary_dtype(values: list):
+    return object if any(isinstance(v, str) for v in values) else None
+
+
+def _numeric_array(values, dtype) -> np.ndarray:
+    values = np.asarray(values)
+    info = np.iinfo(dtype)
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        dtype = np.int64
+    return values.astype(dtype)
+
+
+class CompactTable:
+    """Integer-coded columns plus a shared dictionary per categorical column."""
+
+    def __init__(self, codes: dict, dictionaries: dict, numeric: dict,
+                 labels: dict = None, attrs: dict = None):
+        self.codes = codes
+        self.dictionaries = dictionaries
+        self.numeric = numeric
+        self.labels = labels or {}
+        self.attrs = dict(attrs or {})
+        self._orders = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "CompactTable":
+        codes, dictionaries, numeric, labels = {}, {}, {}, {}
+        for col in CATEGORICAL_COLUMNS:
+            col_codes, uniques = pd.factorize(df[col], sort=True)
+            codes[col] = col_codes.astype(_code_dtype(len(uniques)))
+            dictionaries[col] = np.asarray(uniques)
+        for col, dtype in NUMERIC_COLUMNS.items():
+            numeric[col] = _numeric_array(df[col].to_numpy(), dtype)
+        if WEIGHT_COLUMN in df.columns:
+            numeric[WEIGHT_COLUMN] = _numeric_array(df[WEIGHT_COLUMN].to_numpy(), np.int32)
+        for label, source in LABEL_COLUMNS.items():
+            if label in df.columns:
+                # First row of each source code carries that code's label.
+                _, first = np.unique(codes[source], return_index=True)
+                labels[label] = np.asarray(df[label].to_numpy()[first], dtype=object)
+        return cls(codes, dictionaries, numeric, labels=labels, attrs=df.attrs)
+
+    def save(self, directory) -> Path:
+        """Write the columns to ``directory`` for ``open``.
+
+        The files are written to a temporary sibling directory and renamed
+        into place, so concurrent writers never expose a partial table.
+        """
+        directory = Path(directory)
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{directory.name}-", dir=directory.parent))
+        try:
+            os.chmod(tmp, 0o755)  # readable by server processes of other users
+            for col, values in {**self.codes, **self.numeric}.items():
+                np.save(tmp / f"{col}.npy", values)
+            meta = {
+                "codes": list(self.codes),
+                "numeric": list(self.numeric),
+                "dictionaries": {col: d.tolist() for col, d in self.dictionaries.items()},
+                "labels": {col: d.tolist() for col, d in self.labels.items()},
+                "attrs": self.attrs,
+            }
+            (tmp / META_FILE).write_text(json.dumps(meta))
+            os.rename(tmp, directory)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not (directory / META_FILE).exists():
+                raise
+        return directory
+
+    @classmethod
+    def open(cls, directory, mmap_mode: str = "r") -> "CompactTable":
+        """Open a saved table; columns are read-only memory maps by default."""
+        directory = Path(directory)
+        meta = json.loads((directory / META_FILE).read_text())
+
+        def load(col):
+            # Plain ndarray views over the map, so results never come back as memmaps.
+            return np.asarray(np.load(directory / f"{col}.npy", mmap_mode=mmap_mode))
+
+        return cls(
+            {col: load(col) for col in meta["codes"]},
+            {col: np.asarray(values, dtype=_dictionary_dtype(values)) for col, values in meta["dictionaries"].items()},
+            {col: load(col) for col in meta["numeric"]},
+            labels={col: np.asarray(values, dtype=object) for col, values in meta["labels"].items()},
+            attrs=meta["attrs"],
+        )
+
+    def __len__(self):
+        return len(self.numeric["salary_in_usd"])
+
+    @property
+    def columns(self) -> list:
+        weights = [WEIGHT_COLUMN] if WEIGHT_COLUMN in self.numeric else []
+        return SOURCE_COLUMNS + weights + list(self.labels)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = list(self.codes.values()) + list(self.numeric.values())
+        return sum(a.nbytes for a in arrays) + sum(d.nbytes for d in self.dictionaries.values())
+
+    def cardinality(self, col: str) -> int:
+        return len(self.dictionaries[col])
+
+    def values(self, col: str) -> list:
+        """Distinct values of a column, sorted."""
+        if col in self.dictionaries:
+            return self.dictionaries[col].tolist()
+        return np.unique(self.numeric[col]).tolist()
+
+    def key_codes(self, col: str):
+        """``(codes, values)`` for grouping on any column; ``values[codes]`` decodes."""
+        if col in self.codes:
+            return self.codes[col], self.dictionaries[col]
+        if col in self.labels:
+            return self.codes[LABEL_COLUMNS[col]], self.labels[col]
+        column = self.numeric[col]
+        if len(column) and int(column.max()) - int(column.min()) <= SMALL_RANGE:
+            # Small integer range (work_year): offsets from the minimum are
+            # codes without a sort; values absent from the rows simply get no rows.
+            low = column.min()
+            return (column - low).astype(np.intp), np.arange(low, column.max() + 1, dtype=column.dtype)
+        values, codes = np.unique(column, return_inverse=True)
+        return codes, values
+
+    def value_counts(self, col: str) -> pd.Series:
+        """Row count per value present in a categorical column, most frequent first.
+
+        Ties keep first-appearance order, matching ``Series.value_counts``.
+        """
+        codes = self.codes[col]
+        counts = np.bincount(codes, minlength=self.cardinality(col))
+        first = np.full(len(counts), len(codes))
+        first[codes[::-1]] = np.arange(len(codes))[::-1]
+        order = np.lexsort((first, -counts))
+        order = order[counts[order] > 0]
+        return pd.Series(counts[order], index=self.dictionaries[col][order])
+
+    def encode(self, col: str, values) -> np.ndarray:
+        """Codes for ``values``; values absent from the dictionary are dropped."""
+        index = pd.Index(self.dictionaries[col])
+        codes = index.get_indexer(pd.Index(list(values)).unique())
+        return codes[codes >= 0]
+
+    def column_mask(self, col: str, values) -> np.ndarray:
+        """Boolean row mask for ``col in values``, via a per-code lookup table."""
+        if col in self.codes:
+            lookup = np.zeros(self.cardinality(col), dtype=bool)
+            lookup[self.encode(col, values)] = True
+            return lookup[self.codes[col]]
+        return np.isin(self.numeric[col], np.asarray(list(values)))
+
+    def mask(self, filters: dict) -> np.ndarray:
+        """Rows matching every non-empty filter (same semantics as ``filter_dataframe``)."""
+        mask = np.ones(len(self), dtype=bool)
+        for col, values in filters.items():
+            if values is not None and len(values) > 0:
+                mask &= self.column_mask(col, values)
+        return mask
+
+    def filter_rows(self, filters: dict) -> np.ndarray:
+        return np.flatnonzero(self.mask(filters))
+
+    def _sort_keys(self, col: str) -> np.ndarray:
+        """Per-row keys that sort like ``col``: its values, or the rank of each code's value."""
+        if col in self.numeric:
+            return self.numeric[col]
+        codes, values = self.key_codes(col)
+        # Label dictionaries are not sorted: rank each code's value first.
+        ranks = np.empty(len(values), dtype=np.intp)
+        ranks[np.argsort(values, kind="stable")] = np.arange(len(values))
+        return ranks[codes]
+
+    def sort_order(self, col: str, descending: bool = False) -> np.ndarray:
+        """Row positions ordered by ``col``, ties in row order in both directions.
+
+        Computed once per column and direction and kept with the table, so
+        re-sorting a filtered view costs one pass over the rows instead of a
+        sort.
+        """
+        order = self._orders.get((col, descending))
+        if order is None:
+            keys = self._sort_keys(col)
+            # Reversing the ascending order would reverse ties as well.
+            order = np.argsort(-keys if descending else keys, kind="stable")
+            self._orders[(col, descending)] = order
+        return order
+
+    def sorted_rows(self, col: str, mask: np.ndarray = None, descending: bool = False) -> np.ndarray:
+        """Positions of the rows selected by ``mask`` (all rows if None), ordered by ``col``."""
+        order = self.sort_order(col, descending)
+        return order if mask is None else order[mask[order]]
+
+    def take(self, rows) -> "CompactTable":
+        """A new table holding only ``rows`` (positions or boolean mask)."""
+        return CompactTable(
+            {col: codes[rows] for col, codes in self.codes.items()},
+            self.dictionaries,
+            {col: values[rows] for col, values in self.numeric.items()},
+            labels=self.labels,
+            attrs=self.attrs,
+        )
+
+    def column(self, col: str, rows=None) -> np.ndarray:
+        """Decoded values of one column, optionally for a subset of rows."""
+        if col in self.numeric:
+            values = self.numeric[col]
+            return values if rows is None else values[rows]
+        if col in self.labels:
+            codes = self.codes[LABEL_COLUMNS[col]]
+            dictionary = self.labels[col]
+        else:
+            codes = self.codes[col]
+            dictionary = self.dictionaries[col]
+        if rows is not None:
+            codes = codes[rows]
+        return dictionary[codes]
+
+    def to_frame(self, rows=None, columns=None) -> pd.DataFrame:
+        """Materialize a pandas frame shaped like ``load_data`` output."""
+        columns = columns or self.columns
+        df = pd.DataFrame({col: self.column(col, rows) for col in columns}, columns=columns)
+        df.attrs.update(self.attrs)
+        return df
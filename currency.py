@@ -0,0 +1,141 @@
+"""Salary currency conversion.
+
+Rates live in a local, year-keyed table (``fx_rates.csv``: units of each
+currency per US dollar) derived from the dataset's own ``salary`` /
+``salary_in_usd`` pairs. Conversion is vectorized: currencies and years are
+mapped to integer codes once and rates are gathered from a dense
+``[year, currency]`` matrix.
+
+Regenerate the table from the dataset with ``python currency.py``.
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ingest import read_source
+from utils import DATA_PATH
+
+FX_PATH = Path(__file__).parent / "fx_rates.csv"
+
+BASE_CURRENCY = "USD"
+
+
+class FxTable:
+    """Dense ``[year, currency]`` matrix of units per US dollar."""
+
+    def __init__(self, years, currencies, rates):
+        self.years = np.asarray(years, dtype=np.int64)
+        self.currencies = list(currencies)
+        self.rates = np.asarray(rates, dtype=np.float64)
+        self._codes = {c: i for i, c in enumerate(self.currencies)}
+
+    @classmethod
+    def from_frame(cls, rates: pd.DataFrame) -> "FxTable":
+        """Build from long-form ``year, currency, units_per_usd`` rows.
+
+        Years missing for a currency take the nearest available year's rate.
+        """
+        wide = rates.pivot(index="year", columns="currency", values="units_per_usd").sort_index()
+        wide = wide.ffill().bfill()
+        wide[BASE_CURRENCY] = 1.0
+        return cls(wide.index, list(wide.columns), wide.to_numpy())
+
+    @classmethod
+    def load(cls, path=FX_PATH) -> "FxTable":
+        return cls.from_frame(pd.read_csv(path))
+
+    @classmethod
+    def derive(cls, df: pd.DataFrame) -> "FxTable":
+        """Median ``salary / salary_in_usd`` per year and currency."""
+        return cls.from_frame(derive_rates(df))
+
+    def currency_codes(self, currencies) -> np.ndarray:
+        """Integer codes for a column of currency strings (unknown -> ``KeyError``)."""
+        categorical = pd.Categorical(currencies, categories=self.currencies)
+        codes = np.asarray(categorical.codes)
+        if (codes < 0).any():
+            unknown = sorted(set(pd.Series(currencies)[codes < 0].astype(str)))
+            raise KeyError(f"No FX rate for currency: {', '.join(unknown)}")
+        return codes
+
+    def year_codes(self, years) -> np.ndarray:
+        """Row index per year; years outside the table use the nearest one."""
+        idx = np.searchsorted(self.years, np.asarray(years, dtype=np.int64))
+        return np.clip(idx, 0, len(self.years) - 1)
+
+    def rate(self, currency: str, year: int = None) -> float:
+        """Units of ``currency`` per US dollar (latest year by default)."""
+        row = len(self.years) - 1 if year is None else self.year_codes([year])[0]
+        return float(self.rates[row, self._codes[currency]])
+
+    def convert(self, amounts, from_currencies, years, to_currency: str = BASE_CURRENCY) -> np.ndarray:
+        """Convert a column of amounts in mixed currencies to ``to_currency``."""
+        rows = self.year_codes(years)
+        usd = np.asarray(amounts, dtype=np.float64) / self.rates[rows, self.currency_codes(from_currencies)]
+        if to_currency == BASE_CURRENCY:
+            return usd
+        return usd * self.rates[rows, self._codes[to_currency]]
+
+    def from_usd(self, amounts_usd, to_currency: str, years=None) -> np.ndarray:
+        """Scale USD amounts to ``to_currency`` (per-row years, or latest)."""
+        amounts_usd = np.asarray(amounts_usd, dtype=np.float64)
+        col = self._codes[to_currency]
+        if years is None:
+            return amounts_usd * self.rates[-1, col]
+        return amounts_usd * self.rates[self.year_codes(years), col]
+
+    def to_frame(self) -> pd.DataFrame:
+        wide = pd.DataFrame(self.rates, index=self.years, columns=self.currencies)
+        wide.index.name = "year"
+        return wide.reset_index().melt(id_vars="year", var_name="currency", value_name="units_per_usd")
+
+
+def derive_rates(df: pd.DataFrame) -> pd.DataFrame:
+    """Long-form rate table from a frame with ``salary`` and ``salary_in_usd``."""
+    ratio = df["salary"] / df["salary_in_usd"].where(df["salary_in_usd"] > 0)
+    rates = (
+        ratio.groupby([df["work_year"], df["salary_currency"]])
+        .median()
+        .dropna()
+        .rename("units_per_usd")
+        .reset_index()
+        .rename(columns={"work_year": "year", "salary_currency": "currency"})
+    )
+    return rates
+
+
+_default_table = None
+
+
+def default_table() -> FxTable:
+    """The shipped rate table, falling back to rates derived from the dataset."""
+    global _default_table
+    if _default_table is None:
+        if FX_PATH.exists():
+            _default_table = FxTable.load(FX_PATH)
+        else:
+            _default_table = FxTable.derive(read_source(DATA_PATH))
+    return _default_table
+
+
+def salaries_in(df: pd.DataFrame, currency: str = BASE_CURRENCY, table: FxTable = None) -> np.ndarray:
+    """``salary`` converted from each row's ``salary_currency`` to ``currency``."""
+    table = table or default_table()
+    return table.convert(df["salary"], df["salary_currency"], df["work_year"], currency)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild fx_rates.csv from the dataset.")
+    parser.add_argument("--source", type=Path, default=DATA_PATH)
+    parser.add_argument("--output", type=Path, default=FX_PATH)
+    args = parser.parse_args(argv)
+
+    table = FxTable.derive(pd.read_csv(args.source))
+    table.to_frame().sort_values(["year", "currency"]).to_csv(args.output, index=False, float_format="%.6f")
+    print(f"Wrote {len(table.years)} years x {len(table.currencies)} currencies to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Alternative encodings of the categorical model features.
+
+The notebook one-hot encodes every categorical column into a dense matrix of
+about 560 columns, most of them levels of the ``cluster`` key. Two cheaper
+encodings are available to the training pipeline:
+
+* ``sparse``: the same one-hot columns as a CSR matrix, so fitting and
+  memory scale with the non-zeros instead of the width;
+* ``target``: each categorical column becomes two numbers, the smoothed mean
+  log salary of its value (computed out of fold on training rows, so a row
+  never sees its own target) and the value's frequency.
+
+Trees are invariant to per-feature scaling, so neither path applies the
+``MinMaxScaler`` the dense path inherited from the notebook.
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.model_selection import KFold
+
+from features import CATEGORICAL_COLUMNS, NUMERIC_FEATURES
+
+DEFAULT_SMOOTHING = 20.0
+DEFAULT_FOLDS = 5
+RANDOM_STATE = 17
+
+
+def _numeric_block(frame: pd.DataFrame) -> np.ndarray:
+    return np.nan_to_num(frame[NUMERIC_FEATURES].to_numpy(dtype=np.float64, na_value=np.nan))
+
+
+class OneHotEncoding:
+    """``get_dummies(drop_first=True)`` columns with a fixed vocabulary.
+
+    Feature names match ``training_matrix``, so models trained on either
+    output are served by ``ProfileFeaturizer`` unchanged.
+    """
+
+    name = "onehot"
+
+    def __init__(self, sparse_output: bool = False):
+        self.sparse_output = sparse_output
+        self.vocabularies = {}
+
+    @property
+    def feature_names(self) -> list:
+        return NUMERIC_FEATURES + [
+            f"{col}_{value}" for col, values in self.vocabularies.items() for value in values
+        ]
+
+    def fit(self, frame: pd.DataFrame, y=None) -> "OneHotEncoding":
+        for col in CATEGORICAL_COLUMNS:
+            # Levels sorted as get_dummies sorts them; the first is dropped.
+            self.vocabularies[col] = sorted(frame[col].dropna().unique().tolist())[1:]
+        return self
+
+    def fit_transform(self, frame: pd.DataFrame, y=None):
+        return self.fit(frame, y).transform(frame)
+
+    def transform(self, frame: pd.DataFrame):
+        n_rows = len(frame)
+        numeric = _numeric_block(frame)
+        rows, cols = [], []
+        offset = numeric.shape[1]
+        for col, values in self.vocabularies.items():
+            codes = pd.Index(values).get_indexer(frame[col])
+            known = np.flatnonzero(codes >= 0)
+            rows.append(known)
+            cols.append(codes[known] + offset)
+            offset += len(values)
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+
+        if not self.sparse_output:
+            X = np.zeros((n_rows, offset), dtype=np.float32)
+            X[:, :numeric.shape[1]] = numeric
+            X[rows, cols] = 1.0
+            return X
+        numeric_rows, numeric_cols = np.nonzero(numeric)
+        return sparse.csr_matrix(
+            (
+                np.concatenate([numeric[numeric_rows, numeric_cols], np.ones(len(rows))]).astype(np.float32),
+                (np.concatenate([numeric_rows, rows]), np.concatenate([numeric_cols, cols])),
+            ),
+            shape=(n_rows, offset),
+        )
+
+    def state(self):
+        return None  # ProfileFeaturizer rebuilds one-hot columns from the feature names
+
+
+class TargetEncoding:
+    """Out-of-fold smoothed target mean plus frequency per categorical column.
+
+    A value seen ``n`` times with target sum ``s`` encodes as
+    ``(s + smoothing * prior) / (n + smoothing)``; unseen values get the
+    prior and frequency 0.
+    """
+
+    name = "target"
+
+    def __init__(self, smoothing: float = DEFAULT_SMOOTHING, n_folds: int = DEFAULT_FOLDS,
+                 seed: int = RANDOM_STATE):
+        self.smoothing = smoothing
+        self.n_folds = n_folds
+        self.seed = seed
+        self.prior = 0.0
+        self.tables = {}
+
+    @property
+    def feature_names(self) -> list:
+        return NUMERIC_FEATURES + [
+            f"{col}__{kind}" for col in CATEGORICAL_COLUMNS for kind in ("target", "freq")
+        ]
+
+    def _smoothed(self, sums, counts, prior):
+        return (sums + self.smoothing * prior) / (counts + self.smoothing)
+
+    def fit(self, frame: pd.DataFrame, y) -> "TargetEncoding":
+        y = np.asarray(y, dtype=np.float64)
+        self.prior = float(y.mean())
+        for col in CATEGORICAL_COLUMNS:
+            codes, values = pd.factorize(frame[col])
+            counts = np.bincount(codes, minlength=len(values))
+            sums = np.bincount(codes, weights=y, minlength=len(values))
+            self.tables[col] = {
+                "values": values.tolist(),
+                "target": self._smoothed(sums, counts, self.prior).tolist(),
+                "freq": (counts / len(y)).tolist(),
+            }
+        return self
+
+    def fit_transform(self, frame: pd.DataFrame, y) -> np.ndarray:
+        """Fit on all rows, but encode each row from the other folds only."""
+        y = np.asarray(y, dtype=np.float64)
+        self.fit(frame, y)
+        X = self.transform(frame)
+        folds = list(KFold(self.n_folds, shuffle=True, random_state=self.seed).split(frame))
+        offset = len(NUMERIC_FEATURES)
+        for i, col in enumerate(CATEGORICAL_COLUMNS):
+            codes, values = pd.factorize(frame[col])
+            counts = np.bincount(codes, minlength=len(values))
+            sums = np.bincount(codes, weights=y, minlength=len(values))
+            for train, val in folds:
+                # Totals minus the held-out fold's rows: statistics of the other folds.
+                out_counts = counts - np.bincount(codes[val], minlength=len(values))
+                out_sums = sums - np.bincount(codes[val], weights=y[val], minlength=len(values))
+                prior = y[train].mean()
+                X[val, offset + 2 * i] = self._smoothed(out_sums, out_counts, prior)[codes[val]]
+        return X
+
+    def transform(self, frame: pd.DataFrame) -> np.ndarray:
+        numeric = _numeric_block(frame)
+        X = np.empty((len(frame), numeric.shape[1] + 2 * len(CATEGORICAL_COLUMNS)), dtype=np.float64)
+        X[:, :numeric.shape[1]] = numeric
+        offset = numeric.shape[1]
+        for i, col in enumerate(CATEGORICAL_COLUMNS):
+            table = self.tables[col]
+            codes = pd.Index(table["values"]).get_indexer(frame[col])
+            known = codes >= 0
+            X[:, offset + 2 * i] = np.where(known, np.asarray(table["target"])[codes], self.prior)
+            X[:, offset + 2 * i + 1] = np.where(known, np.asarray(table["freq"])[codes], 0.0)
+        return X
+
+    def state(self) -> dict:
+        """JSON-serializable parameters, stored in the model artifact."""
+        return {"type": self.name, "smoothing": self.smoothing, "prior": self.prior, "tables": self.tables}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "TargetEncoding":
+        encoder = cls(smoothing=state["smoothing"])
+        encoder.prior = state["prior"]
+        encoder.tables = state["tables"]
+        return encoder
+
+
+ENCODINGS = {
+    "onehot": OneHotEncoding,
+    "sparse": lambda: OneHotEncoding(sparse_output=True),
+    "target": TargetEncoding,
+}
+
+
+def make_encoder(name: str):
+    if name not in ENCODINGS:
+        raise ValueError(f"Unknown encoding {name!r}; expected one of {', '.join(ENCODINGS)}")
+    return ENCODINGS[name]()
+
+
+def encode_folds(frame: pd.DataFrame, y, name: str, n_folds: int = DEFAULT_FOLDS,
+                 seed: int = RANDOM_STATE) -> list:
+    """``(X_train, y_train, X_val, y_val)`` per fold, the encoder fitted on each training fold.
+
+    Uses the same splits as ``tuning.encode_folds``, so scores are comparable.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    folds = []
+    for train, val in KFold(n_folds, shuffle=True, random_state=seed).split(frame):
+        encoder = make_encoder(name)
+        X_train = encoder.fit_transform(frame.iloc[train], y[train])
+        folds.append((X_train, y[train], encoder.transform(frame.iloc[val]), y[val]))
+    return folds
+
+
+def from_state(state: dict):
+    """Rebuild a fitted encoder from ``state()`` output."""
+    if state["type"] == TargetEncoding.name:
+        return TargetEncoding.from_state(state)
+    raise ValueError(f"Unknown encoder type {state['type']!r}")
@@ -0,0 +1,302 @@
+"""Salary estimation logic shared by the prediction page and the HTTP service."""
+import logging
+
+import numpy as np
+import pandas as pd
+
+import encoders
+from compact import CompactTable
+from features import GROUP_KEYS, ORDINAL_ENCODINGS, ProfileFeaturizer, generate_features
+from neighbors import ProfileIndex
+from titles import TrigramIndex
+from utils import read_model, read_salaries
+
+logger = logging.getLogger(__name__)
+
+# Profile fields matched exactly when looking up comparable records.
+FILTER_FIELDS = [
+    "job_title",
+    "experience_level",
+    "employment_type",
+    "remote_ratio",
+    "company_location",
+    "company_size",
+]
+
+REQUIRED_FIELDS = ["job_title", "experience_level"]
+# Closest titles named when a request's job title matches none.
+TITLE_SUGGESTIONS = 3
+
+# Below this many exact matches, statistics come from the nearest profiles,
+# taken until they hold at least ``NEIGHBOUR_ROWS`` records.
+MIN_MATCHES = 3
+NEIGHBOUR_ROWS = 10
+
+# Fields the what-if panel varies one at a time.
+WHAT_IF_FIELDS = ["experience_level", "company_size", "remote_ratio", "company_location"]
+
+PROFILE_DEFAULTS = {
+    "employment_type": "FT",
+    "company_size": "M",
+    "remote_ratio": 100,
+    "company_location": "US",
+}
+
+
+def get_salary_stats(df: pd.DataFrame, filters: dict) -> dict:
+    """Calculate salary statistics for the given filters."""
+    mask = pd.Series(True, index=df.index)
+    for col, value in filters.items():
+        if value is not None:
+            mask &= df[col] == value
+
+    matched = df[mask]
+    if len(matched) < 3:
+        # Relax filters: use only job_title and experience_level
+        mask = pd.Series(True, index=df.index)
+        for col in ["job_title", "experience_level"]:
+            if col in filters and filters[col] is not None:
+                mask &= df[col] == filters[col]
+        matched = df[mask]
+
+    if matched.empty:
+        return None
+
+    salary = matched["salary_in_usd"]
+    return {
+        "mean": salary.mean(),
+        "median": salary.median(),
+        "min": salary.min(),
+        "max": salary.max(),
+        "q25": salary.quantile(0.25),
+        "q75": salary.quantile(0.75),
+        "count": len(matched),
+        "std": salary.std(),
+    }
+
+
+def stats_from_salaries(salaries: np.ndarray) -> dict:
+    """``get_salary_stats`` output for an array of matched salaries."""
+    salaries = np.asarray(salaries, dtype=np.float64)
+    q25, median, q75 = np.quantile(salaries, [0.25, 0.5, 0.75])
+    return {
+        "mean": salaries.mean(),
+        "median": median,
+        "min": salaries.min(),
+        "max": salaries.max(),
+        "q25": q25,
+        "q75": q75,
+        "count": len(salaries),
+        "std": salaries.std(ddof=1) if len(salaries) > 1 else np.nan,
+    }
+
+
+def profile_salaries(index: ProfileIndex, profile: dict):
+    """``(salaries, exact)``: the exact matches on ``FILTER_FIELDS``, or the nearest profiles' records.
+
+    Replaces the job title x experience fallback of ``get_salary_stats``
+    with the records most similar to the whole profile.
+    """
+    salaries = index.salaries_of(index.matching(profile, FILTER_FIELDS))
+    if len(salaries) >= MIN_MATCHES:
+        return salaries, True
+    return index.salaries_of(index.similar(profile, NEIGHBOUR_ROWS)), False
+
+
+def what_if(index: ProfileIndex, profile: dict, options: dict) -> pd.DataFrame:
+    """Estimated median salary of every single-field variant of ``profile``.
+
+    ``options`` maps each varied field to its values. The exact matches of
+    all values of a field come from one ``ProfileIndex.vary`` pass. Values
+    with fewer than ``MIN_MATCHES`` matches fall back to the nearest
+    profiles that hold the value (``ProfileIndex.vary_similar``); when even
+    those have fewer than ``MIN_MATCHES`` records, or the value is not in
+    the data, the estimate is NaN (insufficient data). Columns: ``field``,
+    ``value``, ``estimate``, ``count``, ``exact`` and ``current`` (the
+    profile's own value).
+    """
+    frames = []
+    for field, values in options.items():
+        values = list(values)
+        counts, medians = index.vary(profile, field, FILTER_FIELDS)
+        codes = pd.Index(index.dictionaries[field]).get_indexer(pd.Index(values))
+        counts = np.where(codes >= 0, counts[codes], 0)
+        estimates = np.where(codes >= 0, medians[codes], np.nan)
+        exact = counts >= MIN_MATCHES
+        sparse = np.flatnonzero(~exact)
+        if len(sparse):
+            similar_counts, similar_medians = index.vary_similar(
+                profile, field, [values[i] for i in sparse], NEIGHBOUR_ROWS
+            )
+            counts[sparse] = similar_counts
+            estimates[sparse] = np.where(similar_counts >= MIN_MATCHES, similar_medians, np.nan)
+        frames.append(pd.DataFrame({
+            "field": field,
+            "value": pd.Series(values, dtype=object),
+            "estimate": estimates,
+            "count": counts,
+            "exact": exact,
+            "current": [value == profile.get(field) for value in values],
+        }))
+    columns = ["field", "value", "estimate", "count", "exact", "current"]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def normalize_profile(profile: dict) -> dict:
+    """Validate a request profile and fill in defaults.
+
+    Raises ``ValueError`` for missing required fields, unknown keys and
+    values outside the ordinal encodings (``features.ORDINAL_ENCODINGS``).
+    """
+    missing = [field for field in REQUIRED_FIELDS if profile.get(field) is None]
+    if missing:
+        raise ValueError(f"Missing required field(s): {', '.join(missing)}")
+    unknown = set(profile) - set(GROUP_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+
+    normalized = {**PROFILE_DEFAULTS, **{k: v for k, v in profile.items() if v is not None}}
+    for field in ("remote_ratio", "work_year"):
+        if field in normalized:
+            try:
+                normalized[field] = int(normalized[field])
+            except (TypeError, ValueError):
+                raise ValueError(f"{field} must be an integer, not {normalized[field]!r}") from None
+    for field, mapping in ORDINAL_ENCODINGS.items():
+        if normalized[field] not in mapping:
+            allowed = ", ".join(str(value) for value in mapping)
+            raise ValueError(f"Unknown {field} {normalized[field]!r}; expected one of {allowed}")
+    normalized.setdefault("employee_residence", normalized["company_location"])
+    return normalized
+
+
+class ModelScorer:
+    """The saved GBM with its scaler and a featurizer for request profiles."""
+
+    def __init__(self, model, scaler, featurizer: ProfileFeaturizer):
+        self.model = model
+        self.scaler = scaler
+        self.featurizer = featurizer
+
+    @classmethod
+    def from_training_data(cls, model, scaler, df: pd.DataFrame) -> "ModelScorer":
+        reference = generate_features(df)
+        state = getattr(scaler, "encoder", None)
+        encoder = encoders.from_state(state) if state else None
+        return cls(model, scaler, ProfileFeaturizer(reference, scaler.feature_names_in_, encoder=encoder))
+
+    def predict(self, profiles: pd.DataFrame) -> np.ndarray:
+        """Estimated USD salaries, one per profile row."""
+        X = self.featurizer.transform(profiles)
+        # MinMaxScaler.transform, without the feature-name checks.
+        X = X * self.scaler.scale_ + self.scaler.min_
+        return np.exp(self.model.predict(X))
+
+
+class SalaryEstimator:
+    """Dataset statistics plus optional model scoring, loaded once per process."""
+
+    def __init__(self, df: pd.DataFrame, scorer: ModelScorer = None):
+        self.df = df
+        self.scorer = scorer
+        self.default_year = int(df["work_year"].max())
+        # Salaries per exact filter combination, so a lookup does not scan the
+        # frame; sparse combinations fall back to the nearest profiles.
+        salary = df["salary_in_usd"]
+        self._exact = {
+            key: group.to_numpy() for key, group in salary.groupby([df[c] for c in FILTER_FIELDS])
+        }
+        self.neighbors = ProfileIndex(CompactTable.from_frame(df))
+        self.titles = TrigramIndex(sorted(df["job_title"].unique()))
+
+    @classmethod
+    def load(cls) -> "SalaryEstimator":
+        df = read_salaries()
+        scorer = None
+        try:
+            model, scaler = read_model()
+        except (ImportError, AttributeError, ValueError) as exc:
+            # The pickle is tied to the scikit-learn version that wrote it.
+            logger.warning("Model unavailable, serving statistics only: %s", exc)
+            model, scaler = None, None
+        if model is not None:
+            scorer = ModelScorer.from_training_data(model, scaler, df)
+        return cls(df, scorer)
+
+    def normalize(self, profile: dict) -> dict:
+        """``normalize_profile`` with the job title mapped onto the dataset's spelling.
+
+        Raises ``ValueError`` for a title that matches none of the dataset's
+        titles, naming the closest ones.
+        """
+        normalized = normalize_profile(profile)
+        title = str(normalized["job_title"])
+        matched = self.titles.match(title)
+        if matched is None:
+            closest = ", ".join(repr(t) for t, _ in self.titles.search(title, k=TITLE_SUGGESTIONS))
+            raise ValueError(f"Unknown job_title {title!r}" + (f"; closest: {closest}" if closest else ""))
+        normalized["job_title"] = matched
+        return normalized
+
+    def _profile_frame(self, profiles: list) -> pd.DataFrame:
+        frame = pd.DataFrame(profiles, columns=GROUP_KEYS)
+        frame["work_year"] = frame["work_year"].fillna(self.default_year).astype(int)
+        return frame
+
+    def score(self, profiles: list) -> np.ndarray:
+        """Model estimates for normalized profiles, or None without a model."""
+        if self.scorer is None or not profiles:
+            return None
+        return self.scorer.predict(self._profile_frame(profiles))
+
+    def stats(self, profile: dict) -> dict:
+        """``get_salary_stats`` for a normalized profile, from the lookup tables."""
+        salaries = self._exact.get(tuple(profile[field] for field in FILTER_FIELDS))
+        if salaries is None or len(salaries) < MIN_MATCHES:
+            salaries = self.neighbors.salaries_of(self.neighbors.similar(profile, NEIGHBOUR_ROWS))
+        if len(salaries) == 0:
+            return None
+        return {key: float(value) for key, value in stats_from_salaries(salaries).items()}
+
+    def estimate_batch(self, profiles: list, model_estimates=None) -> list:
+        """Estimates for a list of raw profiles.
+
+        Invalid profiles, unknown job titles included, yield
+        ``{"error": ...}`` entries instead of failing the whole batch.
+        ``requested_title`` is the job title as given and ``matched_title``
+        the dataset title it was mapped onto. ``model_estimates`` may be
+        passed in when scoring was done elsewhere (e.g. by a micro-batcher).
+        """
+        normalized, results = [], []
+        for profile in profiles:
+            try:
+                normalized.append(self.normalize(profile))
+                results.append(None)
+            except ValueError as exc:
+                normalized.append(None)
+                results.append({"error": str(exc)})
+
+        valid = [p for p in normalized if p is not None]
+        if model_estimates is None:
+            model_estimates = self.score(valid)
+        model_iter = iter(model_estimates) if model_estimates is not None else None
+
+        for i, profile in enumerate(normalized):
+            if profile is None:
+                continue
+            stats = self.stats(profile)
+            results[i] = {
+                "profile": profile,
+                "requested_title": str(profiles[i]["job_title"]),
+                "matched_title": profile["job_title"],
+                "estimate": stats["median"] if stats else None,
+                "model_estimate": float(next(model_iter)) if model_iter is not None else None,
+                "stats": stats,
+            }
+        return results
+
+    def estimate(self, profile: dict) -> dict:
+        result = self.estimate_batch([profile])[0]
+        if "error" in result:
+            raise ValueError(result["error"])
+        return result
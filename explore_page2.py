@@ -3,6 +3,35 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import plotly.express as px
 import altair as alt
+from aggregate import group_stats
+from query import cached_group_stats, column_rows, select, values_in_order
+from utils import load_table
+
+SUNBURST_KEYS = ['work_year', 'experience_level', 'employment_type', 'job_title', 'employee_residence', 'remote_ratio',
+                 'company_location', 'company_size']
+
+
+def _mean_by(table, key):
+    """``groupby(key)['salary_in_usd'].mean()`` of a table, as a Series named like it."""
+    means = group_stats(table, key, 'mean')
+    return pd.Series(means['mean'].to_numpy(), index=pd.Index(means[key], name=key), name='salary_in_usd')
+
+
+def _year_labels(frame):
+    """Years as strings, so charts treat them as categories."""
+    return frame.assign(work_year=frame['work_year'].astype(str))
+
+
+def _sunburst_groups(table, locations, job_titles):
+    """Sunburst input from the cached per-group means instead of a per-row transform.
+
+    Every row used to carry its group's mean, and the sunburst sums rows, so
+    one row per group weighted by its row count draws the same chart.
+    """
+    groups = cached_group_stats(table, SUNBURST_KEYS, ('count', 'mean'))
+    groups = groups[groups['company_location'].isin(locations) & groups['job_title'].isin(job_titles)]
+    return groups.assign(country_mean_salary=groups['count'] * groups['mean'])
+
 
 def show_explore_page():
     st.title("Explore Data Scientist Salaries")
@@ -17,16 +46,10 @@ def show_explore_page():
     #                    layout="wide"
     # )
 
-    # df = pd.read_excel(
-    #     io='ds_salaries.xlsx',
-    #     engine='openpyxl',
-    #     sheet_name="ds_salaries (1)",
-    #     skiprows=3,
-    #     usecols='B:R',
-    #     nrows=1000,
-    # )
-    df = pd.read_csv("ds_salaries2.csv")
-    st.dataframe(df)
+    # Excel sources are ingested once (python ingest.py ds_salaries.xlsx),
+    # never parsed here.
+    table = load_table()
+    st.dataframe(table.to_frame())
 
     st.sidebar.header("Please Filter Here:")
 
@@ -46,26 +69,29 @@ def show_explore_page():
 
     Remote_ratio=st.sidebar.multiselect(
         "Select remote type:",
-        options=df["remote_ratio"].unique(),
-        default=df["remote_ratio"].unique()
+        options=values_in_order(table, "remote_ratio"),
+        default=values_in_order(table, "remote_ratio")
     )
-    print(Remote_ratio)
     Company_loc=st.sidebar.multiselect(
         "Select the company location:",
-        options=df["company_location"].unique(),
-        default=df["company_location"].unique()
+        options=values_in_order(table, "company_location"),
+        default=values_in_order(table, "company_location")
     )
 
 
-    df_selection = df.query(
-        "company_location == @Company_loc & job_title == @Job_title & remote_ratio == @Remote_ratio"
-    )
+    # Row indexes instead of df.query; an empty multiselect matches nothing, as before.
+    df_selection = table.take(select(
+        table,
+        {"company_location": Company_loc, "job_title": Job_title, "remote_ratio": Remote_ratio},
+        strict=True,
+    ))
 
 #    st.dataframe(df_selection)
     st.title(":bar_chart: Data Scientist Dashboard")
-    total_salary = df_selection["salary_in_usd"].sum()
-    avarage_salary = round(df_selection["salary_in_usd"].mean(),1)
-    total_employee = round(df_selection["salary_in_usd"].count())
+    salaries = df_selection.column("salary_in_usd").astype("int64")
+    total_salary = salaries.sum()
+    avarage_salary = round(salaries.mean(),1) if len(salaries) else float("nan")
+    total_employee = len(salaries)
 
     left_column,middle_column,right_column = st.columns(3)
     with left_column:
@@ -81,7 +107,7 @@ def show_explore_page():
     st.markdown("---")
 
     job_title_salary = (
-        df_selection.groupby('job_title')['salary_in_usd'].mean().round(0).sort_values(ascending=False).head(15)
+        _mean_by(df_selection, 'job_title').round(0).sort_values(ascending=False).head(15)
     )
 
     fig_job_title_salary = px.bar(
@@ -107,7 +133,7 @@ def show_explore_page():
     st.markdown("---")
 
     job_title_count = (
-        df_selection['job_title'].value_counts()
+        df_selection.value_counts('job_title').rename_axis('job_title').rename('count')
     )
 
     fig_job_title_count = px.bar(
@@ -128,7 +154,7 @@ def show_explore_page():
     )
 
     employment_type_salary = (
-        df_selection.groupby('experience_level')['salary_in_usd'].mean().round(0).nlargest(15).sort_values(ascending = False)
+        _mean_by(df_selection, 'experience_level').round(0).nlargest(15).sort_values(ascending = False)
     )
 
     fig_employment_type_salary = px.bar(
@@ -153,9 +179,9 @@ def show_explore_page():
 
     st.markdown("---")
 
-    df["work_year"]=df["work_year"].astype(str)
+    # Whole-table aggregates are computed once per table and shared by all sessions.
     employment_type_salary_years = (
-        df.groupby(['employment_type','work_year'], as_index=False)['salary_in_usd'].mean().round(0)
+        _year_labels(cached_group_stats(table, ['employment_type','work_year']).rename(columns={'mean': 'salary_in_usd'}).round(0))
     )
 
     fig_employment_type_salary_years = px.bar(
@@ -188,7 +214,7 @@ def show_explore_page():
     st.markdown("---")
 
     avarage_salary_per_year = (
-        df.groupby(['work_year'], as_index=False)['salary_in_usd'].mean().round(0)
+        _year_labels(cached_group_stats(table, 'work_year').rename(columns={'mean': 'salary_in_usd'}).round(0))
     )
 
     fig_avarage_salary_per_year = px.line(avarage_salary_per_year, x="work_year", y="salary_in_usd", title='<b>Avarage Salary Per Years<b>')
@@ -218,7 +244,7 @@ def show_explore_page():
 #    st.plotly_chart(fig_job_title_salary2)
 
     fig_remote_ratio_percent = px.funnel_area(names=['On-Site', 'Half-Remote', 'Full-Remote'],
-                         values=df["remote_ratio"].value_counts(), title='<b>Remote Ratio Graph</b>')
+                         values=table.value_counts("remote_ratio"), title='<b>Remote Ratio Graph</b>')
 
 #    st.plotly_chart(fig_employment_type_percent)
 
@@ -229,18 +255,15 @@ def show_explore_page():
 
     st.markdown("---")
 
-    df['country_mean_salary'] = df.groupby(
-        ['work_year', 'experience_level', 'employment_type', 'job_title', 'employee_residence', 'remote_ratio',
-         'company_location', 'company_size'])['salary_in_usd'].transform('mean')
     rows2 = ["US", "CA", "ES", "DE", "GB", "NG", "IN"]
-    fig_sunburst = px.sunburst(df[df["company_location"].isin(rows2)&df["job_title"].isin(rows)], path=['company_location', 'job_title'], values='country_mean_salary', color='job_title',
+    fig_sunburst = px.sunburst(_sunburst_groups(table, rows2, rows), path=['company_location', 'job_title'], values='country_mean_salary', color='job_title',
                 hover_data=['experience_level'], height=600,title="<b>Sunburst Graph of Avarage Salaries of Countries Based on Job Titles<b>")
 
     st.plotly_chart(fig_sunburst)
 
     st.markdown("---")
 
-    salary_by_country = df.groupby('company_location', as_index=False)['salary_in_usd'].mean()
+    salary_by_country = cached_group_stats(table, 'company_location').rename(columns={'mean': 'salary_in_usd'})
 
     fig_salary_by_country = px.choropleth(salary_by_country, locations='company_location', locationmode='country names',
                         color='salary_in_usd',
@@ -264,7 +287,8 @@ def show_explore_page():
     # fig_strip_salary_job_title =px.strip(df, y="salary_in_usd", color="job_title", hover_name="company_location", facet_col="company_location",
     #          animation_frame="work_year")
 
-    fig_strip_salary_job_title =px.strip(df[df["job_title"].isin(rows)], y="salary_in_usd", color="experience_level", hover_name="job_title", facet_col="job_title",
+    strip_rows = _year_labels(table.to_frame(column_rows(table, "job_title", rows), ["salary_in_usd", "experience_level", "job_title", "work_year"]))
+    fig_strip_salary_job_title =px.strip(strip_rows, y="salary_in_usd", color="experience_level", hover_name="job_title", facet_col="job_title",
              animation_frame="work_year",title="<b>Strip Graph of Avarage Salaries based on Job Titles<b>",width=800)
 
     st.plotly_chart(fig_strip_salary_job_title)
\ No newline at end of file
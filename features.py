@@ -0,0 +1,211 @@
+"""Feature engineering shared by model training and scoring.
+
+``generate_features`` is a vectorized equivalent of
+``predict_page4.generate_df_new``; ``ProfileFeaturizer`` turns request
+profiles into rows of the matrix the saved model was trained on.
+"""
+import numpy as np
+import pandas as pd
+
+from currency import salaries_in
+from utils import TOP_JOB_TITLES
+
+ORDINAL_ENCODINGS = {
+    "experience_level": {"EN": 1, "MI": 2, "SE": 3, "EX": 4},
+    "employment_type": {"FL": 1, "PT": 2, "FT": 3, "CT": 4},
+    "remote_ratio": {0: 1, 50: 2, 100: 3},
+    "company_size": {"S": 1, "M": 2, "L": 3},
+}
+
+# The eight columns that define a salary "group" for the country_* features.
+GROUP_KEYS = [
+    "work_year",
+    "experience_level",
+    "employment_type",
+    "job_title",
+    "employee_residence",
+    "remote_ratio",
+    "company_location",
+    "company_size",
+]
+
+# Columns joined into the ``cluster`` key, in dataset column order.
+CLUSTER_COLUMNS = [
+    "work_year",
+    "experience_level",
+    "employment_type",
+    "job_title",
+    "salary_currency",
+    "employee_residence",
+    "remote_ratio",
+    "company_location",
+    "company_size",
+]
+
+RAW_COLUMNS = [
+    "work_year",
+    "experience_level",
+    "employment_type",
+    "job_title",
+    "salary",
+    "salary_currency",
+    "salary_in_usd",
+    "employee_residence",
+    "remote_ratio",
+    "company_location",
+    "company_size",
+]
+
+GROUP_STATS = ["median", "mean", "min", "max"]
+
+# Categorical columns one-hot encoded by the training notebook.
+CATEGORICAL_COLUMNS = [
+    "job_title",
+    "salary_currency",
+    "employee_residence",
+    "company_location",
+    "cluster",
+    "work_own_country",
+]
+
+# Ordinal and group-stat columns, in the order they appear in the model matrix.
+NUMERIC_FEATURES = [
+    "work_year",
+    "experience_level",
+    "employment_type",
+    "remote_ratio",
+    "company_size",
+    "country_median_salary",
+    "country_min_salary",
+    "country_max_salary",
+]
+
+DEFAULT_CURRENCY = "USD"
+
+
+def encode_ordinals(df: pd.DataFrame) -> pd.DataFrame:
+    """Replace the ordinal categorical columns by their integer codes.
+
+    Codes are nullable integers: an unknown value becomes ``<NA>`` in its
+    own row without turning the column into floats, so one bad row cannot
+    change how the others are written into ``cluster_key``.
+    """
+    for col, mapping in ORDINAL_ENCODINGS.items():
+        df[col] = df[col].map(mapping).astype("Int64")
+    return df
+
+
+def cluster_key(df: pd.DataFrame) -> pd.Series:
+    """``'_'``-joined string of the cluster columns (after ordinal encoding)."""
+    key = df[CLUSTER_COLUMNS[0]].astype(str)
+    for col in CLUSTER_COLUMNS[1:]:
+        key = key + "_" + df[col].astype(str)
+    return key
+
+
+def group_salary(df: pd.DataFrame, stats_currency: str = None) -> pd.Series:
+    """Salary column the ``country_*`` group stats are computed on.
+
+    The saved model was trained on raw ``salary`` in mixed currencies; pass
+    ``stats_currency`` to convert every row to one currency first.
+    """
+    if stats_currency is None:
+        return df["salary"]
+    return pd.Series(salaries_in(df, stats_currency), index=df.index, name="salary")
+
+
+def generate_features(df: pd.DataFrame, stats_currency: str = None) -> pd.DataFrame:
+    """Vectorized ``generate_df_new``: filter, encode and add group features."""
+    df = df.loc[df["job_title"].isin(TOP_JOB_TITLES), RAW_COLUMNS].reset_index(drop=True)
+    salary = group_salary(df, stats_currency)
+    df = encode_ordinals(df)
+    df["cluster"] = cluster_key(df)
+
+    grouped = salary.groupby([df[col] for col in GROUP_KEYS])
+    for stat in GROUP_STATS:
+        df[f"country_{stat}_salary"] = grouped.transform(stat)
+
+    df["work_own_country"] = np.where(
+        df["employee_residence"] == df["company_location"], "Yes", "No"
+    )
+    return df
+
+
+def training_matrix(features: pd.DataFrame):
+    """Model matrix and log-salary target from ``generate_features`` output.
+
+    Numeric features come first, then the one-hot columns with the first
+    level of each dropped, as the training notebook builds them.
+    """
+    X = pd.get_dummies(
+        features[NUMERIC_FEATURES + CATEGORICAL_COLUMNS], columns=CATEGORICAL_COLUMNS, drop_first=True
+    ).astype(np.float64)
+    return X, training_target(features)
+
+
+def training_target(features: pd.DataFrame) -> np.ndarray:
+    """The model's target: log ``salary_in_usd``."""
+    return np.log(features["salary_in_usd"].to_numpy(dtype=np.float64))
+
+
+class ProfileFeaturizer:
+    """Builds model-matrix rows for profiles, aligned to ``feature_names``.
+
+    ``reference`` is the ``generate_features`` output of the training data.
+    A profile's ``country_*_salary`` features come from its exact group in
+    the reference data, falling back to its job title x experience group.
+    Profiles carry no salary currency, so ``DEFAULT_CURRENCY`` is assumed.
+    ``stats_currency`` must match the one used to build ``reference``.
+    ``encoder`` is the fitted ``encoders.py`` encoding of a model not trained
+    on one-hot columns.
+    """
+
+    def __init__(self, reference: pd.DataFrame, feature_names, stats_currency: str = None, encoder=None):
+        self.feature_names = list(feature_names)
+        self.index = {name: i for i, name in enumerate(self.feature_names)}
+        self.encoder = encoder
+
+        stats = {f"country_{s}_salary": s for s in GROUP_STATS}
+        salary = group_salary(reference, stats_currency)
+        self.group_stats = salary.groupby([reference[c] for c in GROUP_KEYS]).agg(list(stats.values()))
+        self.group_stats.columns = list(stats)
+        fallback_keys = ["job_title", "experience_level"]
+        self.fallback_keys = fallback_keys
+        self.fallback_stats = salary.groupby([reference[c] for c in fallback_keys]).agg(list(stats.values()))
+        self.fallback_stats.columns = list(stats)
+
+    def frame(self, profiles: pd.DataFrame) -> pd.DataFrame:
+        """Profiles as encoded columns, before one-hot expansion."""
+        df = encode_ordinals(profiles.copy())
+        if "salary_currency" not in df:
+            df["salary_currency"] = DEFAULT_CURRENCY
+        df["cluster"] = cluster_key(df)
+        df["work_own_country"] = np.where(
+            df["employee_residence"] == df["company_location"], "Yes", "No"
+        )
+
+        exact = self.group_stats.reindex(pd.MultiIndex.from_frame(df[GROUP_KEYS]))
+        fallback = self.fallback_stats.reindex(pd.MultiIndex.from_frame(df[self.fallback_keys]))
+        for col in self.group_stats.columns:
+            df[col] = np.where(
+                exact[col].notna(), exact[col].to_numpy(), fallback[col].to_numpy()
+            )
+        return df
+
+    def transform(self, profiles: pd.DataFrame) -> np.ndarray:
+        """Dense float matrix with one row per profile."""
+        df = self.frame(profiles)
+        if self.encoder is not None:
+            return np.nan_to_num(self.encoder.transform(df))
+        X = np.zeros((len(df), len(self.feature_names)), dtype=np.float64)
+        rows = np.arange(len(df))
+        for col in NUMERIC_FEATURES:
+            if col in self.index:
+                X[:, self.index[col]] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        for col in CATEGORICAL_COLUMNS:
+            cols = np.array(
+                [self.index.get(f"{col}_{value}", -1) for value in df[col]], dtype=np.int64
+            )
+            known = cols >= 0
+            X[rows[known], cols[known]] = 1.0
+        return np.nan_to_num(X)
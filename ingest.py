@@ -0,0 +1,328 @@
+"""One-time ingest of CSV and Excel sources into the app's columnar caches.
+
+The app never parses a spreadsheet at request time: a source is read once,
+validated, and written as the partitioned Parquet dataset and the compact
+table for its dataset version (``utils.parquet_dataset`` /
+``utils.read_table``). Both caches are keyed by the source's content hash,
+so re-running on an unchanged file is a no-op.
+
+Excel workbooks are streamed with openpyxl's read-only mode, which parses
+the sheet XML row by row instead of building the whole workbook in
+memory, and converted ``chunk_rows`` rows at a time. The header row is
+found by name, so leading blank rows and columns (the layout the old
+``read_excel(skiprows=3, usecols='B:R')`` call expected) are skipped, and
+sheets that hold each record as one comma-separated cell, like the shipped
+``ds_salaries.xlsx``, are split. CSV files are read in chunks as well.
+
+Every row is kept by default. With ``SALARY_APP_DUPLICATES=collapse``
+exact duplicate records are collapsed once job titles are canonicalized
+(``DuplicateCounter``): each row is reduced to a 64-bit hash of its
+columns, and only the hashes of the distinct rows are kept. The surviving
+row records its number of copies in ``dup_count``, which
+``aggregate.group_stats(..., weights="dup_count")`` uses to weight by
+submissions.
+
+    python ingest.py ds_salaries.xlsx
+    SALARY_APP_DATA=ds_salaries.xlsx streamlit run app.py
+
+The caches go where the app looks for them (``SALARY_APP_PARQUET_DIR``,
+``SALARY_APP_TABLE_DIR``).
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+import titles
+from compact import SOURCE_COLUMNS, WEIGHT_COLUMN
+
+DEFAULT_CHUNK_ROWS = 50_000
+EXCEL_SUFFIXES = {".xlsx", ".xlsm"}
+INTEGER_COLUMNS = ["work_year", "salary", "salary_in_usd", "remote_ratio"]
+# Coded columns and their valid values.
+ALLOWED_VALUES = {
+    "experience_level": {"EN", "MI", "SE", "EX"},
+    "employment_type": {"FT", "PT", "CT", "FL"},
+    "company_size": {"S", "M", "L"},
+    "remote_ratio": {0, 50, 100},
+}
+MAX_REPORTED_ROWS = 5
+# A duplicate submission repeats every field.
+IDENTITY_COLUMNS = SOURCE_COLUMNS
+DUPLICATE_POLICIES = ("collapse", "keep")
+DUPLICATES = os.environ.get("SALARY_APP_DUPLICATES", "keep")
+# Part of every dataset version: bump when ingest changes the rows it produces.
+INGEST_VERSION = f"titles-{titles.RULES_VERSION}-duplicates-{DUPLICATES}"
+
+
+class SchemaError(ValueError):
+    """The source does not have the columns or values of ``ds_salaries.csv``."""
+
+
+def _invalid(col: str, bad: np.ndarray, line_numbers: np.ndarray, values, reason: str):
+    rows = ", ".join(
+        f"{line} ({value!r})" for line, value in zip(line_numbers[bad][:MAX_REPORTED_ROWS], values[bad][:MAX_REPORTED_ROWS])
+    )
+    more = f" and {bad.sum() - MAX_REPORTED_ROWS} more" if bad.sum() > MAX_REPORTED_ROWS else ""
+    return SchemaError(f"Column {col!r} {reason} at source row {rows}{more}")
+
+
+def validate(chunk: pd.DataFrame, first_line: int = 2) -> pd.DataFrame:
+    """Check and coerce a chunk to the dataset schema.
+
+    ``first_line`` is the 1-based source row of the chunk's first record,
+    used in error messages. Returns the columns in ``SOURCE_COLUMNS``
+    order, integers as ``int64`` and the rest as strings.
+    """
+    missing = [col for col in SOURCE_COLUMNS if col not in chunk.columns]
+    if missing:
+        raise SchemaError(f"Missing column(s): {', '.join(missing)}")
+    line_numbers = np.arange(first_line, first_line + len(chunk))
+    out = {}
+    for col in SOURCE_COLUMNS:
+        values = chunk[col]
+        if col in INTEGER_COLUMNS:
+            numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+            bad = ~np.isfinite(numbers) | (numbers != np.round(numbers))
+            if bad.any():
+                raise _invalid(col, bad, line_numbers, values.to_numpy(), "is not an integer")
+            column = pd.Series(numbers.astype(np.int64), index=chunk.index)
+        else:
+            column = values.astype("str").str.strip()
+            bad = (values.isna() | (column == "")).to_numpy()
+            if bad.any():
+                raise _invalid(col, bad, line_numbers, values.to_numpy(), "is empty")
+        if col in ALLOWED_VALUES:
+            bad = ~column.isin(ALLOWED_VALUES[col]).to_numpy()
+            if bad.any():
+                raise _invalid(col, bad, line_numbers, column.to_numpy(), "has an unknown value")
+        out[col] = column
+    return pd.DataFrame(out, index=chunk.index)
+
+
+def _csv_chunks(path: Path, chunk_rows: int, progress):
+    size = max(path.stat().st_size, 1)
+    done = 0
+    with open(path, "rb") as f:
+        for chunk in pd.read_csv(f, chunksize=chunk_rows, dtype=str, keep_default_na=False, na_values=[""]):
+            yield validate(chunk, first_line=done + 2)
+            done += len(chunk)
+            if progress:
+                progress(done, min(f.tell() / size, 1.0))
+
+
+def _header_layout(row: tuple):
+    """``(packed, positions, cell)`` when ``row`` is the header row, else None.
+
+    ``packed`` is true when the whole record sits in one comma-separated
+    cell, the ``cell``-th; ``positions`` maps each column name to its index
+    in the (split) row.
+    """
+    cells = [str(value).strip() if value is not None else "" for value in row]
+    filled = [i for i, cell in enumerate(cells) if cell]
+    packed = len(filled) == 1 and "," in cells[filled[0]]
+    if packed:
+        cells = [cell.strip() for cell in next(csv.reader([cells[filled[0]]]))]
+    positions = {}
+    for i, cell in enumerate(cells):
+        positions.setdefault(cell, i)
+    if not all(col in positions for col in SOURCE_COLUMNS):
+        return None
+    return packed, positions, filled[0] if packed else None
+
+
+def _excel_chunks(path: Path, chunk_rows: int, progress, sheet: str = None):
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        total = worksheet.max_row or 0
+        rows = worksheet.iter_rows(values_only=True)
+        layout, line = None, 0
+        for row in rows:
+            line += 1
+            layout = _header_layout(row)
+            if layout is not None:
+                break
+        if layout is None:
+            raise SchemaError(
+                f"No header row with columns {', '.join(SOURCE_COLUMNS)} in sheet {worksheet.title!r}"
+            )
+        packed, positions, cell = layout
+        indexes = [positions[col] for col in SOURCE_COLUMNS]
+
+        buffer, first_line, done = [], line + 1, 0
+
+        def flush():
+            chunk = pd.DataFrame(buffer, columns=SOURCE_COLUMNS, dtype=object)
+            return validate(chunk.set_axis(pd.RangeIndex(done, done + len(chunk))), first_line=first_line + done)
+
+        for row in rows:
+            line += 1
+            if packed:
+                if cell >= len(row) or row[cell] is None:
+                    continue
+                row = next(csv.reader([str(row[cell])]))
+            elif all(value is None for value in row):
+                continue
+            buffer.append([row[i] if i < len(row) else None for i in indexes])
+            if len(buffer) == chunk_rows:
+                yield flush()
+                done += len(buffer)
+                buffer = []
+                if progress:
+                    progress(done, min(line / total, 1.0) if total else None)
+        if buffer:
+            yield flush()
+            done += len(buffer)
+        if progress:
+            progress(done, 1.0)
+    finally:
+        workbook.close()
+
+
+def row_hashes(chunk: pd.DataFrame, columns=IDENTITY_COLUMNS) -> np.ndarray:
+    """64-bit hash of each row's ``columns``, computed column-wise (``pd.util.hash_pandas_object``).
+
+    Equal rows hash equal in every chunk, since ``validate`` gives each
+    column one dtype. Two distinct rows collide with probability about
+    ``n**2 / 2**65``, under 1e-5 for ten million rows.
+    """
+    return pd.util.hash_pandas_object(chunk[list(columns)], index=False).to_numpy()
+
+
+class DuplicateCounter:
+    """Finds exact duplicate rows across a stream of chunks in one pass.
+
+    Only the distinct rows' hashes are kept (sorted, for ``searchsorted``
+    lookups), each with the id of its distinct row and that row's number of
+    copies; the chunks themselves can be dropped once seen.
+    """
+
+    def __init__(self, columns=IDENTITY_COLUMNS):
+        self.columns = list(columns)
+        self.rows = 0
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._counts = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._counts)
+
+    @property
+    def duplicates(self) -> int:
+        """Rows seen that repeat an earlier row."""
+        return self.rows - len(self)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Copies of each distinct row, in order of first appearance."""
+        return self._counts.copy()
+
+    def add(self, chunk: pd.DataFrame) -> np.ndarray:
+        """Positions of the chunk's rows not seen before, first copies only, ascending."""
+        unique, first, copies = np.unique(row_hashes(chunk, self.columns), return_index=True, return_counts=True)
+        self.rows += len(chunk)
+        positions = np.searchsorted(self._hashes, unique)
+        seen = positions < len(self._hashes)
+        seen[seen] = self._hashes[positions[seen]] == unique[seen]
+        self._counts[self._ids[positions[seen]]] += copies[seen]
+
+        new = np.flatnonzero(~seen)
+        appearance = np.argsort(first[new], kind="stable")
+        ids = np.empty(len(new), dtype=np.int64)
+        ids[appearance] = len(self._counts) + np.arange(len(new))
+        self._counts = np.concatenate([self._counts, copies[new][appearance]])
+        # ``unique`` is sorted, so inserting at ``positions`` keeps the hashes sorted.
+        self._hashes = np.insert(self._hashes, positions[new], unique[new])
+        self._ids = np.insert(self._ids, positions[new], ids)
+        return first[new][appearance]
+
+
+def iter_chunks(path, chunk_rows: int = DEFAULT_CHUNK_ROWS, sheet: str = None, progress=None):
+    """Validated chunks of a CSV or Excel source.
+
+    ``progress(rows, fraction)`` is called after each chunk, ``fraction``
+    being the share of the file read (None when unknown).
+    """
+    path = Path(path)
+    if path.suffix.lower() in EXCEL_SUFFIXES:
+        return _excel_chunks(path, chunk_rows, progress, sheet)
+    return _csv_chunks(path, chunk_rows, progress)
+
+
+def read_source(path, columns=None, chunk_rows: int = DEFAULT_CHUNK_ROWS, sheet: str = None,
+                progress=None, canonical: bool = True, duplicates: str = DUPLICATES) -> pd.DataFrame:
+    """A whole source as one validated frame, shaped like ``pd.read_csv('ds_salaries.csv')``.
+
+    Job titles are canonicalized (``titles.py``) unless ``canonical`` is
+    false; the mapping needs every title, so it runs once after the last
+    chunk. With ``duplicates="collapse"`` exact duplicate rows are then
+    dropped, keeping the first copy, so rows that differ only in the
+    spelling of their title are merged too; ``dup_count`` holds each row's
+    number of copies (1 for every row with ``"keep"``).
+    """
+    if duplicates not in DUPLICATE_POLICIES:
+        raise ValueError(f"duplicates must be one of {', '.join(DUPLICATE_POLICIES)}, not {duplicates!r}")
+    chunks = list(iter_chunks(path, chunk_rows, sheet, progress))
+    if not chunks:
+        df = validate(pd.DataFrame({col: pd.Series(dtype=object) for col in SOURCE_COLUMNS}))
+    else:
+        df = pd.concat(chunks, ignore_index=True)
+    if canonical:
+        df = titles.canonicalize(df)
+    if duplicates == "collapse":
+        counter = DuplicateCounter()
+        df = df.iloc[counter.add(df)].reset_index(drop=True)
+        df[WEIGHT_COLUMN] = counter.counts
+    else:
+        df[WEIGHT_COLUMN] = np.ones(len(df), dtype=np.int64)
+    return df if columns is None else df[list(columns)]
+
+
+def main(argv=None):
+    import utils
+
+    parser = argparse.ArgumentParser(description="Ingest a CSV or Excel source into the columnar caches.")
+    parser.add_argument("source", type=Path, nargs="?", default=utils.DATA_PATH)
+    parser.add_argument("--sheet", help="worksheet name (default: the first sheet)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    source = args.source
+    start = time.perf_counter()
+
+    def progress(rows, fraction):
+        if args.quiet:
+            return
+        share = f" ({fraction:.0%})" if fraction is not None else ""
+        rate = rows / max(time.perf_counter() - start, 1e-9)
+        print(f"\r{source.name}: {rows:,} rows{share}, {rate:,.0f} rows/s", end="", file=sys.stderr)
+
+    try:
+        directory = utils.parquet_dataset(
+            source,
+            reader=lambda path: read_source(path, chunk_rows=args.chunk_rows, sheet=args.sheet, progress=progress),
+        )
+    except SchemaError as exc:
+        print(f"\n{source}: {exc}", file=sys.stderr)
+        return 1
+    table = utils.read_table(source)
+    duplicates = int(table.column(WEIGHT_COLUMN).sum()) - len(table)
+    print(
+        f"\n{source}: {len(table):,} rows ({duplicates:,} duplicates collapsed), "
+        f"version {utils.dataset_version(source)}, "
+        f"{time.perf_counter() - start:.2f} s -> {directory}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
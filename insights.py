@@ -0,0 +1,70 @@
+"""Per-job-title salary insights precomputed once per dataset.
+
+The prediction page's "Market Position" section reads everything from this
+index: the overall mean, each role's per-location means and top locations,
+and a sorted salary array per role for percentile ranks.
+"""
+import numpy as np
+import pandas as pd
+
+
+class RoleInsights:
+    """Precomputed figures for one job title."""
+
+    __slots__ = ("mean", "location_means", "sorted_salaries")
+
+    def __init__(self, mean: float, location_means: pd.Series, sorted_salaries: np.ndarray):
+        self.mean = mean
+        self.location_means = location_means  # sorted descending
+        self.sorted_salaries = sorted_salaries
+
+    def top_locations(self, k: int = 5) -> list:
+        return [[loc, float(sal)] for loc, sal in self.location_means.head(k).items()]
+
+    def percentile_rank(self, value: float) -> float:
+        """Percent of salaries below ``value``, counting ties as half."""
+        n = len(self.sorted_salaries)
+        if n == 0:
+            return float("nan")
+        below = np.searchsorted(self.sorted_salaries, value, side="left")
+        at_or_below = np.searchsorted(self.sorted_salaries, value, side="right")
+        return float((below + at_or_below) / 2 / n * 100)
+
+    def percentile(self, q: float) -> float:
+        """Salary at percentile ``q`` (0-100) of this role."""
+        return float(np.percentile(self.sorted_salaries, q))
+
+
+class InsightsIndex:
+    """Overall mean plus ``RoleInsights`` for every job title."""
+
+    def __init__(self, overall_mean: float, roles: dict):
+        self.overall_mean = overall_mean
+        self.roles = roles
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "InsightsIndex":
+        salary = df["salary_in_usd"]
+        location_means = (
+            salary.groupby([df["job_title"], df["company_location"]]).mean()
+        )
+        roles = {}
+        for title, salaries in salary.groupby(df["job_title"]):
+            values = np.sort(salaries.to_numpy(dtype=np.float64))
+            roles[title] = RoleInsights(
+                mean=float(values.mean()),
+                location_means=location_means.loc[title].sort_values(ascending=False),
+                sorted_salaries=values,
+            )
+        return cls(float(salary.mean()), roles)
+
+    def role(self, job_title: str) -> RoleInsights:
+        return self.roles.get(job_title)
+
+    def top_locations(self, job_title: str, k: int = 5) -> list:
+        role = self.role(job_title)
+        return role.top_locations(k) if role is not None else []
+
+    def percentile_rank(self, job_title: str, value: float) -> float:
+        role = self.role(job_title)
+        return role.percentile_rank(value) if role is not None else float("nan")
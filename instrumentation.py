@@ -0,0 +1,248 @@
+"""Hot-path instrumentation for Streamlit reruns.
+
+Functions decorated with ``timed`` (and charts sent through ``plotly_chart``)
+record wall time, and allocated bytes when allocation tracking is enabled,
+into two registries: one per browser session (kept in ``st.session_state``)
+and one for the whole process. Both are shown on the hidden diagnostics page
+(``?page=diagnostics``) and the process registry can be dumped in Prometheus
+text format.
+
+Allocation tracking uses ``tracemalloc`` and slows the app down noticeably;
+enable it with ``SALARY_APP_TRACE_ALLOC=1``. Set ``SALARY_APP_METRICS_FILE``
+to write the Prometheus dump after every rerun.
+"""
+import functools
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+import streamlit as st
+
+METRICS_FILE = Path(
+    os.environ.get("SALARY_APP_METRICS_FILE", Path(__file__).parent / "metrics.prom")
+)
+DUMP_EVERY_RERUN = "SALARY_APP_METRICS_FILE" in os.environ
+
+SECONDS_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+BYTES_BUCKETS = tuple(2 ** p for p in range(10, 32, 2))  # 1 KiB .. 1 GiB
+
+SESSION_KEY = "_instrumentation"
+
+
+class Histogram:
+    """Fixed-bucket histogram with Prometheus (cumulative ``le``) semantics."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.bounds, self.counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return lower
+
+
+class MetricsRegistry:
+    """Per-section time and allocation histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.seconds = {}
+        self.alloc_bytes = {}
+
+    def observe(self, section: str, seconds: float, alloc_bytes=None):
+        with self._lock:
+            if section not in self.seconds:
+                self.seconds[section] = Histogram(SECONDS_BUCKETS)
+            self.seconds[section].observe(seconds)
+            if alloc_bytes is not None:
+                if section not in self.alloc_bytes:
+                    self.alloc_bytes[section] = Histogram(BYTES_BUCKETS)
+                self.alloc_bytes[section].observe(alloc_bytes)
+
+    def reset(self):
+        with self._lock:
+            self.seconds.clear()
+            self.alloc_bytes.clear()
+
+    def summary(self) -> list:
+        """One row per section, sorted by total time spent."""
+        with self._lock:
+            rows = []
+            for section, hist in self.seconds.items():
+                alloc = self.alloc_bytes.get(section)
+                rows.append({
+                    "section": section,
+                    "calls": hist.count,
+                    "total_s": hist.sum,
+                    "mean_ms": hist.sum / hist.count * 1000,
+                    "p50_ms": hist.quantile(0.5) * 1000,
+                    "p95_ms": hist.quantile(0.95) * 1000,
+                    "mean_alloc_kib": alloc.sum / alloc.count / 1024 if alloc else None,
+                })
+        return sorted(rows, key=lambda r: r["total_s"], reverse=True)
+
+    def to_prometheus(self, prefix: str = "salary_app_section") -> str:
+        with self._lock:
+            lines = []
+            for metric, histograms, help_text in [
+                ("seconds", self.seconds, "Wall time per instrumented section."),
+                ("alloc_bytes", self.alloc_bytes, "Peak bytes allocated per instrumented section."),
+            ]:
+                name = f"{prefix}_{metric}"
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for section, hist in sorted(histograms.items()):
+                    label = section.replace("\\", "\\\\").replace('"', '\\"')
+                    for bound, total in hist.cumulative():
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f'{name}_bucket{{section="{label}",le="{le}"}} {total}')
+                    lines.append(f'{name}_sum{{section="{label}"}} {hist.sum!r}')
+                    lines.append(f'{name}_count{{section="{label}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+
+PROCESS_METRICS = MetricsRegistry()
+
+# Extra gauges/counters included in the Prometheus dump: name -> callable
+# returning a flat {field: number} dict.
+_collectors = {}
+
+_local = threading.local()
+
+
+def enable_allocation_tracking():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+if os.environ.get("SALARY_APP_TRACE_ALLOC") == "1":
+    enable_allocation_tracking()
+
+
+def session_metrics():
+    """The current session's registry, or None outside a Streamlit session."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    if SESSION_KEY not in st.session_state:
+        st.session_state[SESSION_KEY] = MetricsRegistry()
+    return st.session_state[SESSION_KEY]
+
+
+@contextmanager
+def timer(section: str):
+    """Time a block and record it under ``section``.
+
+    Nested timers each report their own peak: before a child resets the
+    tracemalloc peak, the parent's peak so far is folded into its frame.
+    """
+    tracing = tracemalloc.is_tracing()
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack and stack[-1] is not None:
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        frame = [current, current]
+    else:
+        frame = None
+    stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stack.pop()
+        alloc = None
+        if frame is not None and tracemalloc.is_tracing():
+            frame[1] = max(frame[1], tracemalloc.get_traced_memory()[1])
+            alloc = frame[1] - frame[0]
+            if stack and stack[-1] is not None:
+                stack[-1][1] = max(stack[-1][1], frame[1])
+            tracemalloc.reset_peak()
+        PROCESS_METRICS.observe(section, elapsed, alloc)
+        session = session_metrics()
+        if session is not None:
+            session.observe(section, elapsed, alloc)
+
+
+def timed(section: str = None):
+    """Decorator form of ``timer``; defaults to ``<module>.<function>``."""
+
+    def decorator(func):
+        name = section or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def plotly_chart(fig, **kwargs):
+    """``st.plotly_chart`` with the call recorded under ``st.plotly_chart``."""
+    with timer("st.plotly_chart"):
+        return st.plotly_chart(fig, **kwargs)
+
+
+def register_collector(prefix: str, collect):
+    """Include ``collect()``'s numeric fields as ``<prefix>_<field>`` gauges."""
+    _collectors[prefix] = collect
+
+
+def collectors_to_prometheus() -> str:
+    lines = []
+    for prefix, collect in sorted(_collectors.items()):
+        for field, value in collect().items():
+            if isinstance(value, (int, float)):
+                lines.append(f"# TYPE {prefix}_{field} gauge")
+                lines.append(f"{prefix}_{field} {value!r}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def write_prometheus(path=None) -> Path:
+    """Write the process-wide registry in Prometheus text format."""
+    path = Path(path or METRICS_FILE)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(PROCESS_METRICS.to_prometheus() + collectors_to_prometheus())
+    tmp.replace(path)
+    return path
@@ -0,0 +1,268 @@
+"""Memory-mappable model artifact for the salary GBM.
+
+The pickled ``saved_steps.pkl`` ties loading to one scikit-learn version and
+is unpickled into every process. This format stores the same model as flat
+NumPy arrays in one file:
+
+    magic (8 bytes) | header length (uint64) | JSON header | arrays
+
+The JSON header holds versioned metadata (model parameters, the 560 feature
+names and the one-hot vocabularies they encode) plus the dtype, shape and
+offset of every array. Arrays are 64-byte aligned and opened with
+``np.memmap``, so loading takes milliseconds and all processes share the
+pages. Prediction walks all trees level by level with vectorized NumPy
+indexing and needs no scikit-learn.
+
+Convert the pickle (needs the scikit-learn version that wrote it):
+
+    python model_artifact.py saved_steps.pkl saved_steps.gbm
+"""
+import argparse
+import json
+import pickle
+import struct
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"SALGBM\x00\x01"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+PREDICT_CHUNK_ROWS = 256  # keeps the (rows, trees) index arrays cache-sized
+
+# Prefixes of one-hot encoded columns in the feature matrix.
+VOCABULARY_PREFIXES = (
+    "job_title_",
+    "salary_currency_",
+    "employee_residence_",
+    "company_location_",
+    "cluster_",
+    "work_own_country_",
+)
+
+
+class MinMaxParams:
+    """Fitted ``MinMaxScaler`` parameters: ``X * scale_ + min_``.
+
+    ``encoder`` is the state of a non-one-hot feature encoding
+    (``encoders.py``) the model was trained on, or None.
+    """
+
+    def __init__(self, scale: np.ndarray, min_: np.ndarray, feature_names: list, encoder: dict = None):
+        self.scale_ = scale
+        self.min_ = min_
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.n_features_in_ = len(feature_names)
+        self.encoder = encoder
+
+    def transform(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) * self.scale_ + self.min_
+
+
+class TreeEnsemble:
+    """Gradient-boosted regression trees stored as concatenated node arrays.
+
+    ``children[node]`` holds the global ``(left, right)`` node indices; leaves
+    point to themselves, so every row takes exactly ``max_depth`` steps with
+    no leaf test. ``roots`` holds each tree's first node.
+    """
+
+    def __init__(self, children, feature, threshold, value, roots,
+                 init: float, learning_rate: float, max_depth: int):
+        self.children = children
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.init = init
+        self.learning_rate = learning_rate
+        self.max_depth = max_depth
+        self._flat_children = children.reshape(-1)
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf index reached in every tree, shape ``(rows, trees)``."""
+        nodes = np.repeat(self.roots[None, :].astype(np.intp), len(X), axis=0)
+        flat = X.reshape(-1)
+        row_base = (np.arange(len(X)) * X.shape[1])[:, None]
+        for _ in range(self.max_depth):
+            go_right = flat[row_base + self.feature[nodes]] > self.threshold[nodes]
+            nodes = self._flat_children[2 * nodes + go_right]
+        return nodes
+
+    def predict(self, X) -> np.ndarray:
+        """Raw model output (log salary), like ``GradientBoostingRegressor.predict``."""
+        # scikit-learn compares float32 feature values against the thresholds.
+        X = np.ascontiguousarray(X, dtype=np.float32).astype(np.float64)
+        out = np.empty(len(X))
+        for start in range(0, len(X), PREDICT_CHUNK_ROWS):
+            chunk = X[start:start + PREDICT_CHUNK_ROWS]
+            leaves = self._leaves(chunk)
+            out[start:start + len(chunk)] = self.init + self.learning_rate * self.value[leaves].sum(axis=1)
+        return out
+
+
+class ModelArtifact:
+    """A loaded artifact: metadata plus the model and scaler it describes."""
+
+    def __init__(self, metadata: dict, model: TreeEnsemble, scaler: MinMaxParams):
+        self.metadata = metadata
+        self.model = model
+        self.scaler = scaler
+
+    @property
+    def vocabularies(self) -> dict:
+        return self.metadata.get("vocabularies", {})
+
+
+def _vocabularies(feature_names: list) -> dict:
+    vocab = {}
+    for name in feature_names:
+        for prefix in VOCABULARY_PREFIXES:
+            if name.startswith(prefix):
+                vocab.setdefault(prefix[:-1], []).append(name[len(prefix):])
+                break
+    return vocab
+
+
+def arrays_from_sklearn(model, scaler):
+    """Flatten a fitted ``GradientBoostingRegressor`` and ``MinMaxScaler``."""
+    trees = [est.tree_ for est in model.estimators_[:, 0]]
+    sizes = np.array([t.node_count for t in trees], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+    children, feature = [], []
+    for tree, offset in zip(trees, offsets):
+        local = np.arange(tree.node_count)
+        leaf = tree.children_left < 0
+        left = np.where(leaf, local, tree.children_left) + offset
+        right = np.where(leaf, local, tree.children_right) + offset
+        children.append(np.stack([left, right], axis=1))
+        feature.append(np.where(leaf, 0, tree.feature))
+
+    arrays = {
+        "children": np.concatenate(children).astype(np.int64),
+        "feature": np.concatenate(feature).astype(np.int64),
+        "threshold": np.concatenate([t.threshold for t in trees]).astype(np.float64),
+        "value": np.concatenate([t.value[:, 0, 0] for t in trees]).astype(np.float64),
+        "roots": offsets.astype(np.int64),
+        "scale": np.asarray(scaler.scale_, dtype=np.float64),
+        "min": np.asarray(scaler.min_, dtype=np.float64),
+    }
+    feature_names = [str(name) for name in scaler.feature_names_in_]
+    model_meta = {
+        "type": type(model).__name__,
+        "loss": getattr(model, "loss", None),
+        "n_estimators": int(len(trees)),
+        "learning_rate": float(model.learning_rate),
+        "init": float(np.ravel(model.init_.constant_)[0]),
+        "max_depth": int(max(t.max_depth for t in trees)),
+        "target": "log(salary_in_usd)",
+    }
+    return arrays, model_meta, feature_names
+
+
+def save_artifact(path, arrays: dict, model_meta: dict, feature_names: list, source: dict = None,
+                  encoder: dict = None) -> Path:
+    """Write arrays plus metadata in the artifact layout."""
+    path = Path(path)
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": source or {},
+        "model": model_meta,
+        "features": feature_names,
+        "vocabularies": _vocabularies(feature_names),
+        "arrays": layout,
+    }
+    if encoder is not None:
+        header["encoder"] = encoder
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 8 + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+    tmp.replace(path)
+    return path
+
+
+def load_artifact(path, mmap: bool = True) -> ModelArtifact:
+    """Open an artifact; arrays are read-only memory maps unless ``mmap=False``."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a model artifact")
+        (header_len,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_len))
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported model artifact version: {header.get('format_version')}")
+    data_start = -(-(len(MAGIC) + 8 + header_len) // ALIGNMENT) * ALIGNMENT
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        shape = tuple(spec["shape"])
+        if mmap:
+            array = np.memmap(path, dtype=np.dtype(spec["dtype"]), mode="r",
+                              offset=data_start + spec["offset"], shape=shape)
+            arrays[name] = np.asarray(array)
+        else:
+            with open(path, "rb") as f:
+                f.seek(data_start + spec["offset"])
+                arrays[name] = np.fromfile(f, dtype=np.dtype(spec["dtype"]), count=int(np.prod(shape))).reshape(shape)
+
+    meta = header["model"]
+    model = TreeEnsemble(
+        arrays["children"], arrays["feature"], arrays["threshold"], arrays["value"], arrays["roots"],
+        init=meta["init"], learning_rate=meta["learning_rate"], max_depth=meta["max_depth"],
+    )
+    scaler = MinMaxParams(arrays["scale"], arrays["min"], header["features"], encoder=header.get("encoder"))
+    return ModelArtifact(header, model, scaler)
+
+
+def convert(pickle_path, artifact_path) -> Path:
+    """Convert a ``saved_steps.pkl`` pickle into the artifact format."""
+    import sklearn
+
+    with open(pickle_path, "rb") as f:
+        data = pickle.load(f)
+    arrays, model_meta, feature_names = arrays_from_sklearn(data["model"], data["scaler"])
+    source = {"file": Path(pickle_path).name, "sklearn_version": sklearn.__version__}
+    return save_artifact(artifact_path, arrays, model_meta, feature_names, source=source)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert saved_steps.pkl to a memory-mapped model artifact.")
+    parser.add_argument("pickle", type=Path)
+    parser.add_argument("output", type=Path)
+    args = parser.parse_args(argv)
+
+    path = convert(args.pickle, args.output)
+    start = time.perf_counter()
+    artifact = load_artifact(path)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(
+        f"Wrote {path} ({path.stat().st_size / 1024:.0f} KiB, "
+        f"{artifact.model.n_estimators} trees, {len(artifact.scaler.feature_names_in_)} features); "
+        f"loads in {elapsed:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
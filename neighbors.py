@@ -0,0 +1,252 @@
+"""Nearest-neighbour search over salary profiles.
+
+A profile is the eight ``features.GROUP_KEYS`` fields. Two profiles are as
+far apart as the weighted sum of their per-field distances: 0 or 1 for
+nominal fields (job title, employment type, residence, location) and the
+normalized gap between levels for ordered ones (experience, company size,
+remote ratio, year), so a senior role is closer to a mid-level one than to
+an entry-level one.
+
+``ProfileIndex`` holds one entry per distinct profile of a table, each with
+the integer code of every field. A query turns each field into a small
+per-code cost table and sums ``cost[codes]`` over the fields, one vectorized
+pass over the distinct profiles; ``np.argpartition`` then picks the nearest
+without sorting them all. Member rows are stored grouped by profile and
+ordered by salary, so per-profile statistics and the salaries of a set of
+neighbours are read without touching the rest of the table.
+"""
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from aggregate import combined_codes
+from compact import CompactTable
+from features import GROUP_KEYS
+
+FIELD_WEIGHTS = {
+    "job_title": 4.0,
+    "experience_level": 3.0,
+    "company_location": 2.0,
+    "employee_residence": 1.0,
+    "employment_type": 1.0,
+    "company_size": 1.0,
+    "remote_ratio": 1.0,
+    "work_year": 0.5,
+}
+
+# Ordered fields and their levels; ``work_year`` is ordered by value.
+ORDINAL_LEVELS = {
+    "experience_level": ["EN", "MI", "SE", "EX"],
+    "company_size": ["S", "M", "L"],
+    "remote_ratio": [0, 50, 100],
+}
+NUMERIC_ORDINALS = ("work_year",)
+
+_indexes = weakref.WeakKeyDictionary()
+
+
+def _position(field: str, value, low: float, high: float) -> float:
+    """Place of ``value`` on a 0-1 scale for an ordered field; NaN for unknown values.
+
+    Numeric fields are scaled by the ``low``-``high`` range of the table.
+    """
+    if field in ORDINAL_LEVELS:
+        levels = ORDINAL_LEVELS[field]
+        return levels.index(value) / (len(levels) - 1) if value in levels else np.nan
+    try:
+        return (float(value) - low) / max(high - low, 1.0)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _rounded(distances: np.ndarray) -> np.ndarray:
+    # Level gaps are fractions; rounding keeps equal distances equal.
+    return np.round(distances, 9)
+
+
+def _keyed_medians(keys: np.ndarray, salaries: np.ndarray, n_keys: int):
+    """``(counts, medians)`` of ``salaries`` per key in ``range(n_keys)``, from one sort."""
+    counts = np.bincount(keys, minlength=n_keys)
+    ordered = salaries[np.lexsort((salaries, keys))]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+    lower = np.where(present, starts + (counts - 1) // 2, 0)
+    upper = np.where(present, starts + counts // 2, 0)
+    medians = np.full(n_keys, np.nan)
+    if len(ordered):
+        medians[present] = ((ordered[lower] + ordered[upper]) / 2)[present]
+    return counts, medians
+
+
+class ProfileIndex:
+    """Distinct profiles of a table, their member rows and per-field codes."""
+
+    def __init__(self, table: CompactTable, weights: dict = None, value: str = "salary_in_usd"):
+        self.weights = dict(FIELD_WEIGHTS if weights is None else weights)
+        groups, dictionaries = combined_codes(table, GROUP_KEYS)
+        ids, inverse = np.unique(groups, return_inverse=True)
+        self.dictionaries = dict(zip(GROUP_KEYS, dictionaries))
+        self.codes = {}
+        for field, dictionary in reversed(list(self.dictionaries.items())):
+            ids, codes = np.divmod(ids, len(dictionary))
+            self.codes[field] = codes.astype(np.int32)
+        self._ranges, self._ordinal = {}, {}
+        for field, dictionary in self.dictionaries.items():
+            if field in ORDINAL_LEVELS or field in NUMERIC_ORDINALS:
+                low, high = (float(dictionary.min()), float(dictionary.max())) if field in NUMERIC_ORDINALS else (0, 0)
+                self._ranges[field] = (low, high)
+                self._ordinal[field] = np.array([_position(field, value, low, high) for value in dictionary])
+
+        # Rows grouped by profile, by salary within each: profile g holds
+        # rows[offsets[g]:offsets[g + 1]].
+        salaries = table.column(value).astype(np.float64)
+        self.rows = np.lexsort((salaries, inverse))
+        self.salaries = salaries[self.rows]
+        self.counts = np.bincount(inverse)
+        self.offsets = np.concatenate(([0], np.cumsum(self.counts)))
+        starts = self.offsets[:-1]
+        self.medians = (self.salaries[starts + (self.counts - 1) // 2] + self.salaries[starts + self.counts // 2]) / 2
+        self.means = np.bincount(inverse, weights=salaries) / np.maximum(self.counts, 1)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _cost(self, field: str, value) -> np.ndarray:
+        """Distance from ``value`` to each code of ``field``, weighted."""
+        weight = self.weights.get(field, 0.0)
+        dictionary = self.dictionaries[field]
+        if field in self._ordinal:
+            position = _position(field, value, *self._ranges[field])
+            if not np.isnan(position):
+                return weight * np.abs(self._ordinal[field] - position)
+        return weight * (dictionary != value).astype(np.float64)
+
+    def _contributions(self, profile: dict) -> dict:
+        """Each field's share of the distance from ``profile`` to every distinct profile."""
+        contributions = {}
+        for field in GROUP_KEYS:
+            value = profile.get(field)
+            if value is not None and self.weights.get(field):
+                contributions[field] = self._cost(field, value)[self.codes[field]]
+        return contributions
+
+    def distances(self, profile: dict) -> np.ndarray:
+        """Distance from ``profile`` to every distinct profile; missing fields are ignored."""
+        return _rounded(sum(self._contributions(profile).values(), np.zeros(len(self))))
+
+    def variant_distances(self, profile: dict, field: str, values) -> np.ndarray:
+        """``distances`` of ``profile`` with ``field`` set to each of ``values``, one row per value.
+
+        The other fields' share is summed once and each value only swaps in
+        its own column of costs.
+        """
+        contributions = self._contributions(profile)
+        contributions.pop(field, None)
+        others = sum(contributions.values(), np.zeros(len(self)))
+        costs = np.stack([self._cost(field, value) for value in values]) if len(values) else np.zeros((0, 1))
+        return _rounded(others + costs[:, self.codes[field]])
+
+    def matching(self, profile: dict, fields) -> np.ndarray:
+        """Profiles equal to ``profile`` on every given field of ``fields``."""
+        mask = np.ones(len(self), dtype=bool)
+        for field in fields:
+            value = profile.get(field)
+            if value is not None:
+                mask &= (self.dictionaries[field] == value)[self.codes[field]]
+        return np.flatnonzero(mask)
+
+    def nearest(self, profile: dict, k: int = 10) -> pd.DataFrame:
+        """The ``k`` distinct profiles nearest ``profile``, nearest first, larger groups first on ties.
+
+        Columns: the profile fields, ``distance``, ``count``, ``mean`` and
+        ``median`` of the salaries.
+        """
+        distances = self.distances(profile)
+        k = min(k, len(self))
+        candidates = np.argpartition(distances, k - 1)[:k] if 0 < k < len(self) else np.arange(k)
+        order = candidates[np.lexsort((-self.counts[candidates], distances[candidates]))]
+        frame = pd.DataFrame({
+            field: self.dictionaries[field][self.codes[field][order]] for field in GROUP_KEYS
+        })
+        frame["distance"] = distances[order]
+        frame["count"] = self.counts[order]
+        frame["mean"] = self.means[order]
+        frame["median"] = self.medians[order]
+        return frame
+
+    def _members(self, groups: np.ndarray) -> np.ndarray:
+        """Positions in ``self.rows`` of the members of ``groups``."""
+        lengths = self.counts[groups]
+        skip = np.repeat(self.offsets[groups] - np.cumsum(lengths) + lengths, lengths)
+        return skip + np.arange(len(skip))
+
+    def rows_of(self, groups: np.ndarray) -> np.ndarray:
+        """Table rows of the given profiles, ascending."""
+        return np.sort(self.rows[self._members(groups)])
+
+    def salaries_of(self, groups: np.ndarray) -> np.ndarray:
+        """Salaries of the given profiles' rows."""
+        return self.salaries[self._members(groups)]
+
+    def vary(self, profile: dict, field: str, fields):
+        """``(counts, medians)`` per code of ``field`` for the rows matching ``profile`` on the other ``fields``.
+
+        Every value of ``field`` is scored in one pass over the matching
+        profiles' rows, instead of one lookup per value. Medians of empty
+        codes are NaN.
+        """
+        groups = self.matching(profile, [f for f in fields if f != field])
+        keys = np.repeat(self.codes[field][groups], self.counts[groups])
+        return _keyed_medians(keys, self.salaries_of(groups), len(self.dictionaries[field]))
+
+    def _within(self, distances: np.ndarray, min_rows: int) -> np.ndarray:
+        """Per row of ``distances``, a mask of the nearest profiles holding ``min_rows`` rows.
+
+        Every profile as near as the farthest one needed is included, so
+        the result does not depend on how ties are broken. Profiles at an
+        infinite distance are never included, even when fewer rows remain.
+        """
+        k = min(max(min_rows, 1), len(self))
+        if k == 0:
+            return np.zeros(distances.shape, dtype=bool)
+        # Each profile has at least one row, so the ``k`` nearest are enough.
+        if k < len(self):
+            candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(k), (len(distances), k))
+        near = np.take_along_axis(distances, candidates, axis=1)
+        order = np.argsort(near, axis=1, kind="stable")
+        near = np.take_along_axis(near, order, axis=1)
+        sizes = np.cumsum(self.counts[np.take_along_axis(candidates, order, axis=1)], axis=1)
+        reached = np.minimum((sizes < min_rows).sum(axis=1), k - 1)
+        cutoff = near[np.arange(len(near)), reached]
+        return (distances <= cutoff[:, None]) & np.isfinite(distances)
+
+    def similar(self, profile: dict, min_rows: int) -> np.ndarray:
+        """The nearest profiles holding at least ``min_rows`` rows together, ties included."""
+        return np.flatnonzero(self._within(self.distances(profile)[None, :], min_rows)[0])
+
+    def vary_similar(self, profile: dict, field: str, values, min_rows: int):
+        """``(counts, medians)`` of the ``similar`` rows of ``profile`` with ``field`` set to each of ``values``.
+
+        Only profiles that hold the value stand in for it, so a value with
+        few records gets a small count (and an unknown one none) instead of
+        its neighbours' salaries. All variants are ranked in one
+        ``argpartition`` over a value x profile distance matrix, and their
+        medians come from one sort.
+        """
+        distances = self.variant_distances(profile, field, values)
+        value_codes = pd.Index(self.dictionaries[field]).get_indexer(pd.Index(list(values), dtype=object))
+        held = self.codes[field][None, :] == value_codes[:, None]
+        distances = np.where(held & (value_codes[:, None] >= 0), distances, np.inf)
+        variant, groups = np.nonzero(self._within(distances, min_rows))
+        keys = np.repeat(variant, self.counts[groups])
+        return _keyed_medians(keys, self.salaries_of(groups), len(values))
+
+
+def profile_index(table: CompactTable) -> ProfileIndex:
+    """``ProfileIndex`` of a table, built once per table and shared by every session."""
+    if table not in _indexes:
+        _indexes[table] = ProfileIndex(table)
+    return _indexes[table]
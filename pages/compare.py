@@ -2,29 +2,37 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from aggregate import group_stats
+from compact import CompactTable
+from instrumentation import plotly_chart, timed
 from utils import (
-    load_data,
+    load_table,
+    title_options,
     format_salary,
     EXPERIENCE_LABELS,
     TOP_JOB_TITLES,
 )
 
 
-def _render_job_comparison(df: pd.DataFrame, jobs: list):
+@timed()
+def _jobs_table(table: CompactTable, jobs: list) -> CompactTable:
+    """Rows of the selected job titles."""
+    return table.take(table.filter_rows({"job_title": jobs}))
+
+
+@timed()
+def _render_job_comparison(table: CompactTable, jobs: list):
     """Side-by-side comparison of selected jobs."""
     if len(jobs) < 2:
         st.info("Select at least 2 job titles to compare.")
         return
 
-    df_jobs = df[df["job_title"].isin(jobs)]
+    jobs_table = _jobs_table(table, jobs)
 
     # Summary table
-    summary = (
-        df_jobs.groupby("job_title")["salary_in_usd"]
-        .agg(["mean", "median", "min", "max", "count", "std"])
-        .round(0)
-        .reset_index()
-    )
+    summary = group_stats(
+        jobs_table, "job_title", ["mean", "median", "min", "max", "count", "std"]
+    ).round(0)
     summary.columns = [
         "Job Title", "Mean", "Median", "Min", "Max", "Records", "Std Dev"
     ]
@@ -40,7 +48,7 @@ def _render_job_comparison(df: pd.DataFrame, jobs: list):
 
     # Violin plot
     fig_violin = px.violin(
-        df_jobs,
+        jobs_table.to_frame(columns=["job_title", "salary_in_usd"]),
         x="job_title",
         y="salary_in_usd",
         color="job_title",
@@ -55,14 +63,11 @@ def _render_job_comparison(df: pd.DataFrame, jobs: list):
         showlegend=False,
         height=500,
     )
-    st.plotly_chart(fig_violin, use_container_width=True)
+    plotly_chart(fig_violin, use_container_width=True)
 
     # By experience level
-    agg_exp = (
-        df_jobs.groupby(["job_title", "experience_label"])["salary_in_usd"]
-        .mean()
-        .reset_index()
-    )
+    agg_exp = group_stats(jobs_table, ["job_title", "experience_label"], "mean")
+    agg_exp.columns = ["job_title", "experience_label", "salary_in_usd"]
     fig_exp = px.bar(
         agg_exp,
         x="experience_label",
@@ -82,22 +87,18 @@ def _render_job_comparison(df: pd.DataFrame, jobs: list):
         yaxis_title="Average Salary (USD)",
         height=450,
     )
-    st.plotly_chart(fig_exp, use_container_width=True)
+    plotly_chart(fig_exp, use_container_width=True)
 
 
-def _render_growth_analysis(df: pd.DataFrame, jobs: list):
+@timed()
+def _render_growth_analysis(table: CompactTable, jobs: list):
     """Year-over-year salary growth for selected jobs."""
     if len(jobs) < 1:
         st.info("Select at least 1 job title.")
         return
 
-    df_jobs = df[df["job_title"].isin(jobs)]
-
-    agg = (
-        df_jobs.groupby(["work_year", "job_title"])["salary_in_usd"]
-        .mean()
-        .reset_index()
-    )
+    agg = group_stats(_jobs_table(table, jobs), ["work_year", "job_title"], "mean")
+    agg.columns = ["work_year", "job_title", "salary_in_usd"]
 
     fig = px.line(
         agg,
@@ -114,7 +115,7 @@ def _render_growth_analysis(df: pd.DataFrame, jobs: list):
         height=450,
         xaxis=dict(dtick=1),
     )
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(fig, use_container_width=True)
 
     # Growth table
     st.markdown("#### Year-over-Year Growth")
@@ -137,20 +138,17 @@ def _render_growth_analysis(df: pd.DataFrame, jobs: list):
     st.dataframe(pd.DataFrame(growth_data), use_container_width=True, hide_index=True)
 
 
-def _render_demand_analysis(df: pd.DataFrame, jobs: list):
+@timed()
+def _render_demand_analysis(table: CompactTable, jobs: list):
     """Job demand and market analysis."""
     if len(jobs) < 1:
         st.info("Select at least 1 job title.")
         return
 
-    df_jobs = df[df["job_title"].isin(jobs)]
+    jobs_table = _jobs_table(table, jobs)
 
     # Job count by year
-    count_by_year = (
-        df_jobs.groupby(["work_year", "job_title"])
-        .size()
-        .reset_index(name="count")
-    )
+    count_by_year = group_stats(jobs_table, ["work_year", "job_title"], "count")
 
     fig_count = px.bar(
         count_by_year,
@@ -167,14 +165,10 @@ def _render_demand_analysis(df: pd.DataFrame, jobs: list):
         height=400,
         xaxis=dict(dtick=1),
     )
-    st.plotly_chart(fig_count, use_container_width=True)
+    plotly_chart(fig_count, use_container_width=True)
 
     # Remote ratio breakdown
-    remote_by_job = (
-        df_jobs.groupby(["job_title", "remote_label"])
-        .size()
-        .reset_index(name="count")
-    )
+    remote_by_job = group_stats(jobs_table, ["job_title", "remote_label"], "count")
     fig_remote = px.bar(
         remote_by_job,
         x="job_title",
@@ -189,16 +183,13 @@ def _render_demand_analysis(df: pd.DataFrame, jobs: list):
         yaxis_title="Count",
         height=400,
     )
-    st.plotly_chart(fig_remote, use_container_width=True)
+    plotly_chart(fig_remote, use_container_width=True)
 
     # Top locations heatmap
-    top_locs = df_jobs["company_location"].value_counts().head(10).index.tolist()
-    df_heat = df_jobs[df_jobs["company_location"].isin(top_locs)]
-    heat_data = (
-        df_heat.groupby(["job_title", "company_location"])["salary_in_usd"]
-        .mean()
-        .reset_index()
-    )
+    top_locs = jobs_table.value_counts("company_location").head(10).index.tolist()
+    heat_table = jobs_table.take(jobs_table.mask({"company_location": top_locs}))
+    heat_data = group_stats(heat_table, ["job_title", "company_location"], "mean")
+    heat_data.columns = ["job_title", "company_location", "salary_in_usd"]
     heat_pivot = heat_data.pivot(
         index="job_title", columns="company_location", values="salary_in_usd"
     )
@@ -215,7 +206,7 @@ def _render_demand_analysis(df: pd.DataFrame, jobs: list):
         title="Avg Salary Heatmap: Job Title vs Location (Top 10 Locations)",
         height=450,
     )
-    st.plotly_chart(fig_heat, use_container_width=True)
+    plotly_chart(fig_heat, use_container_width=True)
 
 
 def render_compare_page():
@@ -226,16 +217,25 @@ def render_compare_page():
         unsafe_allow_html=True,
     )
 
-    df = load_data()
+    table = load_table()
 
     # Job selector
-    available_jobs = df["job_title"].value_counts()
+    available_jobs = table.value_counts("job_title")
     popular_jobs = available_jobs[available_jobs >= 10].index.tolist()
 
+    title_search = st.text_input(
+        "Search Job Titles",
+        placeholder="e.g. ml engineer, analyst",
+        key="compare_title_search",
+    )
+    # Search narrows the options; titles already selected stay available.
+    selected = st.session_state.get("compare_jobs", [])
+    options = title_options(title_search, popular_jobs)
     selected_jobs = st.multiselect(
         "Select Job Titles to Compare",
-        options=popular_jobs,
+        options=options + [j for j in selected if j not in options],
         default=[j for j in TOP_JOB_TITLES[:4] if j in popular_jobs],
+        key="compare_jobs",
     )
 
     if not selected_jobs:
@@ -249,10 +249,10 @@ def render_compare_page():
     )
 
     with tab1:
-        _render_job_comparison(df, selected_jobs)
+        _render_job_comparison(table, selected_jobs)
 
     with tab2:
-        _render_growth_analysis(df, selected_jobs)
+        _render_growth_analysis(table, selected_jobs)
 
     with tab3:
-        _render_demand_analysis(df, selected_jobs)
+        _render_demand_analysis(table, selected_jobs)
@@ -0,0 +1,76 @@
+import streamlit as st
+import pandas as pd
+import tracemalloc
+from instrumentation import (
+    PROCESS_METRICS,
+    METRICS_FILE,
+    collectors_to_prometheus,
+    session_metrics,
+    write_prometheus,
+)
+from prediction_cache import default_cache
+
+
+def _render_metrics_table(title: str, registry):
+    """Table of per-section timings for one registry."""
+    st.markdown(f"#### {title}")
+    rows = registry.summary() if registry is not None else []
+    if not rows:
+        st.info("No instrumented calls recorded yet.")
+        return
+
+    table = pd.DataFrame(rows).rename(
+        columns={
+            "section": "Section",
+            "calls": "Calls",
+            "total_s": "Total (s)",
+            "mean_ms": "Mean (ms)",
+            "p50_ms": "p50 (ms)",
+            "p95_ms": "p95 (ms)",
+            "mean_alloc_kib": "Mean Alloc (KiB)",
+        }
+    )
+    st.dataframe(table.round(2), use_container_width=True, hide_index=True)
+
+
+def render_diagnostics_page():
+    """Hidden diagnostics page (``?page=diagnostics``)."""
+    st.markdown('<p class="main-header">Diagnostics</p>', unsafe_allow_html=True)
+    st.markdown(
+        '<p class="sub-header">Where time goes during reruns of this app</p>',
+        unsafe_allow_html=True,
+    )
+
+    if not tracemalloc.is_tracing():
+        st.caption("Allocation tracking is off. Start the app with SALARY_APP_TRACE_ALLOC=1 to enable it.")
+
+    tab1, tab2 = st.tabs(["This Session", "Process"])
+
+    with tab1:
+        _render_metrics_table("Session Timings", session_metrics())
+
+    with tab2:
+        _render_metrics_table("Process Timings", PROCESS_METRICS)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Write Prometheus Dump", use_container_width=True):
+                path = write_prometheus()
+                st.success(f"Wrote {path}")
+        with col2:
+            if st.button("Reset Process Metrics", use_container_width=True):
+                PROCESS_METRICS.reset()
+                st.rerun()
+
+        st.markdown("#### Prediction Cache")
+        cache_stats = default_cache().stats()
+        cols = st.columns(4)
+        cols[0].metric("Entries", f"{cache_stats['entries']:,} / {cache_stats['max_entries']:,}")
+        cols[1].metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+        cols[2].metric("Hits (Memory / Disk)", f"{cache_stats['hits']:,} / {cache_stats['disk_hits']:,}")
+        cols[3].metric("Misses", f"{cache_stats['misses']:,}")
+
+        with st.expander("Prometheus Text"):
+            st.code(PROCESS_METRICS.to_prometheus() + collectors_to_prometheus(), language="text")
+
+    st.caption(f"Metrics file: {METRICS_FILE}")
@@ -1,11 +1,19 @@
+import hashlib
+
 import streamlit as st
-import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+from aggregate import distinct_count, group_stats
+from compact import CompactTable
+from currency import BASE_CURRENCY, default_table
+from instrumentation import plotly_chart, timed
+from precompute import PrecomputeScheduler, register, slice_key
+from sampling import StratifiedSample, approximate_min_rows, sample_size
+from selection import SessionSelection
 from utils import (
-    load_data,
+    load_table,
     format_salary,
-    filter_dataframe,
     EXPERIENCE_LABELS,
     EMPLOYMENT_LABELS,
     REMOTE_LABELS,
@@ -13,34 +21,62 @@ from utils import (
 )
 
 
-def _sidebar_filters(df: pd.DataFrame) -> dict:
+# Columns of the Detailed Data table and their headers.
+DETAIL_COLUMNS = {
+    "work_year": "Year",
+    "job_title": "Job Title",
+    "experience_label": "Experience",
+    "employment_label": "Employment",
+    "salary_in_usd": "Salary (USD)",
+    "employee_residence": "Residence",
+    "company_location": "Company Location",
+    "size_label": "Company Size",
+    "remote_label": "Remote",
+}
+
+DETAIL_PAGE_SIZES = [25, 50, 100, 250]
+
+
+def _default_filters(table: CompactTable) -> dict:
+    """The sidebar selection a new session starts with."""
+    return {
+        "work_year": table.values("work_year"),
+        "job_title": TOP_JOB_TITLES,
+        "experience_level": list(EXPERIENCE_LABELS.keys()),
+        "remote_ratio": list(REMOTE_LABELS.keys()),
+    }
+
+
+@timed()
+def _sidebar_filters(table: CompactTable) -> dict:
     """Render sidebar filters and return selected values."""
     st.sidebar.markdown("### Filters")
+    defaults = _default_filters(table)
 
     years = st.sidebar.multiselect(
         "Work Year",
-        options=sorted(df["work_year"].unique()),
-        default=sorted(df["work_year"].unique()),
+        options=table.values("work_year"),
+        default=defaults["work_year"],
     )
 
     jobs = st.sidebar.multiselect(
         "Job Title",
-        options=sorted(df["job_title"].unique()),
-        default=TOP_JOB_TITLES,
+        options=table.values("job_title"),
+        default=defaults["job_title"],
     )
 
     experience = st.sidebar.multiselect(
         "Experience Level",
         options=list(EXPERIENCE_LABELS.keys()),
         format_func=lambda x: EXPERIENCE_LABELS[x],
-        default=list(EXPERIENCE_LABELS.keys()),
+        default=defaults["experience_level"],
     )
 
     remote = st.sidebar.multiselect(
         "Remote Ratio",
         options=list(REMOTE_LABELS.keys()),
         format_func=lambda x: REMOTE_LABELS[x],
-        default=list(REMOTE_LABELS.keys()),
+        default=defaults["remote_ratio"],
     )
 
     return {
@@ -51,55 +87,198 @@ def _sidebar_filters(df: pd.DataFrame) -> dict:
     }
 
 
-def _render_kpi_cards(df: pd.DataFrame):
+@timed()
+def _filtered_table(table: CompactTable, filters: dict) -> CompactTable:
+    """Rows of ``table`` matching the sidebar filters."""
+    return table.take(table.filter_rows(filters))
+
+
+def _session_selection(table: CompactTable, dataset_version: str) -> SessionSelection:
+    """This session's selection over ``table``, kept across reruns."""
+    saved = st.session_state.get("explore_selection")
+    if saved is None or saved[0] != dataset_version:
+        saved = (dataset_version, SessionSelection(table))
+        st.session_state["explore_selection"] = saved
+    return saved[1]
+
+
+def _group_stats(source, keys, stats):
+    """``group_stats`` of a table, or of a session selection from its running totals."""
+    if isinstance(source, SessionSelection):
+        return source.group_stats(keys, stats)
+    return group_stats(source, keys, stats)
+
+
+def _detail_page(table: CompactTable, mask, sort_by: str = None, descending: bool = False,
+                 page: int = 0, page_size: int = DETAIL_PAGE_SIZES[0]):
+    """One page of the Detailed Data table, as a display-ready frame.
+
+    Rows are ordered through the table's cached per-column sort order, so
+    only the ``page_size`` visible rows are ever turned into a dataframe.
+    """
+    rows = np.flatnonzero(mask) if sort_by is None else table.sorted_rows(sort_by, mask, descending)
+    start = page * page_size
+    page_rows = rows[start:start + page_size]
+    return table.to_frame(page_rows, list(DETAIL_COLUMNS)).rename(columns=DETAIL_COLUMNS)
+
+
+def _render_detail_table(table: CompactTable, mask):
+    """Paginated, sortable view of the rows selected by ``mask``."""
+    n_rows = int(np.count_nonzero(mask))
+
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    with col1:
+        sort_by = st.selectbox(
+            "Sort by",
+            [None] + list(DETAIL_COLUMNS),
+            format_func=lambda col: "Dataset order" if col is None else DETAIL_COLUMNS[col],
+            key="detail_sort_by",
+        )
+    with col2:
+        descending = st.toggle("Descending", value=False, key="detail_descending")
+    with col3:
+        page_size = st.selectbox("Rows per page", DETAIL_PAGE_SIZES, index=1, key="detail_page_size")
+    n_pages = max(1, -(-n_rows // page_size))
+    # Filters may have shrunk the selection below the page kept in the session.
+    if st.session_state.get("detail_page", 1) > n_pages:
+        st.session_state["detail_page"] = n_pages
+    with col4:
+        page = st.number_input("Page", min_value=1, max_value=n_pages, step=1, key="detail_page")
+
+    st.dataframe(
+        _detail_page(table, mask, sort_by, descending, int(page) - 1, page_size),
+        use_container_width=True,
+        hide_index=True,
+    )
+    start = (int(page) - 1) * page_size
+    st.caption(f"Rows {start + 1:,}-{min(start + page_size, n_rows):,} of {n_rows:,}")
+    _render_download(table, mask)
+
+
+def _render_download(table: CompactTable, mask):
+    """CSV download of the selected rows, built only when asked for.
+
+    Encoding the whole selection costs far more than the visible page, so
+    the file is prepared on a button press and kept in the session until
+    the selection changes.
+    """
+    digest = hashlib.blake2b(np.packbits(mask).tobytes(), digest_size=16).hexdigest()
+    prepared = st.session_state.get("detail_csv")
+    if prepared is None or prepared[0] != digest:
+        if not st.button("Prepare CSV Download", key="detail_prepare_csv"):
+            return
+        prepared = (digest, table.to_frame(np.flatnonzero(mask)).to_csv(index=False).encode("utf-8"))
+        st.session_state["detail_csv"] = prepared
+    st.download_button(
+        "Download Filtered Data (CSV)",
+        prepared[1],
+        "filtered_salaries.csv",
+        "text/csv",
+    )
+
+
+def _sidebar_currency() -> str:
+    """Render the display currency selector and return the chosen code."""
+    currencies = default_table().currencies
+    return st.sidebar.selectbox(
+        "Display Currency",
+        options=currencies,
+        index=currencies.index(BASE_CURRENCY),
+        help="Aggregates are computed in USD and converted at the latest year's rate.",
+    )
+
+
+def _currency_rate(currency: str) -> float:
+    """Units of ``currency`` per USD, applied to USD aggregates at render time."""
+    return default_table().rate(currency)
+
+
+@timed()
+def _kpi_stats(table: CompactTable) -> dict:
+    """USD figures behind the key metric cards."""
+    salaries = table.column("salary_in_usd")
+    return {
+        "count": len(table),
+        "mean": float(salaries.mean()),
+        "median": float(np.median(salaries)),
+        "roles": distinct_count(table, "job_title"),
+    }
+
+
+def _kpi_metrics(stats: dict, currency: str = BASE_CURRENCY) -> list:
+    """``(label, value)`` pairs for the key metric cards."""
+    rate = _currency_rate(currency)
+    return [
+        ("Total Records", f"{stats['count']:,}"),
+        ("Avg Salary", format_salary(stats["mean"] * rate, currency)),
+        ("Median Salary", format_salary(stats["median"] * rate, currency)),
+        ("Unique Roles", f"{stats['roles']}"),
+    ]
+
+
+def _render_kpi_cards(metrics: list):
     """Display key metric cards."""
     cols = st.columns(4)
-    metrics = [
-        ("Total Records", f"{len(df):,}"),
-        ("Avg Salary", format_salary(df["salary_in_usd"].mean())),
-        ("Median Salary", format_salary(df["salary_in_usd"].median())),
-        ("Unique Roles", f"{df['job_title'].nunique()}"),
-    ]
     for col, (label, value) in zip(cols, metrics):
         col.metric(label, value)
 
 
-def _salary_by_job(df: pd.DataFrame):
-    """Bar chart: average salary by job title."""
-    agg = (
-        df.groupby("job_title")["salary_in_usd"]
-        .agg(["mean", "count"])
-        .reset_index()
-        .sort_values("mean", ascending=True)
-        .tail(15)
-    )
-    agg.columns = ["job_title", "avg_salary", "count"]
+@timed()
+def _salary_by_job(table: CompactTable):
+    """Mean salary and record count by job title."""
+    return _group_stats(table, "job_title", ["mean", "count"])
+
+
+def _error_bars(agg, stat: str, rate: float):
+    """``(plus, minus)`` error arrays from ``<stat>_low``/``<stat>_high`` columns, if present."""
+    if f"{stat}_low" not in agg:
+        return None, None
+    return (agg[f"{stat}_high"] - agg[stat]) * rate, (agg[stat] - agg[f"{stat}_low"]) * rate
+
+
+def _salary_by_job_figure(agg, currency: str = BASE_CURRENCY):
+    """Bar chart: top 15 job titles by mean salary, with error bars for sample estimates."""
+    agg = agg.sort_values("mean", ascending=True).tail(15)
+    rate = _currency_rate(currency)
+    plus, minus = _error_bars(agg, "mean", rate)
+    agg = agg[["job_title", "mean", "count"]].set_axis(["job_title", "avg_salary", "count"], axis=1)
+    agg["avg_salary"] *= rate
+    if plus is not None:
+        agg["error_plus"], agg["error_minus"] = plus, minus
 
     fig = px.bar(
         agg,
         y="job_title",
         x="avg_salary",
         orientation="h",
-        text=agg["avg_salary"].apply(lambda x: f"${x:,.0f}"),
+        text=agg["avg_salary"].apply(lambda x: format_salary(x, currency)),
         color="avg_salary",
         color_continuous_scale="Viridis",
+        error_x="error_plus" if plus is not None else None,
+        error_x_minus="error_minus" if plus is not None else None,
     )
     fig.update_layout(
         title="Average Salary by Job Title (Top 15)",
-        xaxis_title="Average Salary (USD)",
+        xaxis_title=f"Average Salary ({currency})",
         yaxis_title="",
         showlegend=False,
         coloraxis_showscale=False,
         height=500,
     )
     fig.update_traces(textposition="outside")
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+@timed()
+def _salary_by_experience(table: CompactTable):
+    """Every salary with its experience level, for the box plot."""
+    return table.to_frame(columns=["experience_level", "experience_label", "salary_in_usd"])
 
 
-def _salary_by_experience(df: pd.DataFrame):
+def _salary_by_experience_figure(rows, currency: str = BASE_CURRENCY):
     """Box plot: salary distribution by experience level."""
     order = ["EN", "MI", "SE", "EX"]
-    df_sorted = df.copy()
+    df_sorted = rows.assign(display_salary=rows["salary_in_usd"] * _currency_rate(currency))
     df_sorted["exp_order"] = df_sorted["experience_level"].map(
         {v: i for i, v in enumerate(order)}
     )
@@ -108,7 +287,7 @@ def _salary_by_experience(df: pd.DataFrame):
     fig = px.box(
         df_sorted,
         x="experience_label",
-        y="salary_in_usd",
+        y="display_salary",
         color="experience_label",
         color_discrete_sequence=px.colors.qualitative.Set2,
         category_orders={"experience_label": [EXPERIENCE_LABELS[k] for k in order]},
@@ -116,58 +295,62 @@ def _salary_by_experience(df: pd.DataFrame):
     fig.update_layout(
         title="Salary Distribution by Experience Level",
         xaxis_title="Experience Level",
-        yaxis_title="Salary (USD)",
+        yaxis_title=f"Salary ({currency})",
         showlegend=False,
         height=450,
     )
-    st.plotly_chart(fig, use_container_width=True)
-
-
-def _salary_trend(df: pd.DataFrame):
-    """Line chart: salary trends over years."""
-    agg = (
-        df.groupby("work_year")["salary_in_usd"]
-        .agg(["mean", "median"])
-        .reset_index()
-    )
-    agg.columns = ["work_year", "mean", "median"]
-
-    fig = go.Figure()
-    fig.add_trace(
-        go.Scatter(
-            x=agg["work_year"],
-            y=agg["mean"],
-            mode="lines+markers",
-            name="Mean",
-            line=dict(width=3, color="#1f77b4"),
-            marker=dict(size=10),
-        )
-    )
-    fig.add_trace(
-        go.Scatter(
-            x=agg["work_year"],
-            y=agg["median"],
-            mode="lines+markers",
-            name="Median",
-            line=dict(width=3, color="#ff7f0e", dash="dash"),
-            marker=dict(size=10),
+    return fig
+
+
+@timed()
+def _salary_trend(table: CompactTable):
+    """Mean and median salary per year."""
+    return _group_stats(table, "work_year", ["mean", "median"])
+
+
+def _salary_trend_figure(agg, currency: str = BASE_CURRENCY):
+    """Line chart: mean and median salary per year, with error bars for sample estimates."""
+    rate = _currency_rate(currency)
+    traces = []
+    for stat, name, line in (
+        ("mean", "Mean", dict(width=3, color="#1f77b4")),
+        ("median", "Median", dict(width=3, color="#ff7f0e", dash="dash")),
+    ):
+        plus, minus = _error_bars(agg, stat, rate)
+        error_y = None if plus is None else dict(type="data", symmetric=False, array=plus, arrayminus=minus)
+        traces.append(
+            go.Scatter(
+                x=agg["work_year"],
+                y=agg[stat] * rate,
+                mode="lines+markers",
+                name=name,
+                line=line,
+                marker=dict(size=10),
+                error_y=error_y,
+            )
         )
-    )
+
+    fig = go.Figure(traces)
     fig.update_layout(
         title="Salary Trends Over Years",
         xaxis_title="Year",
-        yaxis_title="Salary (USD)",
+        yaxis_title=f"Salary ({currency})",
         height=400,
         xaxis=dict(dtick=1),
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def _remote_distribution(df: pd.DataFrame):
-    """Pie chart: remote ratio distribution."""
-    counts = df["remote_label"].value_counts().reset_index()
+@timed()
+def _remote_distribution(table: CompactTable):
+    """Record count by remote ratio."""
+    counts = _group_stats(table, "remote_label", "count").sort_values("count", ascending=False)
     counts.columns = ["remote_type", "count"]
+    return counts
 
+
+def _remote_distribution_figure(counts, currency: str = BASE_CURRENCY):
+    """Pie chart: remote ratio distribution."""
     fig = px.pie(
         counts,
         values="count",
@@ -176,16 +359,20 @@ def _remote_distribution(df: pd.DataFrame):
         hole=0.4,
     )
     fig.update_layout(title="Remote Work Distribution", height=400)
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def _company_size_analysis(df: pd.DataFrame):
+@timed()
+def _company_size_analysis(table: CompactTable):
+    """Mean salary by company size and experience."""
+    agg = _group_stats(table, ["size_label", "experience_label"], "mean")
+    agg.columns = ["size_label", "experience_label", "salary_in_usd"]
+    return agg
+
+
+def _company_size_figure(agg, currency: str = BASE_CURRENCY):
     """Grouped bar: salary by company size and experience."""
-    agg = (
-        df.groupby(["size_label", "experience_label"])["salary_in_usd"]
-        .mean()
-        .reset_index()
-    )
+    agg = agg.assign(salary_in_usd=agg["salary_in_usd"] * _currency_rate(currency))
     fig = px.bar(
         agg,
         x="size_label",
@@ -197,19 +384,23 @@ def _company_size_analysis(df: pd.DataFrame):
     fig.update_layout(
         title="Average Salary by Company Size & Experience",
         xaxis_title="Company Size",
-        yaxis_title="Average Salary (USD)",
+        yaxis_title=f"Average Salary ({currency})",
         height=450,
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def _geo_map(df: pd.DataFrame):
-    """Choropleth map of average salaries by company location."""
-    agg = (
-        df.groupby("company_location")["salary_in_usd"].mean().reset_index()
-    )
+@timed()
+def _geo_map(table: CompactTable):
+    """Mean salary by company location."""
+    agg = _group_stats(table, "company_location", "mean")
     agg.columns = ["country", "avg_salary"]
+    return agg
+
 
+def _geo_map_figure(agg, currency: str = BASE_CURRENCY):
+    """Choropleth map of average salaries by company location."""
+    agg = agg.assign(avg_salary=agg["avg_salary"] * _currency_rate(currency))
     fig = px.choropleth(
         agg,
         locations="country",
@@ -217,25 +408,28 @@ def _geo_map(df: pd.DataFrame):
         color="avg_salary",
         color_continuous_scale="YlOrRd",
         projection="natural earth",
-        labels={"avg_salary": "Avg Salary (USD)"},
+        labels={"avg_salary": f"Avg Salary ({currency})"},
     )
     fig.update_layout(
         title="Average Salary by Company Location",
         height=500,
         geo=dict(showframe=False, showcoastlines=True),
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+@timed()
+def _employment_type_chart(table: CompactTable):
+    """Mean salary by employment type and year."""
+    agg = _group_stats(table, ["employment_label", "work_year"], "mean")
+    agg.columns = ["employment_label", "work_year", "salary_in_usd"]
+    agg["work_year"] = agg["work_year"].astype(str)
+    return agg
 
 
-def _employment_type_chart(df: pd.DataFrame):
+def _employment_type_figure(agg, currency: str = BASE_CURRENCY):
     """Bar chart: salary by employment type over years."""
-    df_copy = df.copy()
-    df_copy["work_year"] = df_copy["work_year"].astype(str)
-    agg = (
-        df_copy.groupby(["employment_label", "work_year"])["salary_in_usd"]
-        .mean()
-        .reset_index()
-    )
+    agg = agg.assign(salary_in_usd=agg["salary_in_usd"] * _currency_rate(currency))
     fig = px.bar(
         agg,
         x="employment_label",
@@ -247,88 +441,175 @@ def _employment_type_chart(df: pd.DataFrame):
     fig.update_layout(
         title="Average Salary by Employment Type & Year",
         xaxis_title="Employment Type",
-        yaxis_title="Average Salary (USD)",
+        yaxis_title=f"Average Salary ({currency})",
         height=450,
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+# Chart slot -> (aggregate, figure builder). Slices cache the USD
+# aggregates; figures are drawn from them in the display currency.
+CHARTS = {
+    "salary_by_job": (_salary_by_job, _salary_by_job_figure),
+    "salary_by_experience": (_salary_by_experience, _salary_by_experience_figure),
+    "company_size": (_company_size_analysis, _company_size_figure),
+    "salary_trend": (_salary_trend, _salary_trend_figure),
+    "employment_type": (_employment_type_chart, _employment_type_figure),
+    "remote_distribution": (_remote_distribution, _remote_distribution_figure),
+    "geo_map": (_geo_map, _geo_map_figure),
+}
+
+
+@timed()
+def _build_dashboard(table: CompactTable, filters: dict, selection: SessionSelection = None) -> dict:
+    """KPI figures and chart aggregates for one slice, in USD; ``None`` when no rows match.
+
+    ``selection``, already moved to ``filters``, supplies the rows and its
+    running aggregates instead of filtering ``table`` from scratch.
+    """
+    filtered = selection if selection is not None else _filtered_table(table, filters)
+    if len(filtered) == 0:
+        return None
+    return {
+        "kpis": _kpi_stats(filtered),
+        "aggregates": {name: aggregate(filtered) for name, (aggregate, _) in CHARTS.items()},
+    }
+
+
+@timed()
+def _dashboard_figures(dashboard: dict, currency: str = BASE_CURRENCY) -> dict:
+    """The slice's charts, converted to ``currency``."""
+    return {name: CHARTS[name][1](agg, currency) for name, agg in dashboard["aggregates"].items()}
+
+
+def _dashboard_nbytes(dashboard: dict) -> int:
+    """Size of a built slice: the memory held by its aggregate frames."""
+    if dashboard is None:
+        return 0
+    return int(sum(agg.memory_usage(index=False, deep=True).sum() for agg in dashboard["aggregates"].values()))
+
+
+@st.cache_resource(show_spinner=False)
+def _approx_sample(dataset_version: str, _table: CompactTable) -> StratifiedSample:
+    """Stratified sample for approximate first paint, drawn once per dataset version."""
+    return StratifiedSample(_table, size=sample_size())
+
+
+def _approx_kpi_metrics(estimate: dict, roles: int, currency: str = BASE_CURRENCY) -> list:
+    """KPI cards from sample estimates, each with its 95% interval half-width."""
+    rate = _currency_rate(currency)
+
+    def half_width(stat):
+        low, high = estimate[f"{stat}_ci"]
+        return (high - low) / 2
+
+    return [
+        ("Total Records", f"~{estimate['count']:,.0f} ±{half_width('count'):,.0f}"),
+        ("Avg Salary", f"{format_salary(estimate['mean'] * rate, currency)} ±{half_width('mean') / estimate['mean']:.1%}"),
+        ("Median Salary", f"{format_salary(estimate['median'] * rate, currency)} ±{half_width('median') / estimate['median']:.1%}"),
+        ("Unique Roles", f"~{roles}"),
+    ]
+
+
+def _render_approximate(sample: StratifiedSample, filters: dict, currency: str, kpi_slot, slots: dict):
+    """Fill the KPI cards and the job/trend charts from the sample."""
+    domain = sample.table.mask(filters)
+    estimate = sample.estimate(domain)
+    if estimate is None:
+        return
+    by_job = sample.group_estimates(domain, "job_title")
+    with kpi_slot.container():
+        _render_kpi_cards(_approx_kpi_metrics(estimate, len(by_job), currency))
+        st.caption(
+            f"Estimated from a stratified sample of {len(sample):,} rows (95% intervals); "
+            "exact figures replace these when ready."
+        )
+    with slots["salary_by_job"].container():
+        plotly_chart(_salary_by_job_figure(by_job, currency), use_container_width=True)
+    with slots["salary_trend"].container():
+        plotly_chart(_salary_trend_figure(sample.group_estimates(domain, "work_year"), currency),
+                     use_container_width=True)
+
+
+@st.cache_resource(show_spinner=False)
+def _dashboard_scheduler(dataset_version: str, _table: CompactTable) -> PrecomputeScheduler:
+    """Slice cache and background precompute, one per dataset version."""
+    scheduler = PrecomputeScheduler.from_env(
+        lambda filters: _build_dashboard(_table, filters),
+        sizeof=_dashboard_nbytes,
+    )
+    register(scheduler)
+    return scheduler
 
 
 def render_explore_page():
     """Main explore/dashboard page."""
     st.markdown('<p class="main-header">Data Jobs Salary Dashboard</p>', unsafe_allow_html=True)
+    table = load_table()
+    years = table.values("work_year")
     st.markdown(
-        '<p class="sub-header">Explore salary trends across 3,755 data job records (2020-2023)</p>',
+        f'<p class="sub-header">Explore salary trends across {len(table):,} data job records '
+        f'({min(years)}-{max(years)})</p>',
         unsafe_allow_html=True,
     )
 
-    df = load_data()
-    filters = _sidebar_filters(df)
-    df_filtered = filter_dataframe(df, filters)
-
-    if df_filtered.empty:
+    filters = _sidebar_filters(table)
+    currency = _sidebar_currency()
+
+    # Slices are built on the integer codes, in USD, and shared across
+    # sessions and display currencies; the default and most popular ones
+    # are precomputed in the background.
+    dataset_version = table.attrs.get("dataset_version") or str(id(table))
+    scheduler = _dashboard_scheduler(dataset_version, table)
+    scheduler.refresh([_default_filters(table)])
+    # A cache miss is built from the session's selection, which only
+    # recomputes the filter columns and aggregates the last change touched.
+    selection = _session_selection(table, dataset_version).update(filters)
+    if len(selection) == 0:
         st.warning("No data matches the selected filters. Please adjust your selections.")
         return
 
-    _render_kpi_cards(df_filtered)
+    kpi_slot = st.empty()
     st.markdown("---")
 
-    # Tab layout for charts
+    # Tab layout for charts; slots are filled once the slice is ready.
     tab1, tab2, tab3, tab4 = st.tabs(
         ["Salary Overview", "Trends & Time", "Geography", "Detailed Data"]
     )
-
+    slots = {}
     with tab1:
-        _salary_by_job(df_filtered)
+        slots["salary_by_job"] = st.empty()
         col1, col2 = st.columns(2)
         with col1:
-            _salary_by_experience(df_filtered)
+            slots["salary_by_experience"] = st.empty()
         with col2:
-            _company_size_analysis(df_filtered)
+            slots["company_size"] = st.empty()
 
     with tab2:
-        _salary_trend(df_filtered)
+        slots["salary_trend"] = st.empty()
         col1, col2 = st.columns(2)
         with col1:
-            _employment_type_chart(df_filtered)
+            slots["employment_type"] = st.empty()
         with col2:
-            _remote_distribution(df_filtered)
+            slots["remote_distribution"] = st.empty()
 
     with tab3:
-        _geo_map(df_filtered)
+        slots["geo_map"] = st.empty()
 
     with tab4:
-        st.dataframe(
-            df_filtered[
-                [
-                    "work_year",
-                    "job_title",
-                    "experience_label",
-                    "employment_label",
-                    "salary_in_usd",
-                    "employee_residence",
-                    "company_location",
-                    "size_label",
-                    "remote_label",
-                ]
-            ].rename(
-                columns={
-                    "work_year": "Year",
-                    "job_title": "Job Title",
-                    "experience_label": "Experience",
-                    "employment_label": "Employment",
-                    "salary_in_usd": "Salary (USD)",
-                    "employee_residence": "Residence",
-                    "company_location": "Company Location",
-                    "size_label": "Company Size",
-                    "remote_label": "Remote",
-                }
-            ),
-            use_container_width=True,
-            height=500,
-        )
-        st.download_button(
-            "Download Filtered Data (CSV)",
-            df_filtered.to_csv(index=False).encode("utf-8"),
-            "filtered_salaries.csv",
-            "text/csv",
-        )
+        _render_detail_table(table, selection.mask)
+
+    min_rows = approximate_min_rows()
+    if min_rows and len(table) >= min_rows and not scheduler.cache.contains(slice_key(filters)):
+        # First paint from the stratified sample; the exact slice is built
+        # in the background and replaces it below.
+        _render_approximate(_approx_sample(dataset_version, table), filters, currency, kpi_slot, slots)
+        scheduler.schedule([filters])
+
+    dashboard = scheduler.get_or_compute(filters, build=lambda f: _build_dashboard(table, f, selection))
+    figures = _dashboard_figures(dashboard, currency)
+    with kpi_slot.container():
+        _render_kpi_cards(_kpi_metrics(dashboard["kpis"], currency))
+    for name, slot in slots.items():
+        with slot.container():
+            plotly_chart(figures[name], use_container_width=True)
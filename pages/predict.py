@@ -2,9 +2,17 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
+from estimator import MIN_MATCHES, profile_salaries, stats_from_salaries, what_if
+from insights import InsightsIndex
+from instrumentation import plotly_chart, timed
+from neighbors import ProfileIndex, profile_index
+from prediction_cache import cache_key, default_cache
 from utils import (
     load_data,
+    load_table,
+    title_options,
     format_salary,
+    format_percentile,
     EXPERIENCE_LABELS,
     EMPLOYMENT_LABELS,
     COMPANY_SIZE_LABELS,
@@ -12,39 +20,86 @@ from utils import (
     TOP_JOB_TITLES,
 )
 
+SIMILAR_ROLES = 8
+# Version of the cached ``_estimate_salary`` result; bump when its keys change.
+RESULT_SCHEMA = 4
+WHAT_IF_LOCATIONS = 10
+# The only columns ``InsightsIndex`` reads; the rest are never decoded.
+INSIGHTS_COLUMNS = ["job_title", "company_location", "salary_in_usd"]
+# Display name and value labels of each field the what-if panel varies.
+WHAT_IF_LABELS = {
+    "experience_level": ("Experience", EXPERIENCE_LABELS),
+    "company_size": ("Company Size", COMPANY_SIZE_LABELS),
+    "remote_ratio": ("Remote", REMOTE_LABELS),
+    "company_location": ("Location", {}),
+}
+
+
+@timed()
+def _get_salary_stats(index: ProfileIndex, profile: dict):
+    """``(stats, exact)`` for the profile: its exact matches, or its nearest neighbours."""
+    salaries, exact = profile_salaries(index, profile)
+    if len(salaries) == 0:
+        return None, exact
+    return stats_from_salaries(salaries), exact
+
+
+@st.cache_resource(show_spinner=False)
+def _load_insights(dataset_version: str, _df: pd.DataFrame) -> InsightsIndex:
+    """Insights index, built once per dataset version."""
+    return InsightsIndex.build(_df)
+
+
+def _what_if_options(index: ProfileIndex, profile: dict) -> dict:
+    """Values to try for each what-if field: every level, and the largest locations."""
+    locations = (
+        pd.Series(np.bincount(index.codes["company_location"], weights=index.counts),
+                  index=index.dictionaries["company_location"])
+        .nlargest(WHAT_IF_LOCATIONS)
+        .index.tolist()
+    )
+    if profile["company_location"] not in locations:
+        locations.append(profile["company_location"])
+    return {
+        "experience_level": list(EXPERIENCE_LABELS),
+        "company_size": list(COMPANY_SIZE_LABELS),
+        "remote_ratio": list(REMOTE_LABELS),
+        "company_location": locations,
+    }
 
-def _get_salary_stats(df: pd.DataFrame, filters: dict) -> dict:
-    """Calculate salary statistics for the given filters."""
-    mask = pd.Series(True, index=df.index)
-    for col, value in filters.items():
-        if value is not None:
-            mask &= df[col] == value
-
-    matched = df[mask]
-    if len(matched) < 3:
-        # Relax filters: use only job_title and experience_level
-        mask = pd.Series(True, index=df.index)
-        for col in ["job_title", "experience_level"]:
-            if col in filters and filters[col] is not None:
-                mask &= df[col] == filters[col]
-        matched = df[mask]
 
-    if matched.empty:
+@timed()
+def _estimate_salary(profile: dict, insights: InsightsIndex, index: ProfileIndex) -> dict:
+    """Full prediction result: matched stats, similar roles, market position and top locations."""
+    stats, exact = _get_salary_stats(index, profile)
+    if stats is None:
         return None
 
-    salary = matched["salary_in_usd"]
+    predicted = float(stats["median"])
+    # Plain floats so the result can be shared through the on-disk cache tier.
     return {
-        "mean": salary.mean(),
-        "median": salary.median(),
-        "min": salary.min(),
-        "max": salary.max(),
-        "q25": salary.quantile(0.25),
-        "q75": salary.quantile(0.75),
-        "count": len(matched),
-        "std": salary.std(),
+        "stats": {k: int(v) if k == "count" else float(v) for k, v in stats.items()},
+        "exact": exact,
+        "similar": index.nearest(profile, k=SIMILAR_ROLES).to_dict("records"),
+        "what_if": what_if(index, profile, _what_if_options(index, profile)).to_dict("records"),
+        "predicted": predicted,
+        "overall_avg": insights.overall_mean,
+        "percentile_rank": insights.percentile_rank(profile["job_title"], predicted),
+        "top_locations": insights.top_locations(profile["job_title"], k=5),
     }
 
 
+def _cached_estimate(df: pd.DataFrame, profile: dict, index: ProfileIndex) -> dict:
+    """``_estimate_salary`` through the process-wide prediction cache."""
+    version = df.attrs.get("dataset_version")
+    insights = _load_insights(version or str(id(df)), df)
+    if version is None:
+        return _estimate_salary(profile, insights, index)
+    key = cache_key(profile, version, schema=RESULT_SCHEMA)
+    return default_cache().get_or_compute(key, lambda: _estimate_salary(profile, insights, index))
+
+
+@timed()
 def _render_gauge(value: float, min_val: float, max_val: float):
     """Render a gauge chart for salary prediction."""
     fig = go.Figure(
@@ -70,9 +125,10 @@ def _render_gauge(value: float, min_val: float, max_val: float):
         )
     )
     fig.update_layout(height=350)
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(fig, use_container_width=True)
 
 
+@timed()
 def _render_comparison_bars(stats: dict, predicted: float):
     """Show how the prediction compares to dataset statistics."""
     labels = ["Min", "25th Pct", "Median", "Your Estimate", "75th Pct", "Max"]
@@ -94,7 +150,69 @@ def _render_comparison_bars(stats: dict, predicted: float):
         height=400,
         showlegend=False,
     )
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(fig, use_container_width=True)
+
+
+@timed()
+def _render_what_if(variants: list, predicted: float):
+    """Sensitivity of the estimate to changing one input at a time.
+
+    Values with too few records for an estimate are listed with an empty
+    bar, labelled "insufficient data".
+    """
+    frame = pd.DataFrame(variants)
+    labels = []
+    for field, value, current in zip(frame["field"], frame["value"], frame["current"]):
+        name, value_labels = WHAT_IF_LABELS[field]
+        labels.append(f"{name}: {value_labels.get(value, value)}" + (" (yours)" if current else ""))
+    missing = frame["estimate"].isna().to_numpy()
+    delta = np.where(missing, 0.0, frame["estimate"].to_numpy(dtype=np.float64, na_value=np.nan) - predicted)
+    colors = np.where(
+        missing, "#cccccc", np.where(frame["current"], "#1f77b4", np.where(delta >= 0, "#6bcb77", "#ff6b6b"))
+    )
+
+    fig = go.Figure(
+        go.Bar(
+            x=delta,
+            y=labels,
+            orientation="h",
+            marker_color=colors,
+            text=["insufficient data" if pd.isna(v) else format_salary(v) for v in frame["estimate"]],
+            textposition="outside",
+            customdata=frame["count"],
+            hovertemplate="%{y}<br>Change: %{x:$,.0f}<br>Records: %{customdata}<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        title="What If: One Input Changed at a Time",
+        xaxis_title="Change vs your estimate (USD)",
+        yaxis={"autorange": "reversed"},
+        height=120 + 28 * len(frame),
+        showlegend=False,
+    )
+    plotly_chart(fig, use_container_width=True)
+
+
+def _render_similar_roles(similar: list):
+    """Table of the nearest profiles in the dataset."""
+    frame = pd.DataFrame(similar)
+    st.dataframe(
+        pd.DataFrame({
+            "Job Title": frame["job_title"],
+            "Experience": frame["experience_level"].map(EXPERIENCE_LABELS),
+            "Employment": frame["employment_type"].map(EMPLOYMENT_LABELS),
+            "Location": frame["company_location"],
+            "Residence": frame["employee_residence"],
+            "Company Size": frame["company_size"].map(COMPANY_SIZE_LABELS),
+            "Remote": frame["remote_ratio"].map(REMOTE_LABELS),
+            "Year": frame["work_year"],
+            "Records": frame["count"],
+            "Median Salary": frame["median"].map(format_salary),
+            "Distance": frame["distance"].round(2),
+        }),
+        hide_index=True,
+        use_container_width=True,
+    )
 
 
 def render_predict_page():
@@ -105,17 +223,27 @@ def render_predict_page():
         unsafe_allow_html=True,
     )
 
-    df = load_data()
+    # Widget options come from the compact table; the full frame is only
+    # needed once an estimate is requested.
+    table = load_table()
+    job_titles = table.values("job_title")
 
     # Input form
     col1, col2 = st.columns(2)
 
     with col1:
+        title_search = st.text_input(
+            "Search Job Titles",
+            placeholder="e.g. ml engineer, data scientst",
+            key="predict_title_search",
+        )
+        # Fuzzy matches, best first; the full list while the search is blank.
+        job_titles = title_options(title_search, job_titles)
         job_title = st.selectbox(
             "Job Title",
-            options=sorted(df["job_title"].unique()),
-            index=sorted(df["job_title"].unique()).index("Data Scientist")
-            if "Data Scientist" in df["job_title"].unique()
+            options=job_titles,
+            index=job_titles.index("Data Scientist")
+            if "Data Scientist" in job_titles and not title_search.strip()
             else 0,
         )
 
@@ -149,8 +277,7 @@ def render_predict_page():
         )
 
         top_locations = (
-            df["company_location"]
-            .value_counts()
+            table.value_counts("company_location")
             .head(20)
             .index.tolist()
         )
@@ -161,8 +288,7 @@ def render_predict_page():
         )
 
         top_residences = (
-            df["employee_residence"]
-            .value_counts()
+            table.value_counts("employee_residence")
             .head(20)
             .index.tolist()
         )
@@ -174,7 +300,7 @@ def render_predict_page():
 
         work_year = st.selectbox(
             "Reference Year",
-            options=sorted(df["work_year"].unique(), reverse=True),
+            options=table.values("work_year")[::-1],
         )
 
     st.markdown("---")
@@ -188,17 +314,26 @@ def render_predict_page():
             "company_location": company_location,
             "company_size": company_size,
         }
+        # Residence and year only weigh in when looking for similar profiles.
+        profile = {**filters, "employee_residence": employee_residence, "work_year": int(work_year)}
 
-        stats = _get_salary_stats(df, filters)
+        result = _cached_estimate(load_data(columns=INSIGHTS_COLUMNS), profile, profile_index(table))
 
-        if stats is None:
+        if result is None:
             st.error("Not enough data for this combination. Try different parameters.")
             return
 
-        predicted = stats["median"]
+        stats = result["stats"]
+        predicted = result["predicted"]
 
         # Results
-        st.success(f"Based on **{stats['count']}** matching records:")
+        if result["exact"]:
+            st.success(f"Based on **{stats['count']}** matching records:")
+        else:
+            st.info(
+                f"Fewer than {MIN_MATCHES} records match this combination exactly; based on the **{stats['count']}** "
+                "records of the most similar profiles:"
+            )
 
         col1, col2, col3, col4 = st.columns(4)
         col1.metric("Estimated Salary", format_salary(predicted))
@@ -232,7 +367,7 @@ def render_predict_page():
 
         with col2:
             # Compare with overall average
-            overall_avg = df["salary_in_usd"].mean()
+            overall_avg = result["overall_avg"]
             diff = predicted - overall_avg
             pct = (diff / overall_avg) * 100
             direction = "above" if diff > 0 else "below"
@@ -240,16 +375,21 @@ def render_predict_page():
             st.markdown(
                 f"- This role pays **{abs(pct):.1f}%** {direction} the overall average ({format_salary(overall_avg)})"
             )
+            if not np.isnan(result["percentile_rank"]):
+                st.markdown(
+                    f"- The estimate sits at the **{format_percentile(result['percentile_rank'])} percentile** "
+                    f"of all {job_title} salaries"
+                )
 
             # Top paying locations for this role
-            role_by_loc = (
-                df[df["job_title"] == job_title]
-                .groupby("company_location")["salary_in_usd"]
-                .mean()
-                .sort_values(ascending=False)
-                .head(5)
-            )
-            if not role_by_loc.empty:
+            if result["top_locations"]:
                 st.markdown(f"- Top locations for **{job_title}**:")
-                for loc, sal in role_by_loc.items():
+                for loc, sal in result["top_locations"]:
                     st.markdown(f"  - {loc}: {format_salary(sal)}")
+
+        st.markdown("### What If")
+        st.caption("Each bar changes one input and keeps the others.")
+        _render_what_if(result["what_if"], predicted)
+
+        st.markdown("### Similar Roles")
+        _render_similar_roles(result["similar"])
@@ -0,0 +1,162 @@
+"""Partitioned Parquet copy of the salary dataset.
+
+The CSV is written once per dataset version as a hive-partitioned Parquet
+dataset (``work_year=2023/part-0.parquet``, optionally also by
+``company_location``). Rows are sorted by the common filter columns within
+each partition, so the min/max statistics Parquet keeps per row group are
+narrow enough to skip row groups as well as partitions.
+
+``read_dataset`` turns sidebar-style filters into a pyarrow expression:
+partitions whose key fails it are never opened, row groups whose
+statistics exclude it are never read, and only the requested columns are
+decoded. A ``row_id`` column records each row's position in the source
+file, so results come back in file order with the index ``read_csv`` would
+give them.
+"""
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+DEFAULT_PARTITIONS = ("work_year",)
+# Sort order inside a partition: the columns dashboard filters use most.
+SORT_COLUMNS = ["job_title", "experience_level", "remote_ratio"]
+ROW_GROUP_SIZE = 65_536
+ROW_ID = "row_id"
+# Schema metadata key holding the source column order; partition keys are
+# otherwise read back as the last columns.
+COLUMNS_KEY = b"salary_app.columns"
+
+# Partition key types; everything else keeps the type Arrow infers.
+PARTITION_TYPES = {
+    "work_year": pa.int64(),
+    "company_location": pa.string(),
+}
+
+
+def _partitioning(partition_cols) -> ds.Partitioning:
+    return ds.partitioning(
+        pa.schema([(col, PARTITION_TYPES.get(col, pa.string())) for col in partition_cols]),
+        flavor="hive",
+    )
+
+
+def write_dataset(df: pd.DataFrame, directory, partition_cols=DEFAULT_PARTITIONS,
+                  row_group_size: int = ROW_GROUP_SIZE) -> Path:
+    """Write ``df`` as a partitioned dataset at ``directory``.
+
+    Written to a temporary sibling and renamed into place, like
+    ``CompactTable.save``, so readers never see a partial dataset.
+    """
+    directory = Path(directory)
+    partition_cols = list(partition_cols)
+    columns = list(df.columns)
+    df = df.assign(**{ROW_ID: range(len(df))})
+    sort_cols = [col for col in partition_cols + SORT_COLUMNS if col in df.columns]
+    df = df.sort_values(sort_cols + [ROW_ID], kind="stable")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({COLUMNS_KEY: json.dumps(columns).encode()})
+
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f".{directory.name}-", dir=directory.parent))
+    try:
+        os.chmod(tmp, 0o755)
+        ds.write_dataset(
+            table,
+            tmp,
+            format="parquet",
+            partitioning=_partitioning(partition_cols),
+            max_rows_per_group=row_group_size,
+            min_rows_per_group=min(row_group_size, len(df)) or None,
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        os.rename(tmp, directory)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not directory.exists():
+            raise
+    return directory
+
+
+def _partition_cols(directory: Path) -> list:
+    """Partition keys of a written dataset, read from its directory names."""
+    cols, path = [], directory
+    while True:
+        children = [p for p in path.iterdir() if p.is_dir() and "=" in p.name]
+        if not children:
+            return cols
+        cols.append(children[0].name.split("=", 1)[0])
+        path = children[0]
+
+
+def open_dataset(directory) -> ds.Dataset:
+    directory = Path(directory)
+    return ds.dataset(directory, format="parquet", partitioning=_partitioning(_partition_cols(directory)))
+
+
+def filter_expression(filters: dict):
+    """Sidebar filters as a pyarrow expression; None when nothing is filtered."""
+    expression = None
+    for col, values in (filters or {}).items():
+        if values is None or len(values) == 0:
+            continue
+        term = ds.field(col).isin(list(values))
+        expression = term if expression is None else expression & term
+    return expression
+
+
+def read_dataset(directory, filters: dict = None, columns=None) -> pd.DataFrame:
+    """Rows matching ``filters`` (``filter_dataframe`` semantics), in file order.
+
+    ``columns`` limits the columns decoded; all are read by default.
+    """
+    dataset = open_dataset(directory)
+    if columns is None:
+        columns = json.loads(dataset.schema.metadata[COLUMNS_KEY])
+    columns = list(columns)
+    expression = filter_expression(filters)
+    table = dataset.to_table(columns=columns + [ROW_ID], filter=expression)
+    df = table.to_pandas().sort_values(ROW_ID, kind="stable")
+    row_ids = df.pop(ROW_ID).to_numpy()
+    df.index = pd.RangeIndex(len(df)) if expression is None else pd.Index(row_ids)
+    return df[columns]
+
+
+def scan_plan(directory, filters: dict = None) -> dict:
+    """How many files and row groups a read with ``filters`` touches."""
+    dataset = open_dataset(directory)
+    expression = filter_expression(filters)
+    all_fragments = list(dataset.get_fragments())
+    fragments = list(dataset.get_fragments(filter=expression)) if expression is not None else all_fragments
+    row_groups = sum(
+        len(fragment.split_by_row_group(expression, schema=dataset.schema)) if expression is not None else fragment.num_row_groups
+        for fragment in fragments
+    )
+    return {
+        "files": len(fragments),
+        "files_total": len(all_fragments),
+        "row_groups": row_groups,
+        "row_groups_total": sum(fragment.num_row_groups for fragment in all_fragments),
+    }
+
+
+def row_group_statistics(directory) -> list:
+    """Per row group min/max of every column, for inspection."""
+    stats = []
+    for path in sorted(Path(directory).rglob("*.parquet")):
+        metadata = pq.ParquetFile(path).metadata
+        for i in range(metadata.num_row_groups):
+            group = metadata.row_group(i)
+            columns = {}
+            for j in range(group.num_columns):
+                column = group.column(j)
+                if column.statistics is not None and column.statistics.has_min_max:
+                    columns[column.path_in_schema] = (column.statistics.min, column.statistics.max)
+            stats.append({"file": str(path.relative_to(directory)), "rows": group.num_rows, "columns": columns})
+    return stats
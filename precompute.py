@@ -0,0 +1,278 @@
+"""Background precomputation of popular Dashboard slices.
+
+A slice is one combination of sidebar filters, built in USD; the display
+currency is applied when it is drawn. Every Dashboard load records its
+slice in a usage log, compacted as it grows; a small thread pool then
+computes the default slice and the most frequent recent slices ahead of
+time, so most page loads find their KPIs and figures already built.
+
+Work is bounded three ways: the number of worker threads and queued builds,
+a CPU budget (the share of one core background builds may use per refresh
+interval) and the byte budget of the slice cache. Configure through the environment:
+
+    SALARY_APP_PRECOMPUTE_WORKERS   background threads (default 1, 0 disables)
+    SALARY_APP_PRECOMPUTE_CPU       CPU share per interval (default 0.25)
+    SALARY_APP_PRECOMPUTE_MAX_MB    slice cache budget (default 256)
+    SALARY_APP_USAGE_LOG            usage log path ("" keeps it in memory)
+"""
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from instrumentation import register_collector
+from prediction_cache import PredictionCache
+
+logger = logging.getLogger("precompute")
+
+USAGE_LOG_PATH = Path(__file__).parent / "usage_log.jsonl"
+USAGE_WINDOW = 2000
+# The usage log file is rewritten to its last ``USAGE_WINDOW`` entries
+# once it holds this many times as many lines.
+USAGE_COMPACT_FACTOR = 4
+DEFAULT_TOP_K = 8
+DEFAULT_REFRESH_SECONDS = 60.0
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_MAX_PENDING = 4
+
+_schedulers = weakref.WeakSet()
+
+
+def slice_key(filters: dict) -> str:
+    """Canonical key for a slice: sorted filter values, JSON-encoded."""
+    items = sorted((col, sorted(values, key=str)) for col, values in filters.items())
+    return json.dumps(items, separators=(",", ":"), default=int)
+
+
+def parse_slice(key: str) -> dict:
+    """Inverse of ``slice_key``: the slice's filters."""
+    items = json.loads(key)
+    if not isinstance(items, list) or not all(
+        isinstance(item, list) and len(item) == 2 and isinstance(item[0], str) for item in items
+    ):
+        raise ValueError(f"Not a slice key: {key!r}")
+    return {col: values for col, values in items}
+
+
+class UsageLog:
+    """Recent slice keys, optionally persisted as JSON lines across restarts."""
+
+    def __init__(self, path=None, window: int = USAGE_WINDOW):
+        self.path = Path(path) if path else None
+        self.window = window
+        self._recent = deque(maxlen=window)
+        self._lines = deque(maxlen=window)
+        self._written = 0
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            self._load()
+
+    def _load(self):
+        lines = self.path.read_text().splitlines()
+        for line in lines[-self.window:]:
+            try:
+                key = json.loads(line)["key"]
+                parse_slice(key)  # drops keys written in an older format
+            except (ValueError, KeyError, TypeError):
+                continue
+            self._recent.append(key)
+            self._lines.append(line)
+        self._written = len(lines)
+        if self._written > USAGE_COMPACT_FACTOR * self.window:
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the file to the entries still in the window."""
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text("".join(line + "\n" for line in self._lines))
+        os.replace(tmp, self.path)
+        self._written = len(self._lines)
+
+    def record(self, key: str):
+        line = json.dumps({"t": round(time.time()), "key": key})
+        with self._lock:
+            self._recent.append(key)
+            self._lines.append(line)
+            if self.path is not None:
+                try:
+                    with open(self.path, "a") as f:
+                        f.write(line + "\n")
+                    self._written += 1
+                    # Keep the file proportional to the window it feeds.
+                    if self._written > USAGE_COMPACT_FACTOR * self.window:
+                        self._compact()
+                except OSError:
+                    logger.warning("Could not write usage log %s", self.path)
+
+    def top(self, k: int = DEFAULT_TOP_K) -> list:
+        """The ``k`` most frequent recent keys, most frequent first."""
+        with self._lock:
+            counts = Counter(self._recent)
+        return [key for key, _ in counts.most_common(k)]
+
+
+_default_usage_log = None
+_usage_lock = threading.Lock()
+
+
+def default_usage_log() -> UsageLog:
+    """Process-wide usage log, configured from the environment on first use."""
+    global _default_usage_log
+    with _usage_lock:
+        if _default_usage_log is None:
+            path = os.environ.get("SALARY_APP_USAGE_LOG", str(USAGE_LOG_PATH))
+            _default_usage_log = UsageLog(path or None)
+        return _default_usage_log
+
+
+class PrecomputeScheduler:
+    """Serves slices from a bounded cache and fills it in the background.
+
+    ``build(filters)`` computes one slice; ``sizeof`` estimates the bytes a
+    built slice holds. A background build that fails is logged and left to
+    its future; the page load waiting on it builds the slice itself.
+    """
+
+    def __init__(self, build, sizeof=None, usage: UsageLog = None, workers: int = 1,
+                 cpu_budget: float = 0.25, max_bytes: int = 256 * 2**20,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, top_k: int = DEFAULT_TOP_K,
+                 max_pending: int = DEFAULT_MAX_PENDING,
+                 refresh_interval: float = DEFAULT_REFRESH_SECONDS):
+        self.build = build
+        self.usage = usage
+        self.cache = PredictionCache(max_entries=max_entries, max_bytes=max_bytes, sizeof=sizeof)
+        self.cpu_budget = cpu_budget
+        self.top_k = top_k
+        self.max_pending = max_pending
+        self.refresh_interval = refresh_interval
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="precompute") if workers > 0 else None
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._last_refresh = None
+        self._window_start = time.monotonic()
+        self._window_cpu = 0.0
+        self.precomputed = 0
+        self.precompute_seconds = 0.0
+        self.skipped_budget = 0
+        self.failed = 0
+        self.failed_waits = 0
+        _schedulers.add(self)
+
+    @classmethod
+    def from_env(cls, build, sizeof=None) -> "PrecomputeScheduler":
+        return cls(
+            build,
+            sizeof=sizeof,
+            usage=default_usage_log(),
+            workers=int(os.environ.get("SALARY_APP_PRECOMPUTE_WORKERS", 1)),
+            cpu_budget=float(os.environ.get("SALARY_APP_PRECOMPUTE_CPU", 0.25)),
+            max_bytes=int(float(os.environ.get("SALARY_APP_PRECOMPUTE_MAX_MB", 256)) * 2**20),
+        )
+
+    def get_or_compute(self, filters: dict, build=None):
+        """The slice for a page load: cached, in flight, or built now.
+
+        ``build`` overrides the scheduler's builder for this call, e.g. with
+        one that reuses the caller's session state.
+        """
+        key = slice_key(filters)
+        if self.usage is not None:
+            self.usage.record(key)
+        with self._lock:
+            future = self._futures.get(key)
+        if future is not None and not self.cache.contains(key):
+            try:
+                future.result()
+            except Exception:
+                # Already logged by ``_run``; the build below retries it.
+                self.failed_waits += 1
+        build = build or self.build
+        return self.cache.get_or_compute(key, lambda: build(filters))
+
+    def refresh(self, default_slices=(), force: bool = False):
+        """Queue the default slices plus the most popular recent ones.
+
+        Runs at most once per ``refresh_interval`` unless ``force`` is set.
+        """
+        now = time.monotonic()
+        if not force and self._last_refresh is not None and now - self._last_refresh < self.refresh_interval:
+            return
+        self._last_refresh = now
+        slices = list(default_slices)
+        if self.usage is not None:
+            slices += [parse_slice(key) for key in self.usage.top(self.top_k)]
+        self.schedule(slices)
+
+    def schedule(self, slices):
+        """Queue slices, given by their filters, in priority order, within budget."""
+        if self._pool is None:
+            return
+        for filters in slices:
+            if not self._within_budget():
+                self.skipped_budget += 1
+                break
+            key = slice_key(filters)
+            with self._lock:
+                if len(self._futures) >= self.max_pending:
+                    break
+                if key in self._futures or self.cache.contains(key):
+                    continue
+                self._futures[key] = self._pool.submit(self._run, key, filters)
+
+    def _within_budget(self) -> bool:
+        now = time.monotonic()
+        if now - self._window_start >= self.refresh_interval:
+            self._window_start, self._window_cpu = now, 0.0
+        if self._window_cpu >= self.cpu_budget * self.refresh_interval:
+            return False
+        max_bytes = self.cache.max_bytes
+        return max_bytes is None or self.cache.stats()["bytes"] < max_bytes
+
+    def _run(self, key: str, filters: dict):
+        start = time.thread_time()
+        try:
+            if not self.cache.contains(key):
+                self.cache.put(key, self.build(filters))
+                self.precomputed += 1
+        except Exception:
+            self.failed += 1
+            logger.exception("Precompute failed for slice %s", key)
+            raise
+        finally:
+            elapsed = time.thread_time() - start
+            self._window_cpu += elapsed
+            self.precompute_seconds += elapsed
+            with self._lock:
+                self._futures.pop(key, None)
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._futures)
+        return {
+            **self.cache.stats(),
+            "pending": pending,
+            "precomputed": self.precomputed,
+            "precompute_seconds": self.precompute_seconds,
+            "skipped_budget": self.skipped_budget,
+            "failed": self.failed,
+            "failed_waits": self.failed_waits,
+        }
+
+
+def register(scheduler: PrecomputeScheduler, prefix: str = "salary_app_precompute"):
+    """Export a scheduler's counters with the process metrics."""
+    register_collector(prefix, scheduler.stats)
+
+
+def clear_caches():
+    """Empty every live scheduler's slice cache (used by the benchmarks)."""
+    for scheduler in list(_schedulers):
+        scheduler.clear()
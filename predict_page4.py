@@ -28,6 +28,7 @@ from lightgbm import LGBMRegressor
 from catboost import CatBoostRegressor
 from sklearn.preprocessing import MinMaxScaler, StandardScaler, RobustScaler
 from annotated_text import annotated_text
+from model_artifact import load_artifact
 
 
 
@@ -44,9 +45,10 @@ audio_file = open('ABBA-MONEYMONEYMONEY.mp3', 'rb')
 audio_bytes = audio_file.read()
 
 def load_model():
-    with open('saved_steps (1).pkl', 'rb') as file:
-        data = pickle.load(file)
-    return data
+    # The scaler is refit below (scaler.fit_transform), so only the trees are
+    # read from the memory-mapped artifact.
+    artifact = load_artifact('saved_steps.gbm')
+    return {"model": artifact.model, "scaler": MinMaxScaler()}
 
 data = load_model()
 
@@ -0,0 +1,214 @@
+"""Bounded cache of full prediction results.
+
+An in-process LRU with a per-entry TTL, optionally backed by a SQLite file
+that several worker processes can share. Keys combine the normalized input
+profile with the dataset version, so results never outlive the data they
+were computed from. Values must be JSON-serializable when the disk tier is
+enabled. The in-process tier can also be bounded by an estimated size in
+bytes (``max_bytes`` with a ``sizeof`` function).
+
+Set ``SALARY_APP_PREDICTION_CACHE_DIR`` to enable the shared on-disk tier for
+the app and the estimate service.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from instrumentation import register_collector
+
+_MISSING = object()
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 3600.0
+DISK_PRUNE_EVERY = 256
+
+
+def cache_key(inputs: dict, dataset_version: str, schema: int = 0) -> str:
+    """Stable key for a set of inputs; ``None`` values are dropped.
+
+    ``schema`` is the caller's result-format version: bump it whenever the
+    cached value changes shape, so entries written by older code (which can
+    outlive a deploy in the shared disk tier) are never read back.
+    """
+    items = sorted((k, v) for k, v in inputs.items() if v is not None)
+    return json.dumps([schema, dataset_version, items], separators=(",", ":"), default=str)
+
+
+class _DiskTier:
+    """SQLite-backed key/value store shared between processes."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._puts = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, now: float):
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM predictions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            return _MISSING, None
+        return json.loads(row[0]), row[1]
+
+    def put(self, key: str, value, expires_at: float):
+        with self._lock:
+            self._puts += 1
+            prune = self._puts % DISK_PRUNE_EVERY == 0
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO predictions (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+            if prune:
+                conn.execute("DELETE FROM predictions WHERE expires_at <= ?", (time.time(),))
+
+    def clear(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM predictions")
+
+
+class PredictionCache:
+    """LRU + TTL cache with hit/miss counters and an optional disk tier."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl: float = DEFAULT_TTL_SECONDS, disk_path=None,
+                 max_bytes: int = None, sizeof=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk = _DiskTier(disk_path) if disk_path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, _ = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._discard(key)
+                self.expirations += 1
+
+        if self._disk is not None:
+            value, expires_at = self._disk.get(key, now)
+            if value is not _MISSING:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store(key, value, expires_at)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def put(self, key: str, value):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, expires_at)
+        if self._disk is not None:
+            self._disk.put(key, value, expires_at)
+
+    def contains(self, key: str) -> bool:
+        """Whether an unexpired entry is held in process (no counters touched)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.time()
+
+    def _store(self, key, value, expires_at):
+        size = self._sizeof(value) if self._sizeof is not None else 0
+        if key in self._entries:
+            self._discard(key)
+        self._entries[key] = (expires_at, value, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1
+        ):
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _discard(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get_or_compute(self, key: str, compute):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self._disk is not None:
+            self._disk.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> PredictionCache:
+    """Process-wide cache, configured from the environment on first use."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            cache_dir = os.environ.get("SALARY_APP_PREDICTION_CACHE_DIR")
+            _default_cache = PredictionCache(
+                max_entries=int(os.environ.get("SALARY_APP_PREDICTION_CACHE_SIZE", DEFAULT_MAX_ENTRIES)),
+                ttl=float(os.environ.get("SALARY_APP_PREDICTION_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+                disk_path=Path(cache_dir) / "predictions.sqlite" if cache_dir else None,
+            )
+            register_collector("salary_app_prediction_cache", _default_cache.stats)
+        return _default_cache
@@ -0,0 +1,121 @@
+"""Membership queries over a ``CompactTable`` from per-value row indexes.
+
+``df.query("a == @xs & b == @ys")`` parses the expression and scans every
+row of every column on each call. Here each column gets, once per table, a
+row index: the row positions grouped by value (``rows[offsets[c]:offsets[c
++ 1]]`` are the rows holding code ``c``). A query reads the candidate rows
+of its most selective column straight from that index and checks the other
+columns on those candidates only, through a per-code lookup table. Queries
+that select most of the table fall back to the full-column mask, which is
+cheaper there.
+
+Aggregates over the whole table (``cached_group_stats``) are computed once
+per table and key list and shared by every session.
+"""
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from aggregate import group_stats
+from compact import CompactTable
+
+# Above this share of the table, the most selective column's rows are
+# gathered with a mask instead of from the index.
+DENSE_FRACTION = 0.25
+
+_indexes = weakref.WeakKeyDictionary()
+_aggregates = weakref.WeakKeyDictionary()
+
+
+def row_index(table: CompactTable, col: str):
+    """``(rows, offsets)``: row positions grouped by ``col`` code, ascending within each code."""
+    per_table = _indexes.setdefault(table, {})
+    if col not in per_table:
+        codes, values = table.key_codes(col)
+        rows = np.argsort(codes, kind="stable")
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(values)), out=offsets[1:])
+        per_table[col] = (rows, offsets)
+    return per_table[col]
+
+
+def value_codes(table: CompactTable, col: str, values) -> np.ndarray:
+    """Codes of ``values`` in ``table.key_codes(col)``; values not in the table are dropped."""
+    _, dictionary = table.key_codes(col)
+    codes = pd.Index(dictionary).get_indexer(pd.Index(list(values)).unique())
+    return codes[codes >= 0]
+
+
+def values_in_order(table: CompactTable, col: str) -> list:
+    """Distinct values of ``col`` in order of first appearance, like ``Series.unique``."""
+    codes, dictionary = table.key_codes(col)
+    present, first = np.unique(codes, return_index=True)
+    return dictionary[present[np.argsort(first)]].tolist()
+
+
+def _code_rows(table: CompactTable, col: str, codes: np.ndarray) -> np.ndarray:
+    rows, offsets = row_index(table, col)
+    if len(codes) == 1:
+        return rows[offsets[codes[0]]:offsets[codes[0] + 1]]
+    return np.sort(np.concatenate([rows[offsets[c]:offsets[c + 1]] for c in codes] or [rows[:0]]))
+
+
+def _code_lookup(table: CompactTable, col: str, codes: np.ndarray):
+    key, dictionary = table.key_codes(col)
+    lookup = np.zeros(len(dictionary), dtype=bool)
+    lookup[codes] = True
+    return key, lookup
+
+
+def column_rows(table: CompactTable, col: str, values) -> np.ndarray:
+    """Sorted positions of the rows with ``col`` in ``values``, read from the row index."""
+    return _code_rows(table, col, value_codes(table, col, values))
+
+
+def select(table: CompactTable, filters: dict, strict: bool = False) -> np.ndarray:
+    """Sorted positions of the rows matching every filter (``col in values``).
+
+    Empty value lists select everything, as in ``CompactTable.mask``; with
+    ``strict`` they select nothing, as ``df.query("col == @values")`` does.
+    """
+    terms = []
+    for col, values in filters.items():
+        if values is None or len(values) == 0:
+            if strict:
+                return np.arange(0, dtype=np.intp)
+            continue
+        codes = value_codes(table, col, values)
+        _, offsets = row_index(table, col)
+        terms.append((int(np.sum(offsets[codes + 1] - offsets[codes])), col, codes))
+    if not terms:
+        return np.arange(len(table))
+    terms.sort(key=lambda term: term[0])
+
+    size, col, codes = terms[0]
+    if size > DENSE_FRACTION * len(table):
+        mask = np.ones(len(table), dtype=bool)
+        for _, col, codes in terms:
+            key, lookup = _code_lookup(table, col, codes)
+            mask &= lookup[key]
+        return np.flatnonzero(mask)
+    candidates = _code_rows(table, col, codes)
+    for _, col, codes in terms[1:]:
+        key, lookup = _code_lookup(table, col, codes)
+        candidates = candidates[lookup[key[candidates]]]
+    return candidates
+
+
+def cached_group_stats(table: CompactTable, keys, stats=("mean",), value: str = "salary_in_usd",
+                       weights: str = None) -> pd.DataFrame:
+    """``aggregate.group_stats`` over the whole table, computed once per table.
+
+    The frame is shared between callers; copy it before changing it.
+    """
+    keys = (keys,) if isinstance(keys, str) else tuple(keys)
+    stats = (stats,) if isinstance(stats, str) else tuple(stats)
+    per_table = _aggregates.setdefault(table, {})
+    key = (keys, stats, value, weights)
+    if key not in per_table:
+        per_table[key] = group_stats(table, list(keys), stats, value, weights)
+    return per_table[key]
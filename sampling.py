@@ -0,0 +1,140 @@
+"""Stratified sample of the table for approximate dashboard queries.
+
+On very large tables the Dashboard paints first from a sample drawn once at
+load time, stratified by job title x experience level, and refines to exact
+figures when the full slice is ready. Every estimate comes with a 95%
+confidence interval from the stratified design:
+
+* counts and means are domain (ratio) estimators with linearized variance;
+* medians are weighted sample quantiles with Woodruff intervals, i.e. the
+  interval of the estimated CDF at 0.5 mapped back through the quantiles.
+
+Each stratum gets a share of the sample proportional to its size, but at
+least ``MIN_PER_STRATUM`` rows (or all of them), so rare combinations still
+have usable estimates. Strata sampled completely contribute no variance.
+Configure through the environment:
+
+    SALARY_APP_APPROX_MIN_ROWS   tables at least this large paint from the sample first (default 1000000, 0 disables)
+    SALARY_APP_APPROX_SAMPLE     target sample size (default 20000)
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from aggregate import combined_codes
+from compact import CompactTable
+
+STRATA = ("job_title", "experience_level")
+DEFAULT_SAMPLE_SIZE = 20_000
+DEFAULT_MIN_ROWS = 1_000_000
+MIN_PER_STRATUM = 30
+Z_95 = 1.959964
+
+
+def approximate_min_rows() -> int:
+    """Table size from which the Dashboard paints from the sample; 0 disables."""
+    return int(os.environ.get("SALARY_APP_APPROX_MIN_ROWS", DEFAULT_MIN_ROWS))
+
+
+def sample_size() -> int:
+    return int(os.environ.get("SALARY_APP_APPROX_SAMPLE", DEFAULT_SAMPLE_SIZE))
+
+
+def _weighted_quantile(values: np.ndarray, weights: np.ndarray, q: float) -> float:
+    order = np.argsort(values, kind="stable")
+    cumulative = np.cumsum(weights[order])
+    position = np.searchsorted(cumulative, q * cumulative[-1])
+    return float(values[order][min(position, len(values) - 1)])
+
+
+class StratifiedSample:
+    """Rows of ``table`` sampled without replacement within each stratum."""
+
+    def __init__(self, table: CompactTable, strata=STRATA, size: int = DEFAULT_SAMPLE_SIZE,
+                 min_per_stratum: int = MIN_PER_STRATUM, seed: int = 0):
+        groups, _ = combined_codes(table, list(strata))
+        _, groups = np.unique(groups, return_inverse=True)
+        population = np.bincount(groups)
+        quota = np.round(size * population / max(len(table), 1)).astype(np.int64)
+        sizes = np.minimum(population, np.maximum(quota, min_per_stratum))
+
+        # A random permutation grouped by stratum: each stratum's first
+        # ``sizes[h]`` rows are a simple random sample of it.
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(len(table))
+        order = order[np.argsort(groups[order], kind="stable")]
+        starts = np.concatenate(([0], np.cumsum(population)[:-1]))
+        rank = np.arange(len(order)) - starts[groups[order]]
+        rows = np.sort(order[rank < sizes[groups[order]]])
+
+        self.strata = list(strata)
+        self.rows = rows
+        self.table = table.take(rows)
+        self.stratum = groups[rows]
+        self.population = population
+        self.sizes = sizes
+        self.weights = (population / sizes)[self.stratum]
+        self.population_rows = len(table)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _variance(self, z: np.ndarray) -> float:
+        """Variance of the estimated population total of ``z``."""
+        n = self.sizes.astype(np.float64)
+        sums = np.bincount(self.stratum, weights=z, minlength=len(n))
+        squares = np.bincount(self.stratum, weights=z * z, minlength=len(n))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            s2 = np.where(n > 1, (squares - sums ** 2 / n) / (n - 1), 0.0)
+            terms = self.population ** 2 * (1 - n / self.population) * s2 / n
+        return float(np.sum(np.nan_to_num(terms)))
+
+    def estimate(self, domain: np.ndarray, value: str = "salary_in_usd") -> dict:
+        """Count, mean and median of ``value`` over the sample rows in ``domain``.
+
+        Each statistic comes with a ``(low, high)`` 95% interval; returns
+        None when no sample row falls in the domain.
+        """
+        if not domain.any():
+            return None
+        y = self.table.column(value).astype(np.float64)
+        inside = domain.astype(np.float64)
+        count = float(np.sum(self.weights * inside))
+        mean = float(np.sum(self.weights * inside * y)) / count
+        median = _weighted_quantile(y[domain], self.weights[domain], 0.5)
+
+        count_se = np.sqrt(self._variance(inside))
+        mean_se = np.sqrt(self._variance(inside * (y - mean) / count))
+        cdf_se = np.sqrt(self._variance(inside * ((y <= median) - 0.5) / count))
+        return {
+            "count": count,
+            "count_ci": (float(count - Z_95 * count_se), float(count + Z_95 * count_se)),
+            "mean": mean,
+            "mean_ci": (float(mean - Z_95 * mean_se), float(mean + Z_95 * mean_se)),
+            "median": median,
+            "median_ci": (
+                _weighted_quantile(y[domain], self.weights[domain], max(0.0, 0.5 - Z_95 * cdf_se)),
+                _weighted_quantile(y[domain], self.weights[domain], min(1.0, 0.5 + Z_95 * cdf_se)),
+            ),
+            "exact": bool(np.all(self.sizes == self.population)),
+        }
+
+    def group_estimates(self, domain: np.ndarray, keys, value: str = "salary_in_usd") -> pd.DataFrame:
+        """``estimate`` per group of ``keys`` within ``domain``, one row per group, sorted by key.
+
+        Interval bounds are in ``<stat>_low`` / ``<stat>_high`` columns.
+        """
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        codes, _ = combined_codes(self.table, keys)
+        records = []
+        for group in np.unique(codes[domain]):
+            in_group = domain & (codes == group)
+            first = np.flatnonzero(in_group)[0]
+            record = {key: self.table.column(key)[first] for key in keys}
+            estimate = self.estimate(in_group, value)
+            for stat in ("count", "mean", "median"):
+                record[stat] = estimate[stat]
+                record[f"{stat}_low"], record[f"{stat}_high"] = estimate[f"{stat}_ci"]
+            records.append(record)
+        return pd.DataFrame(records).sort_values(keys, kind="stable").reset_index(drop=True)
@@ -0,0 +1,119 @@
+"""Per-session filter selection updated by deltas.
+
+Toggling one value in one sidebar multiselect used to rebuild the whole
+mask from every filter column and re-aggregate the whole selection. A
+``SessionSelection`` remembers each filter column's mask: an update
+recomputes only the columns whose values changed and recombines them.
+Dashboard aggregates that are sums and counts (``GroupAccumulator``) are
+then moved by the rows that entered or left the selection, as long as
+those are fewer than the rows selected; otherwise they are rebuilt.
+"""
+import numpy as np
+
+from aggregate import INCREMENTAL_STATS, GroupAccumulator, group_stats
+from compact import CompactTable
+
+
+def _normalize(values):
+    """Filter values as a comparable key; empty filters select everything."""
+    if values is None or len(values) == 0:
+        return None
+    return frozenset(values)
+
+
+class SessionSelection:
+    """A session's current selection over a shared ``CompactTable``.
+
+    Offers the subset of the table interface the dashboard helpers use
+    (``len``, ``column``, ``to_frame``, ``key_codes``) plus ``group_stats``,
+    which answers count/sum/mean aggregations from running totals.
+    """
+
+    def __init__(self, table: CompactTable):
+        self.table = table
+        self._values = {}
+        self._masks = {}
+        self.mask = np.ones(len(table), dtype=bool)
+        self._rows = None
+        self._filtered = None
+        self._accumulators = {}
+        self.last_update = None
+        self.updates = {"unchanged": 0, "delta": 0, "rebuild": 0}
+
+    def update(self, filters: dict) -> "SessionSelection":
+        """Move the selection to ``filters`` (same semantics as ``CompactTable.mask``)."""
+        values = {col: _normalize(v) for col, v in filters.items()}
+        changed = [col for col in set(values) | set(self._values) if values.get(col) != self._values.get(col)]
+        if not changed:
+            self._record("unchanged", changed, 0, 0)
+            return self
+
+        for col in changed:
+            if values.get(col) is None:
+                self._masks.pop(col, None)
+            else:
+                self._masks[col] = self.table.column_mask(col, values[col])
+        self._values = {col: v for col, v in values.items() if v is not None}
+
+        mask = np.ones(len(self.table), dtype=bool)
+        for col_mask in self._masks.values():
+            mask &= col_mask
+        moved = mask ^ self.mask
+        entered = np.flatnonzero(moved & mask)
+        left = np.flatnonzero(moved & self.mask)
+        self.mask = mask
+        self._rows = None
+        self._filtered = None
+
+        if len(entered) + len(left) < len(self):
+            for accumulator in self._accumulators.values():
+                accumulator.add(entered)
+                accumulator.remove(left)
+            self._record("delta", changed, len(entered), len(left))
+        else:
+            for accumulator in self._accumulators.values():
+                accumulator.reset(self.rows)
+            self._record("rebuild", changed, len(entered), len(left))
+        return self
+
+    def _record(self, mode: str, changed: list, entered: int, left: int):
+        self.updates[mode] += 1
+        self.last_update = {"mode": mode, "changed": sorted(changed), "entered": entered, "left": left}
+
+    @property
+    def rows(self) -> np.ndarray:
+        if self._rows is None:
+            self._rows = np.flatnonzero(self.mask)
+        return self._rows
+
+    @property
+    def filtered(self) -> CompactTable:
+        """The selected rows as their own table, built on first use after a change."""
+        if self._filtered is None:
+            self._filtered = self.table.take(self.rows)
+        return self._filtered
+
+    def __len__(self):
+        return len(self.rows)
+
+    def column(self, col: str, rows=None):
+        return self.filtered.column(col, rows)
+
+    def to_frame(self, rows=None, columns=None):
+        return self.filtered.to_frame(rows, columns)
+
+    def key_codes(self, col: str):
+        return self.filtered.key_codes(col)
+
+    def group_stats(self, keys, stats=("mean",), value: str = "salary_in_usd"):
+        """``aggregate.group_stats`` of the selection, from running totals when possible."""
+        stats_list = [stats] if isinstance(stats, str) else list(stats)
+        if value != "salary_in_usd" or not set(stats_list) <= set(INCREMENTAL_STATS):
+            return group_stats(self.filtered, keys, stats, value)
+        key = (keys,) if isinstance(keys, str) else tuple(keys)
+        accumulator = self._accumulators.get(key)
+        if accumulator is None:
+            accumulator = GroupAccumulator(self.table, key, value)
+            accumulator.reset(self.rows)
+            self._accumulators[key] = accumulator
+        return accumulator.frame(stats_list)
@@ -0,0 +1,268 @@
+"""Headless HTTP service for salary estimates.
+
+    python service.py --port 8080 --workers 4
+
+Endpoints:
+    GET  /health
+    GET  /titles?q=ml+eng&k=10   job titles matching a search-as-you-type query
+    POST /estimate         {"job_title": "Data Scientist", "experience_level": "SE", ...}
+    POST /estimate/batch   {"profiles": [{...}, ...]}
+
+Profiles accept the eight profile fields of ``ds_salaries.csv``;
+``job_title`` and ``experience_level`` are required. Job titles are mapped
+onto the dataset's canonical spelling ("ML Engineer" is "Machine Learning
+Engineer"), returned as ``matched_title`` next to the ``requested_title``;
+a title matching none of the dataset's is rejected with a 400. Each worker process
+loads the dataset and model once. Model scoring of single estimates is
+micro-batched across concurrent requests within a worker. Multiple workers
+share one pre-bound listening socket, which needs a ``fork``-capable
+platform (Linux/macOS).
+"""
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from estimator import SalaryEstimator
+from prediction_cache import cache_key, default_cache
+
+logger = logging.getLogger("service")
+
+MAX_BODY_BYTES = 8 * 2**20
+MAX_BATCH_PROFILES = 10_000
+MAX_TITLE_RESULTS = 50
+# Version of the cached ``/estimate`` result; bump when its keys change.
+RESULT_SCHEMA = 2
+
+
+class MicroBatcher:
+    """Coalesces concurrent scoring requests into one model call.
+
+    The first queued profile waits at most ``max_wait`` seconds for others to
+    arrive; up to ``max_batch`` profiles are then scored together.
+    """
+
+    def __init__(self, score_fn, max_batch: int = 64, max_wait: float = 0.002):
+        self.score_fn = score_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, profile: dict) -> Future:
+        future = Future()
+        self._queue.put((profile, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                scores = self.score_fn([profile for profile, _ in batch])
+            except Exception as exc:  # propagate to every waiting request
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            for (_, future), score in zip(batch, scores):
+                future.set_result(score)
+
+
+def _clean(value):
+    """Make a result JSON-safe (NaN std for single records becomes null)."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _clean(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clean(v) for v in value]
+    return value
+
+
+class EstimateHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "SalaryEstimator/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(_clean(payload), allow_nan=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_BODY_BYTES:
+            raise ValueError("Request body must be a JSON object under 8 MiB")
+        try:
+            return json.loads(self.rfile.read(length))
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON: {exc}") from exc
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/titles":
+            self._titles(parse_qs(url.query))
+            return
+        if self.path != "/health":
+            self._send_json(404, {"error": "Not found"})
+            return
+        estimator = self.server.estimator
+        self._send_json(200, {
+            "status": "ok",
+            "pid": os.getpid(),
+            "rows": len(estimator.df),
+            "model": estimator.scorer is not None,
+            "cache": default_cache().stats(),
+        })
+
+    def _titles(self, params: dict):
+        query = params.get("q", [""])[0]
+        try:
+            k = min(int(params.get("k", ["10"])[0]), MAX_TITLE_RESULTS)
+        except ValueError:
+            self._send_json(400, {"error": "k must be an integer"})
+            return
+        matches = self.server.estimator.titles.search(query, k=k)
+        self._send_json(200, {"query": query, "titles": [{"title": t, "score": s} for t, s in matches]})
+
+    def do_POST(self):
+        try:
+            payload = self._read_json()
+            if self.path == "/estimate":
+                result = self._estimate(payload)
+            elif self.path == "/estimate/batch":
+                result = self._estimate_batch(payload)
+            else:
+                self._send_json(404, {"error": "Not found"})
+                return
+        except ValueError as exc:
+            self._send_json(400, {"error": str(exc)})
+            return
+        except Exception:
+            logger.exception("Estimate failed")
+            self._send_json(500, {"error": "Internal error"})
+            return
+        self._send_json(200, result)
+
+    def _estimate(self, payload):
+        if not isinstance(payload, dict):
+            raise ValueError("Expected a JSON object profile")
+        profile = self.server.estimator.normalize(payload)
+        result = default_cache().get_or_compute(
+            cache_key(profile, self.server.version, schema=RESULT_SCHEMA), lambda: self._compute_estimate(profile)
+        )
+        # Spellings that map onto the same title share one cached result.
+        return {**result, "requested_title": str(payload["job_title"])}
+
+    def _compute_estimate(self, profile):
+        model_estimates = None
+        if self.server.batcher is not None:
+            model_estimates = [self.server.batcher.submit(profile).result(timeout=10)]
+        return self.server.estimator.estimate_batch([profile], model_estimates=model_estimates)[0]
+
+    def _estimate_batch(self, payload):
+        profiles = payload.get("profiles") if isinstance(payload, dict) else None
+        if not isinstance(profiles, list) or not all(isinstance(p, dict) for p in profiles):
+            raise ValueError('Expected {"profiles": [{...}, ...]}')
+        if len(profiles) > MAX_BATCH_PROFILES:
+            raise ValueError(f"At most {MAX_BATCH_PROFILES} profiles per batch")
+        # Already a batch: score it in one model call, bypassing the batcher.
+        return {"results": self.server.estimator.estimate_batch(profiles)}
+
+
+class EstimateServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, sock: socket.socket, estimator: SalaryEstimator, batcher=None):
+        super().__init__(sock.getsockname()[:2], EstimateHandler, bind_and_activate=False)
+        self.socket.close()
+        self.socket = sock
+        self.estimator = estimator
+        self.batcher = batcher
+        # Cached results depend on the data and on whether a model scored them.
+        self.version = f"{estimator.df.attrs.get('dataset_version')}:{estimator.scorer is not None}"
+
+
+def serve(sock: socket.socket, max_batch: int, max_wait: float):
+    """Worker entry point: load data and model once, then serve forever."""
+    estimator = SalaryEstimator.load()
+    batcher = None
+    if estimator.scorer is not None:
+        batcher = MicroBatcher(estimator.score, max_batch=max_batch, max_wait=max_wait)
+    server = EstimateServer(sock, estimator, batcher)
+    logger.info("Worker %d ready (model: %s)", os.getpid(), batcher is not None)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve salary estimates over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-batch", type=int, default=64, help="Max profiles per model call")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="Batching window")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(process)d %(levelname)s %(message)s",
+    )
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(1024)
+    logger.info("Listening on http://%s:%d with %d worker(s)", args.host, args.port, args.workers)
+
+    worker_args = (sock, args.max_batch, args.max_wait_ms / 1000)
+    if args.workers <= 1:
+        serve(*worker_args)
+        return
+
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=serve, args=worker_args, daemon=True) for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+
+    def shutdown(signum, frame):
+        for worker in workers:
+            worker.terminate()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        shutdown(None, None)
+
+
+if __name__ == "__main__":
+    main()
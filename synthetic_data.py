@@ -0,0 +1,221 @@
+"""Synthetic salary data generator.
+
+Learns the joint distribution of the categorical profile columns of
+``ds_salaries.csv`` and a log-normal salary distribution conditioned on each
+profile, then emits arbitrarily many rows in vectorized chunks:
+
+    python synthetic_data.py 10000000 big_salaries.parquet --seed 7
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ingest import read_source
+from utils import DATA_PATH
+
+PROFILE_COLUMNS = [
+    "work_year",
+    "experience_level",
+    "employment_type",
+    "job_title",
+    "employee_residence",
+    "remote_ratio",
+    "company_location",
+    "company_size",
+]
+
+OUTPUT_COLUMNS = [
+    "work_year",
+    "experience_level",
+    "employment_type",
+    "job_title",
+    "salary",
+    "salary_currency",
+    "salary_in_usd",
+    "employee_residence",
+    "remote_ratio",
+    "company_location",
+    "company_size",
+]
+
+# Columns stored as integers rather than strings in the source CSV.
+INTEGER_COLUMNS = {"work_year", "remote_ratio"}
+
+MIN_LOG_STD = 0.05
+
+
+class SalaryGenerator:
+    """Sampler over observed profiles with profile-conditional salaries.
+
+    Each distinct combination of ``PROFILE_COLUMNS`` plus ``salary_currency``
+    is a profile, drawn with its empirical frequency so group cardinalities
+    and cross-column correlations match the source data. ``salary_in_usd`` is
+    drawn from a log-normal whose mean is the profile's log-mean shrunk
+    towards its ``job_title`` x ``experience_level`` group (and that group
+    towards its experience level); the spread is the group's log-std.
+    ``salary`` is converted back to the profile currency with the median
+    ``salary / salary_in_usd`` ratio for that year and currency.
+    """
+
+    def __init__(self, profiles: pd.DataFrame, weights, log_mean, log_std, fx):
+        self.profiles = profiles.reset_index(drop=True)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.log_mean = np.asarray(log_mean, dtype=np.float64)
+        self.log_std = np.asarray(log_std, dtype=np.float64)
+        self.fx = np.asarray(fx, dtype=np.float64)
+        self._cumulative = np.cumsum(self.weights / self.weights.sum())
+        self._cumulative[-1] = 1.0
+
+        # Integer-code every output column once; sampling is then pure takes.
+        self._codes = {}
+        self._categories = {}
+        for col in PROFILE_COLUMNS + ["salary_currency"]:
+            codes, categories = pd.factorize(self.profiles[col], sort=True)
+            self._codes[col] = codes.astype(np.int32)
+            self._categories[col] = categories
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, shrinkage: float = 5.0) -> "SalaryGenerator":
+        """Learn profile frequencies and conditional salary parameters from ``df``."""
+        df = df.copy()
+        df["log_usd"] = np.log(df["salary_in_usd"].clip(lower=1))
+        df["fx"] = df["salary"] / df["salary_in_usd"].clip(lower=1)
+
+        # Shrinkage hierarchy: experience level -> job x experience -> profile.
+        exp_stats = df.groupby("experience_level")["log_usd"].agg(["mean", "std"])
+        group_keys = ["job_title", "experience_level"]
+        group = df.groupby(group_keys)["log_usd"].agg(["mean", "std", "count"]).reset_index()
+        group = group.join(exp_stats, on="experience_level", rsuffix="_exp")
+        weight = group["count"] / (group["count"] + shrinkage)
+        group["group_mean"] = weight * group["mean"] + (1 - weight) * group["mean_exp"]
+        group["group_std"] = group["std"].where(group["count"] >= 3, group["std_exp"])
+
+        keys = PROFILE_COLUMNS + ["salary_currency"]
+        profiles = df.groupby(keys)["log_usd"].agg(["mean", "count"]).reset_index()
+        profiles = profiles.merge(group[group_keys + ["group_mean", "group_std"]], on=group_keys)
+        weight = profiles["count"] / (profiles["count"] + shrinkage)
+        log_mean = weight * profiles["mean"] + (1 - weight) * profiles["group_mean"]
+        log_std = profiles["group_std"].fillna(exp_stats["std"].mean()).clip(lower=MIN_LOG_STD)
+
+        fx = df.groupby(["work_year", "salary_currency"])["fx"].median().rename("fx_rate")
+        fx_rate = profiles.join(fx, on=["work_year", "salary_currency"])["fx_rate"]
+
+        return cls(profiles[keys], profiles["count"], log_mean, log_std, fx_rate)
+
+    @classmethod
+    def from_csv(cls, path=DATA_PATH, **kwargs) -> "SalaryGenerator":
+        return cls.fit(read_source(path), **kwargs)
+
+    def sample(self, n_rows: int, rng=None, categorical: bool = False) -> pd.DataFrame:
+        """Draw ``n_rows`` rows.
+
+        String columns are returned as ``object`` like ``pd.read_csv`` would,
+        or as ``category`` when ``categorical`` is true (much cheaper to
+        build and to write to Parquet).
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        idx = np.searchsorted(self._cumulative, rng.random(n_rows), side="right")
+        log_usd = self.log_mean[idx] + self.log_std[idx] * rng.standard_normal(n_rows)
+        salary_in_usd = np.exp(log_usd)
+
+        data = {}
+        for col in OUTPUT_COLUMNS:
+            if col == "salary_in_usd":
+                data[col] = np.rint(salary_in_usd).astype(np.int64)
+            elif col == "salary":
+                data[col] = np.rint(salary_in_usd * self.fx[idx]).astype(np.int64)
+            elif col in INTEGER_COLUMNS:
+                data[col] = self._categories[col].to_numpy()[self._codes[col][idx]]
+            elif categorical:
+                data[col] = pd.Categorical.from_codes(self._codes[col][idx], self._categories[col])
+            else:
+                data[col] = self._categories[col].to_numpy(dtype=object)[self._codes[col][idx]]
+        return pd.DataFrame(data, columns=OUTPUT_COLUMNS)
+
+    def iter_chunks(self, n_rows: int, chunk_size: int = 1_000_000, seed: int = 0,
+                    categorical: bool = False):
+        """Yield DataFrames totalling ``n_rows`` rows.
+
+        Chunk ``i`` draws from the ``i``-th child of ``SeedSequence(seed)``,
+        so output is deterministic for a given seed and chunk size.
+        """
+        n_chunks = -(-n_rows // chunk_size) if n_rows else 0
+        children = np.random.SeedSequence(seed).spawn(n_chunks)
+        for i, child in enumerate(children):
+            size = min(chunk_size, n_rows - i * chunk_size)
+            yield self.sample(size, np.random.default_rng(child), categorical=categorical)
+
+    def write_csv(self, path, n_rows: int, chunk_size: int = 1_000_000, seed: int = 0,
+                  progress=None):
+        """Stream ``n_rows`` rows to a CSV file."""
+        written = 0
+        with open(path, "w", newline="") as f:
+            for i, chunk in enumerate(self.iter_chunks(n_rows, chunk_size, seed, categorical=True)):
+                chunk.to_csv(f, header=i == 0, index=False)
+                written += len(chunk)
+                if progress:
+                    progress(written, n_rows)
+        return written
+
+    def write_parquet(self, path, n_rows: int, chunk_size: int = 1_000_000, seed: int = 0,
+                      progress=None):
+        """Stream ``n_rows`` rows to a Parquet file, one row group per chunk."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Writing Parquet requires pyarrow (pip install pyarrow)") from exc
+
+        written = 0
+        writer = None
+        try:
+            for chunk in self.iter_chunks(n_rows, chunk_size, seed, categorical=True):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                written += len(chunk)
+                if progress:
+                    progress(written, n_rows)
+        finally:
+            if writer is not None:
+                writer.close()
+        return written
+
+
+def generate(n_rows: int, seed: int = 0, source=DATA_PATH) -> pd.DataFrame:
+    """Return ``n_rows`` synthetic rows in memory, shaped like ``ds_salaries.csv``."""
+    generator = SalaryGenerator.from_csv(source)
+    chunks = list(generator.iter_chunks(n_rows, seed=seed))
+    if not chunks:
+        return generator.sample(0)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic salary rows.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("output", type=Path, help=".csv or .parquet path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--source", type=Path, default=DATA_PATH)
+    args = parser.parse_args(argv)
+
+    generator = SalaryGenerator.from_csv(args.source)
+    start = time.perf_counter()
+
+    def progress(done, total):
+        rate = done / max(time.perf_counter() - start, 1e-9)
+        print(f"\r{done:,}/{total:,} rows ({rate:,.0f} rows/s)", end="", file=sys.stderr)
+
+    write = generator.write_parquet if args.output.suffix == ".parquet" else generator.write_csv
+    write(args.output, args.rows, chunk_size=args.chunk_size, seed=args.seed, progress=progress)
+    print(file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
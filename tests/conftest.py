@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+DATA_PATH = ROOT / "ds_salaries.csv"
+
+
+@pytest.fixture(scope="session")
+def salaries():
+    """``ds_salaries.csv`` as ingested, read straight from the source (no caches)."""
+    import ingest
+
+    return ingest.read_source(DATA_PATH)
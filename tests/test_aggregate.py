@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import aggregate
+from aggregate import STATS, distinct_count, group_stats
+from compact import CompactTable
+from utils import add_label_columns
+
+KEYS = [
+    "job_title",
+    "work_year",
+    "experience_label",
+    ["size_label", "experience_label"],
+    ["employment_label", "work_year"],
+    ["company_location", "job_title", "remote_ratio"],
+]
+
+
+@pytest.fixture(scope="module")
+def table(salaries):
+    return CompactTable.from_frame(add_label_columns(salaries.copy()))
+
+
+def _pandas_stats(frame, keys, stats, value="salary_in_usd"):
+    return frame.groupby(keys)[value].agg(list(stats)).reset_index()
+
+
+@pytest.mark.parametrize("keys", KEYS)
+def test_group_stats_matches_pandas_groupby(table, keys):
+    expected = _pandas_stats(table.to_frame(), keys, STATS)
+    pd.testing.assert_frame_equal(group_stats(table, keys, STATS), expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("keys", KEYS)
+def test_group_stats_of_a_filtered_table(table, keys):
+    filtered = table.take(table.filter_rows({"work_year": [2022, 2023], "experience_level": ["SE", "EX"]}))
+    expected = _pandas_stats(filtered.to_frame(), keys, STATS)
+    pd.testing.assert_frame_equal(group_stats(filtered, keys, STATS), expected, check_dtype=False)
+
+
+def test_group_stats_compacts_sparse_group_ids(table, monkeypatch):
+    keys = ["company_location", "job_title", "remote_ratio"]
+    dense = group_stats(table, keys, STATS)
+    monkeypatch.setattr(aggregate, "MAX_DENSE_GROUPS", 1)
+    pd.testing.assert_frame_equal(group_stats(table, keys, STATS), dense)
+
+
+def test_group_stats_of_an_empty_table(table):
+    empty = table.take(np.zeros(len(table), dtype=bool))
+    frame = group_stats(empty, "job_title", ["count", "mean", "median"])
+    assert len(frame) == 0 and list(frame.columns) == ["job_title", "count", "mean", "median"]
+
+
+def test_group_stats_rejects_unknown_stats(table):
+    with pytest.raises(ValueError, match="mode"):
+        group_stats(table, "job_title", ["mean", "mode"])
+
+
+def test_distinct_count(table):
+    filtered = table.take(table.filter_rows({"company_location": ["US", "GB"]}))
+    assert distinct_count(filtered, "job_title") == filtered.to_frame()["job_title"].nunique()
+
+
+@pytest.fixture(scope="module")
+def collapsed():
+    import ingest
+    from conftest import DATA_PATH
+
+    return CompactTable.from_frame(add_label_columns(ingest.read_source(DATA_PATH, duplicates="collapse")))
+
+
+@pytest.mark.parametrize("keys", KEYS)
+def test_weighted_group_stats_match_the_uncollapsed_rows(table, collapsed, keys):
+    assert len(collapsed) < len(table)
+    expected = _pandas_stats(table.to_frame(), keys, STATS)
+    weighted = group_stats(collapsed, keys, STATS, weights="dup_count")
+    pd.testing.assert_frame_equal(weighted, expected, check_dtype=False)
+
+
+def test_weights_must_be_positive_integers(salaries):
+    table = CompactTable.from_frame(salaries.assign(dup_count=np.arange(len(salaries)) % 3))
+    with pytest.raises(ValueError, match="positive integers"):
+        group_stats(table, "job_title", weights="dup_count")
@@ -0,0 +1,35 @@
+import pytest
+
+from benchmarks import bench_pages
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    return bench_pages.make_dataset(2_000)
+
+
+@pytest.fixture(autouse=True)
+def cold_reruns(monkeypatch):
+    # As ``bench_pages.main`` sets them: no background precompute, no usage log on disk.
+    monkeypatch.setenv("SALARY_APP_PRECOMPUTE_WORKERS", "0")
+    monkeypatch.setenv("SALARY_APP_USAGE_LOG", "")
+
+
+@pytest.mark.parametrize("page", list(bench_pages.PAGES))
+def test_every_page_runs_through_the_benchmark_harness(dataset, page):
+    module, entry = bench_pages.PAGES[page]
+    loaders = {name: getattr(module, name, None) for name in ("st", "load_data", "load_table")}
+    result = bench_pages.run_page(page, dataset, repeat=1)
+    assert result["rows"] == len(dataset)
+    assert result["helpers"][entry]["calls"] == 1
+    # The harness puts the page's own modules and loaders back.
+    assert {name: getattr(module, name, None) for name in loaders} == loaders
+
+
+def test_load_data_stub_filters_and_projects_like_load_data(dataset):
+    load_data = bench_pages._load_data_stub(dataset)
+    assert load_data() is dataset
+    df = load_data(filters={"work_year": [2023]}, columns=["job_title", "salary_in_usd"])
+    assert list(df.columns) == ["job_title", "salary_in_usd"]
+    assert len(df) == (dataset["work_year"] == 2023).sum()
+    assert df.attrs["dataset_version"] == dataset.attrs["dataset_version"]
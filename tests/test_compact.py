@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from compact import CompactTable
+from utils import add_label_columns
+
+
+@pytest.fixture(scope="module")
+def table(salaries):
+    return CompactTable.from_frame(add_label_columns(salaries.copy()))
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("col", ["salary_in_usd", "work_year", "job_title", "experience_label", "company_location"])
+def test_sorted_rows_matches_a_stable_pandas_sort(table, col, descending):
+    frame = table.to_frame()
+    expected = frame.sort_values(col, ascending=not descending, kind="stable").index.to_numpy()
+    assert np.array_equal(table.sorted_rows(col, descending=descending), expected)
+
+    mask = (frame["remote_ratio"] == 100).to_numpy()
+    expected = frame[mask].sort_values(col, ascending=not descending, kind="stable").index.to_numpy()
+    assert np.array_equal(table.sorted_rows(col, mask, descending), expected)
+
+
+def test_sorted_rows_keep_ties_in_row_order_when_descending(table):
+    rows = table.sorted_rows("work_year", descending=True)
+    years = table.column("work_year", rows)
+    for year in np.unique(years):
+        tied = rows[years == year]
+        assert np.all(np.diff(tied) > 0)
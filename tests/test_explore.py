@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import pages.explore as explore
+from benchmarks.stub_streamlit import StubStreamlit
+from compact import CompactTable
+from utils import add_label_columns
+
+
+class _Session(StubStreamlit):
+    """Stub whose ``detail_prepare_csv`` button is pressed when ``prepare`` is set."""
+
+    prepare = False
+
+    def button(self, label, **kwargs):
+        self.calls["button"] += 1
+        return self.prepare and kwargs.get("key") == "detail_prepare_csv"
+
+
+@pytest.fixture
+def page(salaries, monkeypatch):
+    table = CompactTable.from_frame(add_label_columns(salaries.copy()))
+    decoded = []
+    to_frame = table.to_frame
+
+    def spy(rows=None, columns=None):
+        decoded.append(len(table) if rows is None else len(rows))
+        return to_frame(rows, columns)
+
+    monkeypatch.setattr(table, "to_frame", spy)
+    stub = _Session()
+    monkeypatch.setattr(explore, "st", stub)
+    return table, stub, decoded
+
+
+def test_rerun_without_download_decodes_only_the_visible_page(page):
+    table, stub, decoded = page
+    mask = table.mask({"work_year": [2022, 2023]})
+    for _ in range(3):
+        explore._render_detail_table(table, mask)
+    assert decoded and max(decoded) <= max(explore.DETAIL_PAGE_SIZES)
+    assert stub.calls["download_button"] == 0
+
+
+def test_download_is_prepared_once_per_selection(page):
+    table, stub, decoded = page
+    mask = table.mask({"work_year": [2022, 2023]})
+    stub.prepare = True
+    explore._render_detail_table(table, mask)
+    n_rows = int(mask.sum())
+    assert decoded.count(n_rows) == 1
+    assert stub.calls["download_button"] == 1
+    csv = stub.session_state["detail_csv"][1].decode("utf-8")
+    assert len(csv.splitlines()) == n_rows + 1
+
+    # Later reruns offer the prepared file without decoding the selection again.
+    stub.prepare = False
+    explore._render_detail_table(table, mask)
+    assert decoded.count(n_rows) == 1 and stub.calls["download_button"] == 2
+
+    # A new selection needs a new file.
+    explore._render_detail_table(table, table.mask({"work_year": [2023]}))
+    assert stub.calls["download_button"] == 2
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from estimator import normalize_profile
+from features import ProfileFeaturizer, encode_ordinals, generate_features, training_matrix
+
+PROFILE = {
+    "work_year": 2023,
+    "experience_level": "SE",
+    "employment_type": "FT",
+    "job_title": "Data Scientist",
+    "employee_residence": "US",
+    "remote_ratio": 100,
+    "company_location": "US",
+    "company_size": "M",
+}
+
+
+@pytest.fixture(scope="module")
+def featurizer(salaries):
+    reference = generate_features(salaries)
+    X, _ = training_matrix(reference)
+    return ProfileFeaturizer(reference, X.columns)
+
+
+def test_encode_ordinals_keeps_integer_codes_next_to_unknown_values():
+    df = encode_ordinals(pd.DataFrame({
+        "experience_level": ["SE", "ZZ"],
+        "employment_type": ["FT", "FT"],
+        "remote_ratio": [100, 75],
+        "company_size": ["M", "M"],
+    }))
+    assert df["experience_level"].astype(str).iloc[0] == "3"
+    assert df["remote_ratio"].isna().tolist() == [False, True]
+
+
+def test_profile_rows_do_not_depend_on_their_batch(featurizer):
+    bad = dict(PROFILE, experience_level="ZZ", remote_ratio=75)
+    alone = featurizer.transform(pd.DataFrame([PROFILE]))
+    batched = featurizer.transform(pd.DataFrame([PROFILE, bad, PROFILE]))
+    np.testing.assert_array_equal(batched[0], alone[0])
+    np.testing.assert_array_equal(batched[2], alone[0])
+    assert featurizer.frame(pd.DataFrame([PROFILE, bad]))["cluster"].iloc[0] == \
+        featurizer.frame(pd.DataFrame([PROFILE]))["cluster"].iloc[0]
+
+
+@pytest.mark.parametrize("field, value", [
+    ("experience_level", "ZZ"),
+    ("employment_type", "XX"),
+    ("company_size", "XL"),
+    ("remote_ratio", 75),
+    ("remote_ratio", "half"),
+])
+def test_normalize_profile_rejects_unknown_ordinal_values(field, value):
+    with pytest.raises(ValueError):
+        normalize_profile({**PROFILE, field: value})
+
+
+def test_normalize_profile_fills_defaults():
+    profile = normalize_profile({"job_title": "Data Scientist", "experience_level": "SE", "remote_ratio": "50"})
+    assert profile["remote_ratio"] == 50
+    assert profile["employee_residence"] == profile["company_location"]
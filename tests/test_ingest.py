@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ingest
+from compact import SOURCE_COLUMNS, WEIGHT_COLUMN
+from conftest import DATA_PATH
+
+
+@pytest.fixture(scope="module")
+def raw():
+    return ingest.read_source(DATA_PATH, canonical=False)
+
+
+def test_row_hashes_are_equal_exactly_for_equal_rows(raw):
+    hashes = ingest.row_hashes(raw)
+    assert len(hashes) == len(raw)
+    expected = raw.duplicated(subset=SOURCE_COLUMNS).to_numpy()
+    assert np.array_equal(pd.Series(hashes).duplicated().to_numpy(), expected)
+    # Hashes do not depend on the chunk or index a row arrives in.
+    assert np.array_equal(ingest.row_hashes(raw.iloc[100:200].reset_index(drop=True)), hashes[100:200])
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 7, 500, 10_000])
+def test_duplicate_counter_matches_drop_duplicates(raw, chunk_rows):
+    counter = ingest.DuplicateCounter()
+    kept = []
+    for start in range(0, len(raw), chunk_rows):
+        kept.append(start + counter.add(raw.iloc[start:start + chunk_rows]))
+    kept = np.concatenate(kept)
+
+    expected = raw.drop_duplicates(subset=SOURCE_COLUMNS)
+    assert np.array_equal(kept, expected.index.to_numpy())
+    sizes = raw.groupby(SOURCE_COLUMNS, sort=False).size()
+    assert np.array_equal(counter.counts, sizes.to_numpy())
+    assert counter.rows == len(raw)
+    assert counter.duplicates == len(raw) - len(expected)
+
+
+def test_read_source_keeps_every_row_by_default(salaries):
+    assert len(salaries) == 3755
+    assert (salaries[WEIGHT_COLUMN] == 1).all()
+
+
+def test_read_source_collapses_after_canonicalizing_titles(tmp_path, raw):
+    row = raw.iloc[0].to_dict()
+    rows = [dict(row, job_title="ML Engineer"), dict(row, job_title="Machine Learning Engineer"), dict(row)]
+    pd.DataFrame(rows * 2).to_csv(tmp_path / "source.csv", index=False)
+
+    df = ingest.read_source(tmp_path / "source.csv", duplicates="collapse")
+    assert len(df) == 2 and df["job_title"].iloc[1] == row["job_title"]
+    assert df[WEIGHT_COLUMN].tolist() == [4, 2]
+    assert df[WEIGHT_COLUMN].sum() == len(rows) * 2
+
+
+def test_read_source_rejects_unknown_policy():
+    with pytest.raises(ValueError, match="duplicates"):
+        ingest.read_source(DATA_PATH, duplicates="drop")
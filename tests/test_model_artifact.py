@@ -0,0 +1,59 @@
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.preprocessing import MinMaxScaler
+
+from features import generate_features, training_matrix
+from model_artifact import arrays_from_sklearn, load_artifact, save_artifact
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def matrix(salaries):
+    X, y = training_matrix(generate_features(salaries))
+    return X, y
+
+
+@pytest.mark.parametrize("params", [
+    {"n_estimators": 40, "max_depth": 3},
+    # Best-first trees have leaves at different depths.
+    {"n_estimators": 25, "max_depth": None, "max_leaf_nodes": 12, "learning_rate": 0.2},
+])
+@pytest.mark.parametrize("mmap", [True, False])
+def test_artifact_predicts_like_the_sklearn_model(tmp_path, matrix, params, mmap):
+    X, y = matrix
+    scaler = MinMaxScaler().fit(X)
+    X_scaled = scaler.transform(X)
+    model = GradientBoostingRegressor(random_state=0, **params).fit(X_scaled, y)
+
+    arrays, model_meta, feature_names = arrays_from_sklearn(model, scaler)
+    artifact = load_artifact(save_artifact(tmp_path / "model.gbm", arrays, model_meta, feature_names), mmap=mmap)
+
+    assert artifact.model.n_estimators == params["n_estimators"]
+    assert list(artifact.scaler.feature_names_in_) == list(X.columns)
+    np.testing.assert_allclose(artifact.scaler.transform(X.to_numpy()), X_scaled, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(artifact.model.predict(X_scaled), model.predict(X_scaled), rtol=1e-12)
+
+
+def test_shipped_artifact_matches_the_pickle(matrix):
+    try:
+        with open(ROOT / "saved_steps.pkl", "rb") as f:
+            data = pickle.load(f)
+    except (ImportError, AttributeError, ValueError) as exc:
+        pytest.skip(f"saved_steps.pkl does not load with this scikit-learn: {exc}")
+    artifact = load_artifact(ROOT / "saved_steps.gbm")
+    X = matrix[0].reindex(columns=artifact.scaler.feature_names_in_, fill_value=0)
+    X_scaled = data["scaler"].transform(X)
+    np.testing.assert_allclose(artifact.scaler.transform(X.to_numpy()), X_scaled, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(artifact.model.predict(X_scaled), data["model"].predict(X_scaled), rtol=1e-12)
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "model.gbm"
+    path.write_bytes(b"not a model")
+    with pytest.raises(ValueError, match="not a model artifact"):
+        load_artifact(path)
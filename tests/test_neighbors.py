@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from compact import CompactTable
+from estimator import MIN_MATCHES, NEIGHBOUR_ROWS, what_if
+from neighbors import ProfileIndex
+
+PROFILE = {
+    "work_year": 2023,
+    "experience_level": "SE",
+    "employment_type": "FT",
+    "job_title": "Data Analytics Lead",
+    "employee_residence": "US",
+    "remote_ratio": 100,
+    "company_location": "US",
+    "company_size": "M",
+}
+
+
+@pytest.fixture(scope="module")
+def index(salaries):
+    return ProfileIndex(CompactTable.from_frame(salaries))
+
+
+def _nearest_holders(index, profile, field, value, min_rows):
+    """Brute force: the nearest profiles holding ``value``, until ``min_rows`` rows, ties included."""
+    distances = index.distances({**profile, field: value})
+    holders = np.flatnonzero(index.dictionaries[field][index.codes[field]] == value)
+    if not len(holders):
+        return holders
+    order = holders[np.argsort(distances[holders], kind="stable")]
+    sizes = np.cumsum(index.counts[order])
+    cutoff = distances[order[min(np.searchsorted(sizes, min_rows), len(order) - 1)]]
+    return holders[distances[holders] <= cutoff]
+
+
+@pytest.mark.parametrize("field, values", [
+    ("company_location", ["US", "GB", "DE", "IN", "ZZ"]),
+    ("company_size", ["S", "M", "L"]),
+    ("experience_level", ["EN", "MI", "SE", "EX"]),
+])
+def test_vary_similar_only_uses_profiles_holding_the_value(index, field, values):
+    counts, medians = index.vary_similar(PROFILE, field, values, NEIGHBOUR_ROWS)
+    for value, count, median in zip(values, counts, medians):
+        salaries = index.salaries_of(_nearest_holders(index, PROFILE, field, value, NEIGHBOUR_ROWS))
+        assert count == len(salaries)
+        if len(salaries):
+            assert median == np.median(salaries)
+        else:
+            assert np.isnan(median)
+
+
+def test_what_if_has_no_estimate_for_unknown_or_sparse_values(index):
+    variants = what_if(index, PROFILE, {"company_location": ["US", "GB", "ZZ"]}).set_index("value")
+    assert np.isnan(variants.loc["ZZ", "estimate"]) and variants.loc["ZZ", "count"] == 0
+    assert variants.loc["GB", "count"] >= MIN_MATCHES and not np.isnan(variants.loc["GB", "estimate"])
+    assert variants.loc["US", "current"]
+    assert (variants["estimate"].isna() == (variants["count"] < MIN_MATCHES)).all()
@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+import parquet_store
+from utils import filter_dataframe, parquet_dataset
+
+from conftest import DATA_PATH
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory, salaries):
+    return parquet_dataset(DATA_PATH, parquet_dir=tmp_path_factory.mktemp("parquet"), reader=lambda path: salaries)
+
+
+@pytest.mark.parametrize("filters, columns", [
+    (None, None),
+    (None, ["job_title", "company_location", "salary_in_usd"]),
+    ({"work_year": [2023], "experience_level": ["SE", "EX"]}, None),
+    ({"job_title": ["Data Scientist", "Data Engineer"], "remote_ratio": [0]}, ["salary_in_usd", "work_year"]),
+    ({"company_location": ["ZZ"]}, ["salary_in_usd"]),
+])
+def test_read_dataset_matches_filtering_the_frame(dataset, salaries, filters, columns):
+    df = parquet_store.read_dataset(dataset, filters, columns)
+    expected = filter_dataframe(salaries, filters or {})
+    if columns is not None:
+        expected = expected[columns]
+    pd.testing.assert_frame_equal(df, expected)
@@ -0,0 +1,59 @@
+import json
+import threading
+
+import pytest
+
+from precompute import PrecomputeScheduler, UsageLog, parse_slice, slice_key
+
+FILTERS = {"work_year": [2023, 2022], "experience_level": ["SE"]}
+
+
+def test_slice_key_is_canonical_and_round_trips():
+    key = slice_key(FILTERS)
+    assert key == slice_key({"experience_level": ["SE"], "work_year": [2022, 2023]})
+    assert parse_slice(key) == {"experience_level": ["SE"], "work_year": [2022, 2023]}
+
+
+def test_usage_log_compacts_on_write(tmp_path):
+    path = tmp_path / "usage.jsonl"
+    log = UsageLog(path, window=5)
+    for i in range(100):
+        log.record(slice_key({"work_year": [i % 3]}))
+        assert len(path.read_text().splitlines()) <= 4 * 5
+    reloaded = UsageLog(path, window=5)
+    assert reloaded.top(3) == log.top(3)
+
+
+def test_usage_log_skips_keys_of_an_older_format(tmp_path):
+    path = tmp_path / "usage.jsonl"
+    old = json.dumps(["USD", [["work_year", [2023]]]])
+    path.write_text(json.dumps({"key": old}) + "\n" + json.dumps({"key": slice_key(FILTERS)}) + "\n")
+    assert UsageLog(path).top() == [slice_key(FILTERS)]
+
+
+def test_empty_slice_is_cached():
+    calls = []
+    scheduler = PrecomputeScheduler(lambda filters: calls.append(1), workers=0)
+    assert scheduler.get_or_compute(FILTERS) is None
+    assert scheduler.get_or_compute(FILTERS) is None
+    assert len(calls) == 1
+
+
+def test_failed_background_build_is_rebuilt_by_the_page_load():
+    release = threading.Event()
+
+    def failing(filters):
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    scheduler = PrecomputeScheduler(failing, workers=1)
+    scheduler.schedule([FILTERS])
+    future = scheduler._futures[slice_key(FILTERS)]
+    threading.Timer(0.05, release.set).start()
+    # The page load waits on the in-flight build, sees it fail and builds the slice itself.
+    assert scheduler.get_or_compute(FILTERS, build=lambda filters: {"rows": 1}) == {"rows": 1}
+    with pytest.raises(RuntimeError):
+        future.result(5)
+    stats = scheduler.stats()
+    assert (stats["failed"], stats["failed_waits"]) == (1, 1)
+    assert scheduler.cache.contains(slice_key(FILTERS))
@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+
+import prediction_cache
+from prediction_cache import PredictionCache, cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable ``time.time`` for the cache module."""
+    now = [1_000.0]
+    monkeypatch.setattr(prediction_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_cache_key_ignores_order_and_none_and_includes_schema():
+    a = cache_key({"job_title": "Data Scientist", "remote_ratio": 100, "company_size": None}, "v1")
+    b = cache_key({"remote_ratio": 100, "job_title": "Data Scientist"}, "v1")
+    assert a == b
+    assert cache_key({"job_title": "x"}, "v1") != cache_key({"job_title": "x"}, "v2")
+    assert cache_key({"job_title": "x"}, "v1", schema=2) != cache_key({"job_title": "x"}, "v1", schema=3)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = PredictionCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_max_bytes_bounds_the_memory_tier():
+    cache = PredictionCache(max_entries=10, max_bytes=10, sizeof=len)
+    cache.put("a", "x" * 6)
+    cache.put("b", "y" * 6)
+    assert len(cache) == 1 and cache.get("b") == "y" * 6
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = PredictionCache(ttl=10)
+    cache.put("a", 1)
+    clock[0] += 9
+    assert cache.get("a") == 1
+    clock[0] += 2
+    assert cache.get("a", "missing") == "missing"
+    assert cache.expirations == 1
+
+
+def test_get_or_compute_computes_once():
+    cache = PredictionCache()
+    calls = []
+    for _ in range(3):
+        assert cache.get_or_compute("k", lambda: calls.append(1) or {"v": 1}) == {"v": 1}
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_disk_tier_is_shared_between_caches(tmp_path, clock):
+    path = tmp_path / "predictions.sqlite"
+    writer = PredictionCache(ttl=10, disk_path=path)
+    reader = PredictionCache(ttl=10, disk_path=path)
+    writer.put("k", {"estimate": 1.5, "stats": [1, 2]})
+    assert reader.get("k") == {"estimate": 1.5, "stats": [1, 2]}
+    assert reader.disk_hits == 1
+    assert reader.get("k") == {"estimate": 1.5, "stats": [1, 2]}
+    assert reader.hits == 1  # promoted to the memory tier
+
+    clock[0] += 11
+    assert PredictionCache(ttl=10, disk_path=path).get("k") is None
+
+
+def test_disk_tier_counts_puts_from_many_threads(tmp_path):
+    cache = PredictionCache(disk_path=tmp_path / "predictions.sqlite")
+    threads = [
+        threading.Thread(target=lambda i=i: [cache.put(f"{i}-{j}", j) for j in range(50)]) for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache._disk._puts == 200
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregate import INCREMENTAL_STATS, GroupAccumulator, group_stats
+from compact import CompactTable
+from selection import SessionSelection
+from utils import add_label_columns
+
+KEYS = ["job_title", ["size_label", "experience_label"], ["employment_label", "work_year"]]
+STATS = list(INCREMENTAL_STATS)
+
+
+@pytest.fixture(scope="module")
+def table(salaries):
+    return CompactTable.from_frame(add_label_columns(salaries.copy()))
+
+
+def _filter_sequence(table, n: int, seed: int = 0):
+    """Random sidebar changes, one filter column at a time."""
+    rng = np.random.default_rng(seed)
+    options = {col: table.values(col) for col in ["work_year", "experience_level", "remote_ratio", "job_title"]}
+    filters = {col: list(values) for col, values in options.items()}
+    for _ in range(n):
+        col = rng.choice(list(options))
+        values = options[col]
+        filters = {**filters, col: [v for v in values if rng.random() < 0.7]}
+        yield filters
+
+
+def test_accumulator_matches_group_stats_as_rows_come_and_go(table):
+    rng = np.random.default_rng(1)
+    for keys in KEYS:
+        accumulator = GroupAccumulator(table, keys)
+        selected = np.zeros(len(table), dtype=bool)
+        for _ in range(20):
+            flip = rng.random(len(table)) < 0.05
+            accumulator.add(np.flatnonzero(flip & ~selected))
+            accumulator.remove(np.flatnonzero(flip & selected))
+            selected ^= flip
+            expected = group_stats(table.take(selected), keys, STATS)
+            pd.testing.assert_frame_equal(accumulator.frame(STATS), expected, check_dtype=False)
+
+
+def test_accumulator_rejects_stats_it_does_not_maintain(table):
+    with pytest.raises(ValueError, match="median"):
+        GroupAccumulator(table, "job_title").frame(["mean", "median"])
+
+
+def test_selection_follows_filter_changes_by_delta(table):
+    selection = SessionSelection(table)
+    for keys in KEYS:
+        selection.group_stats(keys, STATS)  # start running totals
+    modes = set()
+    for filters in _filter_sequence(table, 40):
+        previous = selection.mask.copy()
+        selection.update(filters)
+        modes.add(selection.last_update["mode"])
+        mask = table.mask(filters)
+        assert np.array_equal(selection.mask, mask)
+        assert len(selection) == mask.sum()
+        assert selection.last_update["entered"] == (mask & ~previous).sum()
+        assert selection.last_update["left"] == (previous & ~mask).sum()
+        if not mask.any():
+            continue
+        filtered = table.take(mask)
+        for keys in KEYS:
+            expected = group_stats(filtered, keys, STATS)
+            pd.testing.assert_frame_equal(selection.group_stats(keys, STATS), expected, check_dtype=False)
+        expected = group_stats(filtered, "job_title", ["median", "max"])
+        pd.testing.assert_frame_equal(selection.group_stats("job_title", ["median", "max"]), expected)
+    assert {"delta", "rebuild"} <= modes
+
+
+def test_selection_reports_moved_rows_and_unchanged_updates(table):
+    selection = SessionSelection(table)
+    filters = {"work_year": [2022, 2023], "experience_level": ["SE"]}
+    selection.update(filters)
+    before = selection.mask.copy()
+
+    selection.update({**filters, "experience_level": ["SE", "EX"]})
+    after = table.mask({**filters, "experience_level": ["SE", "EX"]})
+    assert selection.last_update == {
+        "mode": "delta",
+        "changed": ["experience_level"],
+        "entered": int((after & ~before).sum()),
+        "left": int((before & ~after).sum()),
+    }
+
+    selection.update({"experience_level": ["EX", "SE"], "work_year": [2023, 2022]})
+    assert selection.last_update["mode"] == "unchanged"
+
+    # An empty filter selects everything again.
+    selection.update({**filters, "experience_level": []})
+    assert np.array_equal(selection.mask, table.mask({"work_year": [2022, 2023]}))
+    assert selection.last_update["changed"] == ["experience_level"]
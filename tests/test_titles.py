@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from estimator import SalaryEstimator
+from titles import DEFAULT_MIN_SCORE, TrigramIndex, trigrams
+
+
+@pytest.fixture(scope="module")
+def index(salaries):
+    return TrigramIndex(sorted(salaries["job_title"].unique()))
+
+
+def _brute_force_scores(index, query):
+    grams = trigrams(query)
+    return np.array([2 * len(grams & trigrams(title)) / (len(grams) + len(trigrams(title))) for title in index.titles])
+
+
+@pytest.mark.parametrize("query", ["data scientist", "ml eng", "analytics", "Lead Data Enginer", "zzz"])
+def test_scores_match_a_brute_force_dice(index, query):
+    assert np.allclose(index.scores(query), _brute_force_scores(index, query))
+
+
+@pytest.mark.parametrize("query", ["data sci", "machine learning", "BI", "Enginer"])
+def test_search_ranks_substring_matches_first_then_by_score(index, query):
+    results = index.search(query, k=10)
+    assert 0 < len(results) <= 10
+    contains = [query.lower() in title.lower() for title, _ in results]
+    assert contains == sorted(contains, reverse=True)
+    scores = dict(zip(index.titles, _brute_force_scores(index, query)))
+    for title, score in results:
+        assert title in index.titles
+        if query.lower() not in title.lower():
+            assert score == pytest.approx(scores[title]) and score >= DEFAULT_MIN_SCORE
+    # No title left out ranks above the last one returned.
+    last = results[-1][0]
+    key = lambda title: (query.lower() in title.lower(), scores[title])
+    assert all(key(title) <= key(last) for title in set(index.titles) - {t for t, _ in results})
+
+
+@pytest.mark.parametrize("title, expected", [
+    ("Data Scientist", "Data Scientist"),
+    ("data scentist", "Data Scientist"),
+    ("ML Engineer", "Machine Learning Engineer"),
+    ("Scientist Data", "Data Scientist"),
+    ("BI", None),
+    ("Sr Data Scientist", None),
+    ("Astronaut", None),
+])
+def test_match_and_canonical(index, title, expected):
+    assert index.match(title) == expected
+    assert index.canonical(title) == (title if expected is None else expected)
+
+
+def test_estimator_reports_matched_title_and_rejects_unknown_titles(salaries):
+    estimator = SalaryEstimator(salaries)
+    typo, unknown = estimator.estimate_batch([
+        {"job_title": "data scentist", "experience_level": "SE"},
+        {"job_title": "Astronaut", "experience_level": "SE"},
+    ])
+    assert (typo["requested_title"], typo["matched_title"]) == ("data scentist", "Data Scientist")
+    assert typo["profile"]["job_title"] == "Data Scientist"
+    assert "Unknown job_title 'Astronaut'" in unknown["error"]
+    with pytest.raises(ValueError, match="closest: 'Data Scientist'"):
+        estimator.normalize({"job_title": "Sr Data Scientist", "experience_level": "SE"})
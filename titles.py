@@ -0,0 +1,168 @@
+"""Job-title canonicalization and fuzzy title search.
+
+Near-duplicate spellings ("ML Engineer" / "Machine Learning Engineer",
+"Data Scientist Lead" / "Lead Data Scientist") fragment groups and inflate
+the ``job_title`` cardinality every groupby, one-hot encoding and selectbox
+pays for. Each title gets a key: lower-cased words with abbreviations
+expanded and a few variants stemmed, sorted so word order does not matter.
+Titles sharing a key are one job; the group's most frequent spelling is its
+canonical title. The mapping is built from the distinct titles only and
+applied once at ingest (``ingest.read_source``), so every cache downstream
+holds canonical titles.
+
+``TrigramIndex`` matches free text against a title list through an inverted
+index from character trigrams to titles: a query touches only the postings
+of its own trigrams and scores titles by Dice similarity. It backs the
+search boxes of the job selectors, the ``/titles`` service endpoint and the
+mapping of request titles onto the dataset's canonical ones.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# Bump when the rules change: cached datasets are keyed on it (``utils.dataset_version``).
+RULES_VERSION = 1
+
+ABBREVIATIONS = {
+    "ml": "machine learning",
+    "bi": "business intelligence",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "sr": "senior",
+    "jr": "junior",
+}
+STEMS = {
+    "financial": "finance",
+}
+DEFAULT_MIN_SCORE = 0.3
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _words(title: str) -> list:
+    words = []
+    for word in _WORD.findall(str(title).lower()):
+        words.extend(ABBREVIATIONS.get(word, STEMS.get(word, word)).split())
+    return words
+
+
+def title_key(title: str) -> str:
+    """Spelling-insensitive key: expanded, stemmed words in sorted order."""
+    return " ".join(sorted(_words(title)))
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of each word, padded like PostgreSQL's ``pg_trgm``."""
+    grams = set()
+    for word in _words(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def canonical_titles(titles: pd.Series) -> dict:
+    """``{title: canonical title}`` for every distinct title in ``titles``.
+
+    Within a key the most frequent spelling wins, ties going to the
+    alphabetically first.
+    """
+    counts = titles.value_counts()
+    frame = pd.DataFrame({"title": counts.index, "count": counts.to_numpy()})
+    frame["key"] = frame["title"].map(title_key)
+    winners = (
+        frame.sort_values(["count", "title"], ascending=[False, True], kind="stable")
+        .drop_duplicates("key")
+        .set_index("key")["title"]
+    )
+    return dict(zip(frame["title"], frame["key"].map(winners)))
+
+
+def canonicalize(df: pd.DataFrame, col: str = "job_title") -> pd.DataFrame:
+    """``df`` with ``col`` replaced by canonical titles, mapped once per distinct title."""
+    codes, uniques = pd.factorize(df[col])
+    mapping = canonical_titles(df[col])
+    canonical = np.asarray([mapping[title] for title in uniques], dtype=object)
+    df[col] = pd.Series(canonical[codes], index=df.index, dtype=df[col].dtype)
+    return df
+
+
+class TrigramIndex:
+    """Inverted index from character trigrams to the titles containing them."""
+
+    def __init__(self, titles):
+        self.titles = list(titles)
+        self.keys = {}
+        grams_per_title = []
+        for i, title in enumerate(self.titles):
+            grams_per_title.append(trigrams(title))
+            self.keys.setdefault(title_key(title), i)
+        vocabulary = sorted(set().union(*grams_per_title)) if grams_per_title else []
+        self._gram_ids = {gram: i for i, gram in enumerate(vocabulary)}
+
+        # CSR postings: titles holding gram g are postings[offsets[g]:offsets[g + 1]].
+        gram_ids = np.asarray(
+            [self._gram_ids[gram] for grams in grams_per_title for gram in grams], dtype=np.int64
+        )
+        title_ids = np.repeat(np.arange(len(self.titles)), [len(grams) for grams in grams_per_title])
+        order = np.argsort(gram_ids, kind="stable")
+        self._postings = title_ids[order]
+        self._offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(gram_ids, minlength=len(vocabulary)), out=self._offsets[1:])
+        self._sizes = np.asarray([len(grams) for grams in grams_per_title], dtype=np.float64)
+        self._lengths = np.asarray([len(_words(title)) for title in self.titles])
+
+    def __len__(self):
+        return len(self.titles)
+
+    def scores(self, query: str) -> np.ndarray:
+        """Dice similarity of ``query`` to every title, from the postings of its trigrams."""
+        grams = trigrams(query)
+        ids = [self._gram_ids[gram] for gram in grams if gram in self._gram_ids]
+        if not ids or not self.titles:
+            return np.zeros(len(self.titles))
+        hits = np.concatenate([self._postings[self._offsets[g]:self._offsets[g + 1]] for g in ids])
+        shared = np.bincount(hits, minlength=len(self.titles))
+        return 2 * shared / (self._sizes + len(grams))
+
+    def search(self, query: str, k: int = 10, min_score: float = DEFAULT_MIN_SCORE) -> list:
+        """Up to ``k`` ``(title, score)`` pairs, best first.
+
+        Titles containing the query as a substring rank first, so typing a
+        prefix behaves as users expect from a search box.
+        """
+        scores = self.scores(query)
+        needle = str(query).strip().lower()
+        if needle:
+            contains = np.fromiter((needle in title.lower() for title in self.titles), dtype=bool,
+                                   count=len(self.titles))
+            scores = np.where(contains, 1 + scores, scores)
+        candidates = np.flatnonzero(scores >= min_score)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        order = sorted(candidates, key=lambda i: (-scores[i], self.titles[i]))
+        return [(self.titles[i], float(min(scores[i], 1.0))) for i in order]
+
+    def match(self, title: str, min_score: float = 0.75, margin: float = 0.05):
+        """The indexed title ``title`` refers to, or None when none is close.
+
+        Exact key matches win. Otherwise the most similar title with as many
+        words is taken if it scores at least ``min_score`` and beats the
+        runner-up by ``margin``: typos are caught, partial ("BI") and
+        ambiguous ("Sr Data Scientist") titles match nothing.
+        """
+        i = self.keys.get(title_key(title))
+        if i is not None:
+            return self.titles[i]
+        scores = np.where(self._lengths == len(_words(title)), self.scores(title), 0.0)
+        if len(scores) == 0:
+            return None
+        best = int(np.argmax(scores))
+        runner_up = np.partition(scores, -2)[-2] if len(scores) > 1 else 0.0
+        if scores[best] >= min_score and scores[best] - runner_up >= margin:
+            return self.titles[best]
+        return None
+
+    def canonical(self, title: str, min_score: float = 0.75, margin: float = 0.05) -> str:
+        """``match``, keeping ``title`` itself when no indexed title is close."""
+        matched = self.match(title, min_score, margin)
+        return title if matched is None else matched
@@ -0,0 +1,248 @@
+"""Command-line training pipeline for the salary model.
+
+Replaces the notebook-only training run. The pipeline has four stages:
+
+    load      ds_salaries.csv, or the memory-mapped compact table (--source table)
+    features  generate_features
+    cv        k-fold cross-validation, folds evaluated in parallel
+    fit       final model and scaler on all rows
+
+and then writes the model artifact (``trained_model.gbm`` unless
+``--output`` says otherwise) plus a JSON metrics report. Each stage's
+output is cached under ``.train_cache/`` keyed by its inputs (dataset
+version, code, parameters), so re-running after a hyperparameter change
+reuses the loaded data and features and only refits:
+
+    python train.py --max-depth 6 --learning-rate 0.05
+    python train.py --params-from tuning_report.json
+    python train.py --output saved_steps.gbm   # replace the model the app serves
+
+``--encoding`` picks how categorical columns enter the model: the dense
+one-hot matrix of the notebook (default), the same columns as a sparse CSR
+matrix, or out-of-fold target/frequency encoding (``encoders.py``).
+"""
+import argparse
+import hashlib
+import json
+import math
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+import numpy as np
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.ensemble import GradientBoostingRegressor
+
+import encoders
+import features
+from compact import SOURCE_COLUMNS
+from model_artifact import MinMaxParams
+from tuning import RANDOM_STATE, encode_folds, export, fit_final
+from utils import DATA_PATH, MODEL_ARTIFACT_PATH, dataset_version, read_salaries, read_table
+
+CACHE_DIR = Path(__file__).parent / ".train_cache"
+REPORT_PATH = Path(__file__).parent / "training_report.json"
+# Not the shipped ``saved_steps.gbm``: replacing the model the app and the
+# service load takes an explicit ``--output saved_steps.gbm``.
+OUTPUT_PATH = Path(__file__).parent / "trained_model.gbm"
+KEEP_PER_STAGE = 4
+
+# Hyperparameters of the model in saved_steps.pkl (the notebook's grid winner).
+DEFAULT_PARAMS = {
+    "n_estimators": 500,
+    "learning_rate": 0.1,
+    "max_depth": 8,
+    "subsample": 0.5,
+}
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _source_digest(module) -> str:
+    """Hash of a module's source, so code changes invalidate its stage."""
+    return hashlib.sha1(Path(module.__file__).read_bytes()).hexdigest()[:16]
+
+
+class StageCache:
+    """Stage outputs persisted with joblib, keyed by a digest of their inputs.
+
+    ``directory=None`` disables caching. Only the newest ``KEEP_PER_STAGE``
+    outputs of each stage are kept.
+    """
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = Path(directory) if directory is not None else None
+        self.timings = {}
+
+    def run(self, stage: str, key: str, compute):
+        start = time.perf_counter()
+        path = self.directory / f"{stage}-{key}.joblib" if self.directory is not None else None
+        if path is not None and path.exists():
+            value = joblib.load(path)
+            cached = True
+        else:
+            value = compute()
+            cached = False
+            if path is not None:
+                self._store(stage, path, value)
+        elapsed = time.perf_counter() - start
+        self.timings[stage] = {"seconds": elapsed, "cached": cached, "key": key}
+        print(f"{stage:>9}: {'cached' if cached else 'computed'} in {elapsed:.2f} s", file=sys.stderr)
+        return value
+
+    def _store(self, stage: str, path: Path, value):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        joblib.dump(value, tmp)
+        tmp.replace(path)
+        outputs = sorted(self.directory.glob(f"{stage}-*.joblib"), key=lambda p: p.stat().st_mtime)
+        for stale in outputs[:-KEEP_PER_STAGE]:
+            stale.unlink(missing_ok=True)
+
+
+def load_frame(path=DATA_PATH, source: str = "csv"):
+    """Raw dataset rows from the CSV or from the compact table cache."""
+    if source == "table":
+        return read_table(path).to_frame(columns=SOURCE_COLUMNS)
+    return read_salaries(path)
+
+
+def _metrics(y_true: np.ndarray, y_pred: np.ndarray) -> dict:
+    """Errors on the log target and in USD."""
+    residual = y_true - y_pred
+    usd_true, usd_pred = np.exp(y_true), np.exp(y_pred)
+    return {
+        "r2": float(1 - np.sum(residual ** 2) / np.sum((y_true - y_true.mean()) ** 2)),
+        "rmse_log": float(math.sqrt(np.mean(residual ** 2))),
+        "mae_usd": float(np.mean(np.abs(usd_true - usd_pred))),
+        "mape": float(np.mean(np.abs(usd_true - usd_pred) / usd_true)),
+    }
+
+
+def _evaluate_fold(params: dict, fold: tuple) -> dict:
+    X_train, y_train, X_val, y_val = fold
+    model = GradientBoostingRegressor(**params, random_state=RANDOM_STATE).fit(X_train, y_train)
+    return _metrics(np.asarray(y_val), model.predict(X_val))
+
+
+def cross_validate(frame, params: dict, encoding: str = "onehot", n_folds: int = 5,
+                   seed: int = RANDOM_STATE, n_jobs: int = -1, fold_cache=None) -> dict:
+    """Per-fold metrics plus their mean and standard deviation.
+
+    ``frame`` is ``generate_features`` output. Dense one-hot folds are cached
+    in ``fold_cache``; other encodings are fitted per training fold.
+    """
+    if encoding == "onehot":
+        X, y = features.training_matrix(frame)
+        folds = encode_folds(X.to_numpy(), y, n_folds, seed, fold_cache)
+    else:
+        folds = encoders.encode_folds(frame, features.training_target(frame), encoding, n_folds, seed)
+    per_fold = Parallel(n_jobs=n_jobs)(delayed(_evaluate_fold)(params, fold) for fold in folds)
+    summary = {}
+    for name in per_fold[0]:
+        values = np.array([m[name] for m in per_fold])
+        summary[name] = {"mean": float(values.mean()), "std": float(values.std(ddof=1)) if len(values) > 1 else 0.0}
+    return {"folds": per_fold, "summary": summary}
+
+
+def fit_encoded(frame, params: dict, encoding: str = "onehot"):
+    """Final model plus the preprocessing parameters to store with it."""
+    if encoding == "onehot":
+        return fit_final(*features.training_matrix(frame), params)
+    y = features.training_target(frame)
+    encoder = encoders.make_encoder(encoding)
+    model = GradientBoostingRegressor(**params, random_state=RANDOM_STATE)
+    model.fit(encoder.fit_transform(frame, y), y)
+    n = len(encoder.feature_names)
+    # No scaling: an identity scaler carrying the feature names and encoder state.
+    return model, MinMaxParams(np.ones(n), np.zeros(n), encoder.feature_names, encoder=encoder.state())
+
+
+def read_params(args) -> dict:
+    params = dict(DEFAULT_PARAMS)
+    if args.params_from:
+        params.update(json.loads(args.params_from.read_text())["best_params"])
+    for name in DEFAULT_PARAMS:
+        value = getattr(args, name)
+        if value is not None:
+            params[name] = value
+    return params
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", type=Path, default=DATA_PATH)
+    parser.add_argument("--source", choices=["csv", "table"], default="csv")
+    parser.add_argument("--n-estimators", dest="n_estimators", type=int)
+    parser.add_argument("--learning-rate", dest="learning_rate", type=float)
+    parser.add_argument("--max-depth", dest="max_depth", type=int)
+    parser.add_argument("--subsample", type=float)
+    parser.add_argument("--params-from", type=Path, help="tuning.py report whose best_params to train")
+    parser.add_argument("--encoding", choices=list(encoders.ENCODINGS), default="onehot")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=RANDOM_STATE)
+    parser.add_argument("--jobs", type=int, default=-1, help="parallel fold fits (joblib n_jobs)")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every stage")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH,
+                        help=f"model artifact path (the app loads {MODEL_ARTIFACT_PATH.name})")
+    parser.add_argument("--report", type=Path, default=REPORT_PATH)
+    args = parser.parse_args(argv)
+
+    params = read_params(args)
+    cache = StageCache(None if args.no_cache else CACHE_DIR)
+    start = time.perf_counter()
+
+    data_key = _digest(dataset_version(args.data), args.source)
+    df = cache.run("load", data_key, lambda: load_frame(args.data, args.source))
+    features_key = _digest(data_key, _source_digest(features))
+    frame = cache.run("features", features_key, lambda: features.generate_features(df))
+
+    model_key = _digest(features_key, _source_digest(encoders), args.encoding, params, sklearn.__version__)
+    cv = cache.run(
+        "cv",
+        _digest(model_key, args.folds, args.seed),
+        lambda: cross_validate(frame, params, args.encoding, args.folds, args.seed, args.jobs,
+                               None if args.no_cache else CACHE_DIR / "folds"),
+    )
+    model, scaler = cache.run("fit", model_key, lambda: fit_encoded(frame, params, args.encoding))
+
+    export(model, scaler, args.output, source={
+        "file": Path(args.data).name,
+        "dataset_version": dataset_version(args.data),
+        "encoding": args.encoding,
+        "params": params,
+        "cv": cv["summary"],
+    }, encoder=getattr(scaler, "encoder", None))
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "data": str(args.data),
+        "dataset_version": dataset_version(args.data),
+        "rows": int(len(frame)),
+        "features": int(len(scaler.feature_names_in_)),
+        "encoding": args.encoding,
+        "params": params,
+        "sklearn_version": sklearn.__version__,
+        "cv": cv,
+        "stages": cache.timings,
+        "seconds": time.perf_counter() - start,
+        "artifact": str(args.output),
+    }
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    args.report.write_text(json.dumps(report, indent=2))
+
+    summary = cv["summary"]
+    print(
+        f"cv r2 {summary['r2']['mean']:.4f} ± {summary['r2']['std']:.4f}, "
+        f"rmse (log) {summary['rmse_log']['mean']:.4f}, mae ${summary['mae_usd']['mean']:,.0f}; "
+        f"wrote {args.output} and {args.report}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
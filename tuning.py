@@ -0,0 +1,324 @@
+"""Hyperparameter search for the salary GBM by successive halving.
+
+The training notebook runs ``GridSearchCV`` over 16 configurations and fits
+every one to completion on all 5 folds. Here the number of trees is the
+budget instead of a grid dimension:
+
+* every candidate starts with a small ``n_estimators`` budget; after each
+  rung only the best ``1 / eta`` of the candidates continue, and their fold
+  models are extended with ``warm_start`` rather than refitted;
+* ``staged_predict`` scores every tree count up to the budget from one fit,
+  so the best ``n_estimators`` of a candidate comes for free, and a
+  candidate whose validation error stopped improving ``patience`` trees ago
+  is not extended any further (early stopping);
+* ``hyperband`` runs several such brackets with different starting budgets.
+
+Fold fits run in parallel through joblib. The scaled fold matrices are
+cached as ``.npy`` files keyed by the data, so repeated searches skip the
+encoding and the worker processes share one memory-mapped copy. The chosen
+configuration is refitted on all rows and written in the serving format of
+``model_artifact.py``:
+
+    python tuning.py --method hyperband --output saved_steps.gbm
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.model_selection import KFold
+from sklearn.preprocessing import MinMaxScaler
+
+from features import generate_features, training_matrix
+from model_artifact import arrays_from_sklearn, save_artifact
+from utils import DATA_PATH, read_salaries
+
+CACHE_DIR = Path(__file__).parent / ".tuning_cache"
+CACHE_FORMAT = 1
+RANDOM_STATE = 17
+
+# The notebook's grid without n_estimators, widened now that most
+# candidates are dropped after a few trees.
+DEFAULT_SPACE = {
+    "max_depth": [3, 4, 5, 6, 8],
+    "learning_rate": [0.01, 0.05, 0.1, 0.2],
+    "subsample": [0.5, 0.8, 1.0],
+}
+
+DEFAULT_MIN_ESTIMATORS = 20
+DEFAULT_MAX_ESTIMATORS = 500
+DEFAULT_ETA = 3
+DEFAULT_PATIENCE = 50
+
+
+def parameter_grid(space: dict) -> list:
+    """Every combination of the values in ``space``, as parameter dicts."""
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def _data_key(X: np.ndarray, y: np.ndarray, n_folds: int, seed: int) -> str:
+    digest = hashlib.sha1()
+    digest.update(json.dumps([CACHE_FORMAT, X.shape, n_folds, seed]).encode())
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def encode_folds(X, y, n_folds: int = 5, seed: int = RANDOM_STATE, cache_dir=CACHE_DIR) -> list:
+    """Scaled ``(X_train, y_train, X_val, y_val)`` per fold, cached on disk.
+
+    The scaler is fitted on each training fold. ``X`` is stored as float32,
+    the dtype the tree builder works in, so fits do not copy it; arrays come
+    back memory-mapped. ``cache_dir=None`` keeps everything in memory.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    directory = Path(cache_dir) / _data_key(X, y, n_folds, seed) if cache_dir is not None else None
+    names = ("X_train", "y_train", "X_val", "y_val")
+
+    if directory is not None and (directory / "done").exists():
+        return [
+            tuple(np.load(directory / f"{i}_{name}.npy", mmap_mode="r") for name in names)
+            for i in range(n_folds)
+        ]
+
+    folds = []
+    for train, val in KFold(n_folds, shuffle=True, random_state=seed).split(X):
+        scaler = MinMaxScaler().fit(X[train])
+        folds.append((
+            scaler.transform(X[train]).astype(np.float32),
+            y[train],
+            scaler.transform(X[val]).astype(np.float32),
+            y[val],
+        ))
+    if directory is None:
+        return folds
+
+    directory.mkdir(parents=True, exist_ok=True)
+    for i, fold in enumerate(folds):
+        for name, array in zip(names, fold):
+            np.save(directory / f"{i}_{name}.npy", array)
+    (directory / "done").touch()
+    return encode_folds(X, y, n_folds, seed, cache_dir)
+
+
+def _fit_fold(model, params: dict, fold: tuple, budget: int):
+    """Grow one fold's model to ``budget`` trees; validation MSE per stage."""
+    X_train, y_train, X_val, y_val = fold
+    if model is None:
+        model = GradientBoostingRegressor(**params, n_estimators=budget, warm_start=True,
+                                          random_state=RANDOM_STATE)
+    else:
+        model.set_params(n_estimators=budget)
+    model.fit(X_train, y_train)
+    errors = np.array([np.mean((y_val - pred) ** 2) for pred in model.staged_predict(X_val)])
+    return model, errors
+
+
+class Candidate:
+    """One configuration's fold models and cross-validated error curve."""
+
+    def __init__(self, params: dict):
+        self.params = params
+        self.models = None
+        self.curve = np.empty(0)
+        self.converged = False
+
+    @property
+    def best_n_estimators(self) -> int:
+        return int(np.argmin(self.curve)) + 1
+
+    @property
+    def score(self) -> float:
+        """Lowest mean validation MSE (log salary) over the stages fitted so far."""
+        return float(self.curve.min())
+
+    def summary(self) -> dict:
+        return {
+            "params": self.params,
+            "n_estimators": self.best_n_estimators,
+            "cv_mse": self.score,
+            "cv_rmse": math.sqrt(self.score),
+            "trees": len(self.curve),
+        }
+
+
+class SearchResult:
+    """Outcome of a search: the best candidate plus per-rung history."""
+
+    def __init__(self, best: Candidate, history: list, trees_fitted: int, seconds: float):
+        self.best = best
+        self.history = history
+        self.trees_fitted = trees_fitted
+        self.seconds = seconds
+
+    @property
+    def best_params(self) -> dict:
+        return {**self.best.params, "n_estimators": self.best.best_n_estimators}
+
+    def report(self) -> dict:
+        return {
+            "best": self.best.summary(),
+            "best_params": self.best_params,
+            "trees_fitted": self.trees_fitted,
+            "seconds": self.seconds,
+            "history": self.history,
+        }
+
+
+def rung_budgets(min_estimators: int, max_estimators: int, eta: int) -> list:
+    """Tree budgets ``min * eta**i``, ending exactly at ``max_estimators``."""
+    budgets = [min_estimators]
+    while budgets[-1] * eta < max_estimators:
+        budgets.append(budgets[-1] * eta)
+    if budgets[-1] < max_estimators:
+        budgets.append(max_estimators)
+    return budgets
+
+
+def successive_halving(candidates, folds: list, min_estimators: int = DEFAULT_MIN_ESTIMATORS,
+                       max_estimators: int = DEFAULT_MAX_ESTIMATORS, eta: int = DEFAULT_ETA,
+                       patience: int = DEFAULT_PATIENCE, n_jobs: int = -1, bracket: int = 0,
+                       verbose: bool = False) -> SearchResult:
+    """Race ``candidates`` (parameter dicts) on ``folds`` with growing tree budgets."""
+    start = time.perf_counter()
+    alive = [Candidate(params) for params in candidates]
+    history, trees_fitted = [], 0
+
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for rung, budget in enumerate(rung_budgets(min_estimators, max_estimators, eta)):
+            pending = [c for c in alive if not c.converged and len(c.curve) < budget]
+            outputs = iter(parallel(
+                delayed(_fit_fold)(c.models[i] if c.models else None, c.params, fold, budget)
+                for c in pending for i, fold in enumerate(folds)
+            ))
+            for c in pending:
+                trees_fitted += (budget - len(c.curve)) * len(folds)
+                results = [next(outputs) for _ in folds]
+                c.models = [model for model, _ in results]
+                c.curve = np.mean([errors for _, errors in results], axis=0)
+                c.converged = budget - c.best_n_estimators >= patience
+
+            alive.sort(key=lambda c: c.score)
+            for c in alive:
+                history.append({"bracket": bracket, "rung": rung, "budget": budget, **c.summary()})
+            if verbose:
+                best = alive[0]
+                print(
+                    f"bracket {bracket} rung {rung}: {len(alive):3d} candidates, {budget:4d} trees, "
+                    f"best rmse {math.sqrt(best.score):.4f} at {best.best_n_estimators} trees {best.params}",
+                    file=sys.stderr,
+                )
+            if budget >= max_estimators:
+                break
+            keep = max(1, len(alive) // eta)
+            for c in alive[keep:]:
+                c.models = None  # release the dropped candidates' trees
+            alive = alive[:keep]
+
+    return SearchResult(alive[0], history, trees_fitted, time.perf_counter() - start)
+
+
+def hyperband(space: dict, folds: list, min_estimators: int = DEFAULT_MIN_ESTIMATORS,
+              max_estimators: int = DEFAULT_MAX_ESTIMATORS, eta: int = DEFAULT_ETA,
+              patience: int = DEFAULT_PATIENCE, n_jobs: int = -1, seed: int = RANDOM_STATE,
+              verbose: bool = False) -> SearchResult:
+    """Successive halving brackets from many-cheap to few-expensive candidates.
+
+    Bracket ``s`` samples ``ceil((s_max + 1) / (s + 1) * eta**s)`` candidates
+    from the grid and starts them at ``max_estimators / eta**s`` trees.
+    """
+    start = time.perf_counter()
+    grid = parameter_grid(space)
+    rng = np.random.default_rng(seed)
+    s_max = len(rung_budgets(min_estimators, max_estimators, eta)) - 1
+    results = []
+    for s in range(s_max, -1, -1):
+        n = min(len(grid), math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        chosen = [grid[i] for i in rng.choice(len(grid), size=n, replace=False)]
+        results.append(successive_halving(
+            chosen, folds, min_estimators=max(1, round(max_estimators / eta ** s)),
+            max_estimators=max_estimators, eta=eta, patience=patience, n_jobs=n_jobs,
+            bracket=s_max - s, verbose=verbose,
+        ))
+
+    best = min(results, key=lambda r: r.best.score)
+    return SearchResult(
+        best.best,
+        [row for r in results for row in r.history],
+        sum(r.trees_fitted for r in results),
+        time.perf_counter() - start,
+    )
+
+
+def fit_final(X, y, params: dict):
+    """Scaler and model fitted on all rows with the chosen parameters."""
+    scaler = MinMaxScaler().fit(X)
+    model = GradientBoostingRegressor(**params, random_state=RANDOM_STATE)
+    model.fit(scaler.transform(X).astype(np.float32), y)
+    return model, scaler
+
+
+def export(model, scaler, path, source: dict = None, encoder: dict = None) -> Path:
+    """Write a fitted model and scaler as a ``model_artifact`` file."""
+    arrays, model_meta, feature_names = arrays_from_sklearn(model, scaler)
+    source = {"sklearn_version": sklearn.__version__, **(source or {})}
+    return save_artifact(path, arrays, model_meta, feature_names, source=source, encoder=encoder)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", type=Path, default=DATA_PATH)
+    parser.add_argument("--method", choices=["halving", "hyperband"], default="halving")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--min-estimators", type=int, default=DEFAULT_MIN_ESTIMATORS)
+    parser.add_argument("--max-estimators", type=int, default=DEFAULT_MAX_ESTIMATORS)
+    parser.add_argument("--eta", type=int, default=DEFAULT_ETA)
+    parser.add_argument("--patience", type=int, default=DEFAULT_PATIENCE)
+    parser.add_argument("--jobs", type=int, default=-1, help="parallel fold fits (joblib n_jobs)")
+    parser.add_argument("--seed", type=int, default=RANDOM_STATE)
+    parser.add_argument("--no-cache", action="store_true", help="do not cache the encoded folds")
+    parser.add_argument("--output", type=Path, help="write the refitted model artifact here")
+    parser.add_argument("--report", type=Path, help="JSON report path")
+    args = parser.parse_args(argv)
+
+    X, y = training_matrix(generate_features(read_salaries(args.data)))
+    folds = encode_folds(X.to_numpy(), y, args.folds, args.seed, None if args.no_cache else CACHE_DIR)
+    options = dict(min_estimators=args.min_estimators, max_estimators=args.max_estimators, eta=args.eta,
+                   patience=args.patience, n_jobs=args.jobs, verbose=True)
+    if args.method == "hyperband":
+        result = hyperband(DEFAULT_SPACE, folds, seed=args.seed, **options)
+    else:
+        result = successive_halving(parameter_grid(DEFAULT_SPACE), folds, **options)
+
+    exhaustive = len(parameter_grid(DEFAULT_SPACE)) * args.folds * args.max_estimators
+    print(
+        f"Best {result.best_params}: cv rmse {math.sqrt(result.best.score):.4f} (log salary); "
+        f"{result.trees_fitted:,} trees fitted in {result.seconds:.1f} s "
+        f"(a full grid would fit {exhaustive:,})",
+        file=sys.stderr,
+    )
+
+    report = result.report()
+    if args.output:
+        model, scaler = fit_final(X, y, result.best_params)
+        export(model, scaler, args.output, source={"file": Path(args.data).name, "tuning": result.best.summary()})
+        report["artifact"] = str(args.output)
+        print(f"Wrote {args.output}", file=sys.stderr)
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.report}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,31 @@
 import pandas as pd
 import streamlit as st
 import pickle
+import functools
+import hashlib
+import logging
+import os
+import shutil
 from pathlib import Path
 
-DATA_PATH = Path(__file__).parent / "ds_salaries.csv"
+import ingest
+import parquet_store
+from compact import LABEL_COLUMNS, CompactTable
+from instrumentation import timed
+from model_artifact import load_artifact
+from titles import TrigramIndex
+
+# A CSV or Excel source; ingest Excel once with ``python ingest.py`` before serving it.
+DATA_PATH = Path(os.environ.get("SALARY_APP_DATA", Path(__file__).parent / "ds_salaries.csv"))
 MODEL_PATH = Path(__file__).parent / "saved_steps.pkl"
+MODEL_ARTIFACT_PATH = Path(__file__).parent / "saved_steps.gbm"
+TABLE_DIR = Path(os.environ.get("SALARY_APP_TABLE_DIR", Path(__file__).parent / ".table_cache"))
+PARQUET_DIR = Path(os.environ.get("SALARY_APP_PARQUET_DIR", Path(__file__).parent / ".parquet_cache"))
+PARQUET_PARTITIONS = tuple(
+    os.environ.get("SALARY_APP_PARQUET_PARTITIONS", ",".join(parquet_store.DEFAULT_PARTITIONS)).split(",")
+)
+
+logger = logging.getLogger(__name__)
 
 EXPERIENCE_LABELS = {
     "EN": "Entry Level",
@@ -32,6 +53,14 @@ REMOTE_LABELS = {
     100: "Remote",
 }
 
+CURRENCY_SYMBOLS = {
+    "USD": "$",
+    "EUR": "€",
+    "GBP": "£",
+    "INR": "₹",
+    "JPY": "¥",
+}
+
 TOP_JOB_TITLES = [
     "Data Engineer",
     "Data Scientist",
@@ -42,32 +71,169 @@ TOP_JOB_TITLES = [
 ]
 
 
-@st.cache_data
-def load_data() -> pd.DataFrame:
-    """Load and prepare the salary dataset."""
-    df = pd.read_csv(DATA_PATH)
-    df["experience_label"] = df["experience_level"].map(EXPERIENCE_LABELS)
-    df["employment_label"] = df["employment_type"].map(EMPLOYMENT_LABELS)
-    df["size_label"] = df["company_size"].map(COMPANY_SIZE_LABELS)
-    df["remote_label"] = df["remote_ratio"].map(REMOTE_LABELS)
+def add_label_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the human-readable label columns used by the pages.
+
+    Labels whose source column was not read are skipped.
+    """
+    for label, source, labels in (
+        ("experience_label", "experience_level", EXPERIENCE_LABELS),
+        ("employment_label", "employment_type", EMPLOYMENT_LABELS),
+        ("size_label", "company_size", COMPANY_SIZE_LABELS),
+        ("remote_label", "remote_ratio", REMOTE_LABELS),
+    ):
+        if source in df.columns:
+            df[label] = df[source].map(labels)
     return df
 
 
-@st.cache_resource
-def load_model():
-    """Load the pre-trained model and scaler from pickle."""
-    if not MODEL_PATH.exists():
+@functools.lru_cache(maxsize=8)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256(ingest.INGEST_VERSION.encode())
+    digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def dataset_version(path=DATA_PATH) -> str:
+    """Content hash of a data file and the ingest rules, recomputed only when the file changes."""
+    stat = Path(path).stat()
+    return _file_digest(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def parquet_dataset(path=DATA_PATH, parquet_dir=PARQUET_DIR, partition_cols=PARQUET_PARTITIONS,
+                    reader=ingest.read_source) -> Path:
+    """Partitioned Parquet copy of the source, written once per dataset version.
+
+    ``reader`` parses and validates the source (``ingest.read_source``).
+    """
+    version = dataset_version(path)
+    directory = Path(parquet_dir) / f"{version}-{'-'.join(partition_cols)}"
+    if not directory.exists():
+        parquet_store.write_dataset(reader(path), directory, partition_cols)
+        for stale in Path(parquet_dir).iterdir():
+            if stale.is_dir() and stale.name != directory.name and not stale.name.startswith("."):
+                shutil.rmtree(stale, ignore_errors=True)
+    return directory
+
+
+def read_salaries(path=DATA_PATH, filters: dict = None, columns=None) -> pd.DataFrame:
+    """Read and prepare the salary dataset without Streamlit caching.
+
+    Reads the partitioned Parquet copy (``parquet_store.py``), skipping
+    partitions and row groups that cannot match ``filters`` and decoding
+    only ``columns`` (label columns count as their source column). The
+    result equals ``filter_dataframe(read_salaries(path), filters)[columns]``,
+    index included. Falls back to parsing the source when ``PARQUET_DIR``
+    is not writable.
+    """
+    sources = None
+    if columns is not None:
+        sources = list(dict.fromkeys(LABEL_COLUMNS.get(col, col) for col in columns))
+    try:
+        df = parquet_store.read_dataset(parquet_dataset(path), filters, sources)
+    except OSError:
+        logger.warning("Cannot use Parquet directory %s; reading %s", PARQUET_DIR, path)
+        df = ingest.read_source(path)
+        if filters:
+            df = filter_dataframe(df, filters)
+        if sources is not None:
+            df = df[sources]
+    df = add_label_columns(df)
+    if columns is not None:
+        df = df[list(columns)]
+    df.attrs["dataset_version"] = dataset_version(path)
+    return df
+
+
+def read_table(path=DATA_PATH, table_dir=TABLE_DIR) -> CompactTable:
+    """Memory-mapped compact table, written once per dataset version.
+
+    Every local server process maps the same files read-only, so the columns
+    are held once in the OS page cache however many processes serve them.
+    Falls back to an in-memory table when ``table_dir`` is not writable.
+    """
+    version = dataset_version(path)
+    directory = Path(table_dir) / version
+    try:
+        if not (directory / "meta.json").exists():
+            CompactTable.from_frame(read_salaries(path)).save(directory)
+            for stale in Path(table_dir).iterdir():
+                # Processes still mapping an old version keep their pages.
+                if stale.is_dir() and stale.name != version and not stale.name.startswith("."):
+                    shutil.rmtree(stale, ignore_errors=True)
+        return CompactTable.open(directory)
+    except OSError:
+        logger.warning("Cannot use table directory %s; keeping the table in memory", table_dir)
+        return CompactTable.from_frame(read_salaries(path))
+
+
+def read_model(path=MODEL_PATH, artifact_path=MODEL_ARTIFACT_PATH):
+    """Read the pre-trained model and scaler without Streamlit caching.
+
+    Prefers the memory-mapped artifact (``model_artifact.py``), which loads in
+    milliseconds without scikit-learn; falls back to the pickle.
+    """
+    if artifact_path is not None and Path(artifact_path).exists():
+        artifact = load_artifact(artifact_path)
+        return artifact.model, artifact.scaler
+    if not Path(path).exists():
         return None, None
-    with open(MODEL_PATH, "rb") as f:
+    with open(path, "rb") as f:
         data = pickle.load(f)
     return data.get("model"), data.get("scaler")
 
 
-def format_salary(value: float) -> str:
-    """Format a salary value as USD string."""
-    return f"${value:,.0f}"
+@timed("utils.load_data")
+@st.cache_data
+def load_data(filters: dict = None, columns=None) -> pd.DataFrame:
+    """Load and prepare the salary dataset, optionally only matching rows and some columns."""
+    return read_salaries(filters=filters, columns=columns)
+
+
+@timed("utils.load_table")
+@st.cache_resource(show_spinner=False)
+def load_table() -> CompactTable:
+    """Integer-coded copy of the dataset, shared by every session and process."""
+    return read_table()
+
+
+@st.cache_resource(show_spinner=False)
+def load_title_index() -> TrigramIndex:
+    """Trigram index over the dataset's (canonical) job titles."""
+    return TrigramIndex(load_table().values("job_title"))
+
+
+def title_options(query: str, titles: list, k: int = 20) -> list:
+    """The ``k`` titles best matching a search-box query, best first.
+
+    Returns ``titles`` unchanged when the query is blank or nothing matches.
+    """
+    if not query or not query.strip():
+        return titles
+    allowed = set(titles)
+    matches = [title for title, _ in load_title_index().search(query, k=len(allowed)) if title in allowed]
+    return matches[:k] or titles
+
+
+@st.cache_resource
+def load_model():
+    """Load the pre-trained model and scaler."""
+    return read_model()
+
+
+def format_salary(value: float, currency: str = "USD") -> str:
+    """Format a salary value as a currency string (USD by default)."""
+    return f"{CURRENCY_SYMBOLS.get(currency, currency + ' ')}{value:,.0f}"
+
+
+def format_percentile(value: float) -> str:
+    """Format a percentile rank as an ordinal, e.g. ``33rd``."""
+    n = int(round(value))
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
 
 
+@timed()
 def filter_dataframe(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
     """Apply sidebar filters to the dataframe."""
     mask = pd.Series(True, index=df.index)